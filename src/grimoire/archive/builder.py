@@ -7,7 +7,7 @@ Archive 文件构建器
 """
 
 import os
-from typing import Optional, List, Dict, Callable
+from typing import Optional, List, Dict, Callable, Tuple
 
 from ..core.binary_io import BinaryWriter
 from ..core.schema import (
@@ -20,6 +20,10 @@ from ..utils import normalize_path, split_path, default_path_hash
 from ..exceptions import HashCollisionError, UnknownAlgorithmError
 
 
+# 不超过该大小的文件直接原样存储，压缩头部开销通常大于收益
+_MIN_COMPRESS_SIZE = 64
+
+
 class ArchiveBuilder:
     """
     Archive 文件构建器
@@ -77,75 +81,123 @@ class ArchiveBuilder:
         Args:
             local_path: 本地文件路径
             vfs_path: 虚拟路径 (默认使用文件名)
-            algo_id: 压缩算法 ID (0=不压缩)
+            algo_id: 压缩算法 ID (0=不压缩)。文件过小或压缩后不变小时
+                原样存储，条目的 algo_id 记为 0
             
         Raises:
             FileNotFoundError: 本地文件不存在
             HashCollisionError: 路径 Hash 冲突
             UnknownAlgorithmError: 未注册的压缩算法
         """
-        # 1. 检查文件存在
-        if not os.path.isfile(local_path):
-            raise FileNotFoundError(f"文件不存在: {local_path}")
-        
-        # 2. 检查压缩算法
-        if algo_id != 0 and algo_id not in self._compression_hooks:
-            raise UnknownAlgorithmError(algo_id, "compression")
+        # 1-2. 检查文件存在与压缩算法
+        self._check_file(local_path, algo_id)
         
         # 3. 确定虚拟路径
         if vfs_path is None:
             vfs_path = "/" + os.path.basename(local_path)
         
-        # 4. 规范化并拆分路径
+        # 4-6. 规范化路径、检查冲突并添加到字典
+        ids = self._register_path(vfs_path)
+        if ids is None:
+            return  # 重复添加，跳过
+        
+        # 7-9. 读取文件、计算校验值并压缩
+        payload = self._load_payload(local_path, algo_id)
+        
+        # 10-11. 记录数据块并创建 Entry
+        self._append_entry(ids, payload)
+    
+    def _check_file(self, local_path: str, algo_id: int) -> None:
+        """
+        检查本地文件与压缩算法
+        
+        Raises:
+            FileNotFoundError: 本地文件不存在
+            UnknownAlgorithmError: 未注册的压缩算法
+        """
+        if not os.path.isfile(local_path):
+            raise FileNotFoundError(f"文件不存在: {local_path}")
+        if algo_id != 0 and algo_id not in self._compression_hooks:
+            raise UnknownAlgorithmError(algo_id, "compression")
+    
+    def _register_path(self, vfs_path: str) -> Optional[Tuple[int, int, int, int]]:
+        """
+        规范化虚拟路径，检查 Hash 冲突并添加到字典
+        
+        Args:
+            vfs_path: 虚拟路径
+            
+        Returns:
+            (path_hash, dir_id, name_id, ext_id)，重复添加同一路径时返回 None
+            
+        Raises:
+            HashCollisionError: 路径 Hash 冲突
+        """
         normalized = normalize_path(vfs_path)
         dir_part, name, ext = split_path(normalized)
         
-        # 5. 计算 path_hash 并检查冲突
         path_hash = self._path_hash_func(normalized)
         if path_hash in self._hash_to_path:
             existing = self._hash_to_path[path_hash]
             if existing != normalized:
                 raise HashCollisionError(existing, normalized, path_hash)
-            else:
-                return  # 重复添加，跳过
+            return None
         self._hash_to_path[path_hash] = normalized
         
-        # 6. 添加到字典
         dir_id, name_id, ext_id = self._path_dict.add_path(dir_part, name, ext)
+        return path_hash, dir_id, name_id, ext_id
+    
+    def _load_payload(self, local_path: str, algo_id: int) -> Tuple[int, bytes, int, bytes]:
+        """
+        读取文件，计算校验值并压缩
+        
+        不修改构建器状态，可在工作线程中调用 (zlib / hashlib 会释放 GIL)。
+        不超过 _MIN_COMPRESS_SIZE 的文件跳过压缩，压缩后不变小的
+        文件改为原样存储，两种情况实际使用的 algo_id 均为 0。
         
-        # 7. 读取文件
+        Args:
+            local_path: 本地文件路径
+            algo_id: 请求的压缩算法 ID (0=不压缩)
+            
+        Returns:
+            (原始大小, 存储数据, 实际 algo_id, 校验值) 元组
+        """
         with open(local_path, 'rb') as f:
             raw_data = f.read()
-        raw_size = len(raw_data)
         
-        # 8. 计算校验值 (基于原始数据)
+        # 校验值基于原始数据
         checksum = b''
         if self._checksum_hook:
             checksum = self._checksum_hook.compute(raw_data)
         
-        # 9. 压缩数据
-        if algo_id != 0:
-            hook = self._compression_hooks[algo_id]
-            packed_data = hook.compress(raw_data)
-            flags = ENTRY_FLAG_COMPRESSED
-        else:
-            packed_data = raw_data
-            flags = 0
+        raw_size = len(raw_data)
+        if algo_id != 0 and raw_size > _MIN_COMPRESS_SIZE:
+            packed_data = self._compression_hooks[algo_id].compress(raw_data)
+            if len(packed_data) < raw_size:
+                return raw_size, packed_data, algo_id, checksum
         
-        packed_size = len(packed_data)
+        return raw_size, raw_data, 0, checksum
+    
+    def _append_entry(
+        self,
+        ids: Tuple[int, int, int, int],
+        payload: Tuple[int, bytes, int, bytes]
+    ) -> None:
+        """记录数据块并创建 Entry (offset 暂存数据块索引，build() 时计算实际 offset)"""
+        path_hash, dir_id, name_id, ext_id = ids
+        raw_size, packed_data, algo_id, checksum = payload
+        flags = ENTRY_FLAG_COMPRESSED if algo_id != 0 else 0
         
-        # 10. 记录数据块索引 (offset 稍后计算)
         blob_index = len(self._data_blobs)
         self._data_blobs.append(packed_data)
         
-        # 11. 创建 Entry (offset 暂时存储 blob_index)
         entry = ArchiveEntry(
             path_hash=path_hash,
             dir_id=dir_id,
             name_id=name_id,
             ext_id=ext_id,
             offset=blob_index,  # 临时，build() 时计算实际 offset
-            packed_size=packed_size,
+            packed_size=len(packed_data),
             raw_size=raw_size,
             algo_id=algo_id,
             flags=flags,
@@ -201,73 +253,12 @@ class ArchiveBuilder:
         构建并写入 Archive 文件
         
         执行流程:
-        1. 预留 FileHeader 空间
-        2. 写入 IndexHeader + String Tables + Entry Table
+        1. 在内存中序列化 (并加密) String Tables，计算各区块与 Entry 的 offset
+        2. 顺序写入 FileHeader + IndexHeader + String Tables + Entry Table
         3. 写入 DataHeader + Data Block
-        4. 回写 Headers
+        
+        索引加密/压缩和数据块写入各只进行一次。
         """
-        with open(self._output_path, 'w+b') as f:
-            writer = BinaryWriter(f)
-            
-            # ========== 1. 预留 FileHeader 空间 ==========
-            writer.reserve(FileHeader.SIZE)
-            
-            # ========== 2. 写入 Index Block ==========
-            index_start = writer.position
-            
-            # 2.1 预留 IndexHeader 空间
-            writer.reserve(IndexHeader.SIZE)
-            
-            # 2.2 写入 String Tables
-            string_start = writer.position
-            self._path_dict.pack(writer)
-            string_size = writer.position - string_start
-            
-            # 2.3 如果需要加密
-            if self._index_crypto:
-                f.seek(string_start)
-                string_data = f.read(string_size)
-                encrypted = self._index_crypto.encrypt(string_data)
-                f.seek(string_start)
-                f.write(encrypted)
-                writer.seek(string_start + len(encrypted))
-            
-            # ========== 3. 写入 Data Block ==========
-            # 3.1 写入 DataHeader
-            data_header_pos = writer.position
-            writer.reserve(DataHeader.SIZE)
-            
-            # 3.2 计算每个 Entry 的实际 offset 并写入数据
-            data_start = writer.position
-            current_offset = 0
-            
-            for i, entry in enumerate(self._entries):
-                blob_data = self._data_blobs[i]
-                
-                # 更新 Entry 的 offset (相对于 Data Block 开始)
-                entry.offset = data_start + current_offset
-                
-                # 写入数据
-                writer.write_bytes(blob_data)
-                current_offset += len(blob_data)
-            
-            data_total_size = writer.position - data_start
-            
-            # ========== 4. 写入 Entry Table (在 String Tables 之后) ==========
-            # 先记录 Entry Table 开始位置
-            entry_table_pos = string_start + string_size
-            if self._index_crypto:
-                # 加密后可能略有变化，但通常相同
-                pass
-            
-            # 重新定位到 Entry Table 位置
-            writer.seek(data_header_pos)  # 暂时跳过，稍后处理
-            
-            # 实际上，我们需要重新组织写入顺序
-            # 由于 Entry 的 offset 需要在写入 Data 后才能确定
-            # 我们采用：先写入所有内容到内存，最后一次性写入
-            
-        # ===== 重新实现：两阶段写入 =====
         self._build_two_phase()
     
     def _build_two_phase(self) -> None:
@@ -277,15 +268,10 @@ class ArchiveBuilder:
         阶段 1: 收集所有数据，计算 offset
         阶段 2: 一次性写入文件
         """
-        import io
-        
         # ===== 阶段 1: 计算布局 =====
         
         # 计算 String Tables 大小
-        string_buffer = io.BytesIO()
-        string_writer = BinaryWriter(string_buffer)
-        self._path_dict.pack(string_writer)
-        string_data = string_buffer.getvalue()
+        string_data = self._path_dict.to_bytes()
         
         # 加密 (如果需要)
         if self._index_crypto:
@@ -294,9 +280,10 @@ class ArchiveBuilder:
         string_size = len(string_data)
         
         # 计算 Entry Table 大小
+        entries = self._entries
+        entry_count = len(entries)
         checksum_size = self._checksum_hook.digest_size if self._checksum_hook else 0
-        entry_size = ArchiveEntry.entry_size(checksum_size)
-        entry_table_size = entry_size * len(self._entries)
+        entry_table_size = ArchiveEntry.entry_size(checksum_size) * entry_count
         
         # 计算各区块偏移
         file_header_size = FileHeader.SIZE
@@ -311,7 +298,7 @@ class ArchiveBuilder:
         
         # 计算每个 Entry 的 offset
         current_data_offset = data_start
-        for i, entry in enumerate(self._entries):
+        for entry in entries:
             entry.offset = current_data_offset
             current_data_offset += entry.packed_size
         
@@ -332,7 +319,7 @@ class ArchiveBuilder:
                 index_offset=index_start,
                 index_size=index_size,
                 data_offset=data_header_start,
-                entry_count=len(self._entries)
+                entry_count=entry_count
             )
             writer.write_bytes(file_header.pack())
             
@@ -350,20 +337,22 @@ class ArchiveBuilder:
             writer.write_bytes(string_data)
             
             # 4. Entry Table
-            for entry in self._entries:
-                writer.write_bytes(entry.pack())
+            entry_table = bytearray(entry_table_size)
+            ArchiveEntry.pack_many_into(entries, entry_table, 0, checksum_size)
+            writer.write_bytes(entry_table)
             
             # 5. DataHeader
             data_header = DataHeader(
-                magic=b'DATA',
-                block_count=len(self._entries),
+                magic=DataHeader.MAGIC,
+                block_count=entry_count,
                 total_size=data_total_size
             )
             writer.write_bytes(data_header.pack())
             
             # 6. Data Block
+            write_bytes = writer.write_bytes
             for blob in self._data_blobs:
-                writer.write_bytes(blob)
+                write_bytes(blob)
     
     @property
     def entry_count(self) -> int:
@@ -392,22 +381,28 @@ class ArchiveBuilder:
         self,
         items: 'List[FileItem] | Iterator[FileItem]',
         on_error: str = 'raise',
-        progress_callback: Optional[Callable[['ProgressInfo'], None]] = None
+        progress_callback: Optional[Callable[['ProgressInfo'], None]] = None,
+        max_workers: Optional[int] = None
     ) -> 'BatchResult':
         """
         批量添加文件
         
+        文件读取、校验计算与压缩在线程池中并行执行 (zlib / hashlib 会释放 GIL)，
+        路径注册与条目写入按输入顺序在主线程中进行，结果与逐个 add_file 一致。
+        并行时 Hook 的 compute / compress 会被多个线程同时调用。
+        
         Args:
             items: FileItem 列表或迭代器
             on_error: 错误处理策略 ('raise', 'skip', 'abort')
             progress_callback: 进度回调函数
+            max_workers: 工作线程数 (默认按校验 Hook 的 parallelism_hint 决定，1 为串行)
             
         Returns:
             BatchResult 批量操作结果
         """
         from ..core.batch import (
             FileItem, ProgressInfo, BatchResult, ProgressTracker,
-            ErrorPolicy, estimate_total_bytes
+            ErrorPolicy, estimate_total_bytes, default_worker_count, bounded_map
         )
         
         # 转换为列表以获取总数 (如果是迭代器)
@@ -425,25 +420,61 @@ class ArchiveBuilder:
         
         result = BatchResult()
         
-        for item in items:
+        def load(item: 'FileItem'):
+            """检查并读取/压缩文件 (工作线程)，返回 (payload, 异常)"""
             try:
-                file_size = os.path.getsize(item.local_path)
-                self.add_file(item.local_path, item.vfs_path, item.algo_id)
-                result.success_count += 1
-                result.total_bytes += file_size
-                tracker.update(item.local_path, file_size)
-                
+                self._check_file(item.local_path, item.algo_id)
+                return self._load_payload(item.local_path, item.algo_id), None
             except Exception as e:
-                if on_error == 'raise':
-                    raise
+                return None, e
+        
+        if max_workers is None:
+            hint = getattr(self._checksum_hook, 'parallelism_hint', 'cpu')
+            max_workers = default_worker_count(hint)
+        
+        executor = None
+        if max_workers > 1 and total_files > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = ThreadPoolExecutor(max_workers=min(max_workers, total_files))
+            # 最多提前 max_workers * 2 个文件，中止时不再处理剩余文件
+            loaded = bounded_map(executor, load, items, max_workers * 2)
+        else:
+            loaded = map(load, items)
+        
+        try:
+            # 按输入顺序注册路径并写入条目
+            for item, (payload, error) in zip(items, loaded):
+                if error is None:
+                    try:
+                        vfs_path = item.vfs_path
+                        if vfs_path is None:
+                            vfs_path = "/" + os.path.basename(item.local_path)
+                        ids = self._register_path(vfs_path)
+                        if ids is not None:
+                            self._append_entry(ids, payload)
+                    except Exception as e:
+                        error = e
+                
+                if error is None:
+                    file_size = payload[0]
+                    result.success_count += 1
+                    result.total_bytes += file_size
+                    tracker.update(item.local_path, file_size)
+                elif on_error == 'raise':
+                    raise error
                 elif on_error == 'skip':
                     result.failed_count += 1
-                    result.failed_files.append((item.local_path, e))
+                    result.failed_files.append((item.local_path, error))
                     tracker.update(item.local_path, 0)
                 elif on_error == 'abort':
                     result.failed_count += 1
-                    result.failed_files.append((item.local_path, e))
+                    result.failed_files.append((item.local_path, error))
                     break
+        finally:
+            if executor is not None:
+                # 关闭生成器以取消排队中的任务，只等待已开始的任务
+                loaded.close()
+                executor.shutdown(wait=True)
         
         result.elapsed_time = tracker.finish()
         return result
@@ -456,7 +487,8 @@ class ArchiveBuilder:
         recursive: bool = True,
         exclude_patterns: Optional[List[str]] = None,
         on_error: str = 'raise',
-        progress_callback: Optional[Callable[['ProgressInfo'], None]] = None
+        progress_callback: Optional[Callable[['ProgressInfo'], None]] = None,
+        max_workers: Optional[int] = None
     ) -> 'BatchResult':
         """
         批量添加目录 (带进度回调)
@@ -469,6 +501,7 @@ class ArchiveBuilder:
             exclude_patterns: 排除的文件模式
             on_error: 错误处理策略
             progress_callback: 进度回调函数
+            max_workers: 工作线程数 (见 add_files_batch)
             
         Returns:
             BatchResult 批量操作结果
@@ -479,5 +512,5 @@ class ArchiveBuilder:
             local_dir, mount_point, recursive, algo_id, exclude_patterns
         ))
         
-        return self.add_files_batch(items, on_error, progress_callback)
+        return self.add_files_batch(items, on_error, progress_callback, max_workers)
 
@@ -10,7 +10,8 @@ Archive 文件读取器
 import io
 import mmap
 import os
-from typing import Optional, List, Dict, Callable, BinaryIO
+import sys
+from typing import Optional, List, Dict, Callable, BinaryIO, Iterable, Tuple
 
 from ..core.binary_io import BinaryReader
 from ..core.schema import (
@@ -18,6 +19,7 @@ from ..core.schema import (
     MODE_ARCHIVE
 )
 from ..core.string_table import PathDictionary
+from ..core.entry_table import EntryTable
 from ..hooks.base import CompressionHook, ChecksumHook, IndexCryptoHook
 from ..utils import normalize_path, default_path_hash
 from ..exceptions import (
@@ -28,6 +30,113 @@ from ..exceptions import (
 )
 
 
+# 批量读取时每次预读的条目数
+_PREFETCH_BATCH = 256
+
+# 预读区间之间的间隙不超过该值时合并为一个区间
+_PREFETCH_GAP = 64 * 1024
+
+
+def _merge_ranges(ranges: List[Tuple[int, int]], gap: int = _PREFETCH_GAP) -> List[Tuple[int, int]]:
+    """
+    合并 [start, end) 区间 (排序后相邻且间隙不超过 gap 的合并，空区间忽略)
+    
+    Args:
+        ranges: 区间列表
+        gap: 允许合并的最大间隙
+        
+    Returns:
+        按起点排序的合并后区间列表
+    """
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1] + gap:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _write_file(local_path: str, data: memoryview) -> None:
+    """
+    以无缓冲方式一次写出整个文件
+    
+    跳过 BufferedWriter，数据直接交给 write 系统调用；
+    处理部分写入直到全部写完。
+    
+    Args:
+        local_path: 输出文件路径
+        data: 文件内容
+    """
+    with open(local_path, 'wb', buffering=0) as f:
+        written = f.write(data)
+        total = data.nbytes
+        while written < total:
+            written += f.write(data[written:])
+
+
+def _copy_file_range(src_fd: int, offset: int, size: int, local_path: str) -> bool:
+    """
+    在内核中将归档的一段数据复制到新文件
+    
+    优先使用 os.copy_file_range (Linux, Python 3.8+)，其次 Linux 上的
+    os.sendfile；数据不经过用户态缓冲区。带 offset 调用不改变源文件指针，
+    可与其他读取并发。
+    
+    Args:
+        src_fd: 归档文件描述符
+        offset: 数据在归档中的偏移
+        size: 数据长度
+        local_path: 输出文件路径
+        
+    Returns:
+        是否完整复制；平台不支持或调用失败时返回 False，由调用方回退
+    """
+    copy_range = getattr(os, 'copy_file_range', None)
+    sendfile = getattr(os, 'sendfile', None) if sys.platform.startswith('linux') else None
+    if copy_range is None and sendfile is None:
+        return False
+    
+    with open(local_path, 'wb', buffering=0) as f:
+        out_fd = f.fileno()
+        done = 0
+        try:
+            while done < size:
+                if copy_range is not None:
+                    n = copy_range(src_fd, out_fd, size - done, offset + done)
+                else:
+                    n = sendfile(out_fd, src_fd, offset + done, size - done)
+                if n <= 0:
+                    return False
+                done += n
+        except OSError:
+            return False
+    return True
+
+
+def _accepts_view(hook: Optional[ChecksumHook]) -> bool:
+    """
+    判断校验 Hook 能否直接接受 memoryview
+    
+    ChecksumHook.compute/verify 约定接收 bytes。仅内置 Hook (基于 hashlib / zlib，
+    本身接受任意 bytes-like 对象) 直接传入 mmap 切片以免复制；子类与第三方 Hook
+    可能依赖 bytes 的方法或类型检查，仍传入 bytes。
+    
+    Args:
+        hook: 校验 Hook
+        
+    Returns:
+        是否可直接传入 memoryview
+    """
+    from ..hooks.checksum import (
+        NoneChecksumHook, CRC32Hook, MD5Hook, SHA1Hook, SHA256Hook
+    )
+    return type(hook) in (NoneChecksumHook, CRC32Hook, MD5Hook, SHA1Hook, SHA256Hook)
+
+
 class ArchiveReader:
     """
     Archive 文件读取器
@@ -59,6 +168,7 @@ class ArchiveReader:
         """
         self._file_path = file_path
         self._checksum_hook = checksum_hook
+        self._checksum_accepts_view = _accepts_view(checksum_hook)
         self._index_crypto = index_crypto
         self._path_hash_func = path_hash_func or default_path_hash
         self._use_mmap = use_mmap
@@ -76,7 +186,7 @@ class ArchiveReader:
         self._index_header: Optional[IndexHeader] = None
         self._data_header: Optional[DataHeader] = None
         self._path_dict: Optional[PathDictionary] = None
-        self._entries: Dict[int, ArchiveEntry] = {}  # path_hash -> Entry
+        self._entries: Optional[EntryTable] = None  # path_hash -> Entry
         self._index_decrypted: bool = False
         
         # 加载文件
@@ -99,10 +209,46 @@ class ArchiveReader:
                 self._use_mmap = False
                 self._mmap = None
         
-        reader = BinaryReader(self._file)
+        if self._mmap is not None:
+            # 直接从映射区按偏移读取，不经过文件缓冲与 read 系统调用
+            read_bytes = self._mmap_cursor(self._mmap)
+        else:
+            read_bytes = BinaryReader(self._file).read_bytes
+        
+        self._load_index(read_bytes)
+    
+    @staticmethod
+    def _mmap_cursor(mm: mmap.mmap) -> Callable[[int], bytes]:
+        """
+        创建基于 mmap 的顺序读取函数
+        
+        与 BinaryReader.read_bytes 行为一致，但不移动 mmap 的文件指针。
+        """
+        total = len(mm)
+        position = 0
+        
+        def read_bytes(size: int) -> bytes:
+            nonlocal position
+            end = position + size
+            if end > total:
+                raise EOFError(
+                    f"文件结束: 期望读取 {size} 字节，实际只有 {total - position} 字节"
+                )
+            data = mm[position:end]
+            position = end
+            return data
+        
+        return read_bytes
+    
+    def _load_index(self, read_bytes: Callable[[int], bytes]) -> None:
+        """
+        顺序解析文件头、索引区和数据头
         
+        Args:
+            read_bytes: 顺序读取指定字节数的函数
+        """
         # ========== 1. 读取 FileHeader ==========
-        header_data = reader.read_bytes(FileHeader.SIZE)
+        header_data = read_bytes(FileHeader.SIZE)
         self._file_header = FileHeader.unpack(header_data)
         
         # 验证
@@ -114,11 +260,11 @@ class ArchiveReader:
             )
         
         # ========== 2. 读取 IndexHeader ==========
-        index_header_data = reader.read_bytes(IndexHeader.SIZE)
+        index_header_data = read_bytes(IndexHeader.SIZE)
         self._index_header = IndexHeader.unpack(index_header_data)
         
         # ========== 3. 读取 String Tables ==========
-        string_data = reader.read_bytes(self._index_header.string_table_size)
+        string_data = read_bytes(self._index_header.string_table_size)
         
         # flags 非零表示索引区需要处理 (压缩/加密)
         needs_processing = self._file_header.flags != 0
@@ -134,9 +280,8 @@ class ArchiveReader:
         
         # 解析字典 (如果已解密)
         if self._index_decrypted:
-            string_reader = BinaryReader(io.BytesIO(string_data))
-            self._path_dict = PathDictionary.unpack(
-                string_reader,
+            self._path_dict = PathDictionary.from_bytes(
+                string_data,
                 self._index_header.dir_count,
                 self._index_header.name_count,
                 self._index_header.ext_count
@@ -146,21 +291,20 @@ class ArchiveReader:
         checksum_size = self._index_header.checksum_size
         entry_size = ArchiveEntry.entry_size(checksum_size)
         
-        for _ in range(self._file_header.entry_count):
-            entry_data = reader.read_bytes(entry_size)
-            entry = ArchiveEntry.unpack(entry_data, checksum_size)
-            self._entries[entry.path_hash] = entry
+        # 一次读取整个 Entry Table，按列存储
+        entry_count = self._file_header.entry_count
+        table = read_bytes(entry_size * entry_count)
+        self._entries = EntryTable(ArchiveEntry, table, entry_count, checksum_size)
         
         # ========== 5. 读取 DataHeader ==========
-        data_header_data = reader.read_bytes(DataHeader.SIZE)
-        self._data_header = DataHeader.unpack(data_header_data)
-        
-        if self._data_header.magic != b'DATA':
+        data_header_data = read_bytes(DataHeader.SIZE)
+        if not DataHeader.has_valid_magic(data_header_data):
             raise InvalidFormatError(
                 "无效的数据头魔法数",
                 expected="DATA",
-                actual=str(self._data_header.magic)
+                actual=str(data_header_data[:4])
             )
+        self._data_header = DataHeader.unpack(data_header_data)
     
     def _read_data(self, offset: int, size: int) -> bytes:
         """
@@ -174,6 +318,46 @@ class ArchiveReader:
             self._file.seek(offset)
             return self._file.read(size)
     
+    def _prefetch_entries(self, entries: Iterable[Optional[ArchiveEntry]]) -> None:
+        """
+        提示内核预读一批条目的数据区
+        
+        mmap 模式使用 madvise(MADV_WILLNEED)，传统模式使用
+        posix_fadvise(POSIX_FADV_WILLNEED)。内核对所有区间异步发起读取，
+        多个请求可同时在设备队列中处理，之后的逐条读取直接命中页缓存。
+        仅为提示，平台不支持或调用失败时静默跳过。
+        
+        Args:
+            entries: 即将读取的条目 (None 条目跳过)
+        """
+        if self._mmap is not None:
+            advise = getattr(self._mmap, 'madvise', None)
+            advice = getattr(mmap, 'MADV_WILLNEED', None)
+        else:
+            advise = getattr(os, 'posix_fadvise', None)
+            advice = getattr(os, 'POSIX_FADV_WILLNEED', None)
+        if advise is None or advice is None:
+            return
+        
+        ranges = [
+            (entry.offset, entry.offset + entry.packed_size)
+            for entry in entries if entry is not None
+        ]
+        
+        try:
+            if self._mmap is not None:
+                # madvise 的起点须按页对齐
+                page = mmap.PAGESIZE
+                for start, end in _merge_ranges(ranges):
+                    aligned = start - start % page
+                    advise(advice, aligned, end - aligned)
+            else:
+                fd = self._file.fileno()
+                for start, end in _merge_ranges(ranges):
+                    advise(fd, start, end - start, advice)
+        except (OSError, ValueError):
+            pass
+    
     def exists(self, vfs_path: str) -> bool:
         """检查虚拟路径是否存在"""
         path_hash = self._path_hash_func(normalize_path(vfs_path))
@@ -195,12 +379,10 @@ class ArchiveReader:
             CorruptedDataError: 校验失败
             UnknownAlgorithmError: 未知的解压算法
         """
-        path_hash = self._path_hash_func(normalize_path(vfs_path))
-        if path_hash not in self._entries:
-            raise FileNotFoundError(f"路径不存在: {vfs_path}")
-        
-        entry = self._entries[path_hash]
-        
+        return self._read_entry(vfs_path, self.get_entry(vfs_path), verify)
+    
+    def _read_entry(self, vfs_path: str, entry: ArchiveEntry, verify: bool) -> bytes:
+        """读取已查找到的条目 (vfs_path 仅用于错误信息)，见 read"""
         # 1. 读取压缩后的数据
         packed_data = self._read_data(entry.offset, entry.packed_size)
         
@@ -238,12 +420,78 @@ class ArchiveReader:
         data = self.read(vfs_path, verify)
         return io.BytesIO(data)
     
+    def view(self, vfs_path: str, verify: bool = True) -> memoryview:
+        """
+        以 memoryview 方式读取文件内容
+        
+        mmap 模式下未压缩的条目直接返回映射区视图，不复制数据；
+        压缩条目通过 Hook 的 decompress_into 解压到预分配缓冲区；
+        传统模式下未压缩的条目包装 read() 的结果。
+        
+        注意: 映射区视图存活期间无法关闭 mmap，须在 close() 前
+        调用 release() 或丢弃所有引用。
+        
+        Args:
+            vfs_path: 虚拟路径
+            verify: 是否校验数据完整性
+            
+        Returns:
+            文件内容的 memoryview
+            
+        Raises:
+            FileNotFoundError: 路径不存在
+            CorruptedDataError: 校验失败
+            UnknownAlgorithmError: 未知的解压算法
+        """
+        return self._view_entry(vfs_path, self.get_entry(vfs_path), verify)
+    
+    def _view_entry(self, vfs_path: str, entry: ArchiveEntry, verify: bool) -> memoryview:
+        """以 memoryview 读取已查找到的条目 (vfs_path 仅用于错误信息)，见 view"""
+        if entry.algo_id != 0:
+            data = self._decompress_into(entry)
+        elif self._mmap is None:
+            return memoryview(self._read_entry(vfs_path, entry, verify))
+        else:
+            data = memoryview(self._mmap)[entry.offset:entry.offset + entry.packed_size]
+        
+        if verify and self._checksum_hook and entry.checksum:
+            checked = data if self._checksum_accepts_view else data.tobytes()
+            if not self._checksum_hook.verify(checked, entry.checksum):
+                actual = self._checksum_hook.compute(checked)
+                data.release()
+                raise CorruptedDataError(vfs_path, entry.checksum, actual)
+        return data
+    
+    def _decompress_into(self, entry: ArchiveEntry) -> memoryview:
+        """
+        将压缩条目解压到按原始大小预分配的缓冲区
+        
+        Hook 未提供 decompress_into 时回退为 decompress + 复制。
+        
+        Raises:
+            UnknownAlgorithmError: 未知的解压算法
+        """
+        hook = self._compression_hooks.get(entry.algo_id)
+        if hook is None:
+            raise UnknownAlgorithmError(entry.algo_id, "compression")
+        
+        packed = self._read_data(entry.offset, entry.packed_size)
+        out = memoryview(bytearray(entry.raw_size))
+        into = getattr(hook, 'decompress_into', None)
+        if into is not None:
+            size = into(packed, out)
+        else:
+            raw = hook.decompress(packed, entry.raw_size)
+            size = len(raw)
+            out[:size] = raw
+        return out if size == entry.raw_size else out[:size]
+    
     def get_entry(self, vfs_path: str) -> ArchiveEntry:
         """获取指定路径的条目信息"""
-        path_hash = self._path_hash_func(normalize_path(vfs_path))
-        if path_hash not in self._entries:
+        entry = self._entries.get(self._path_hash_func(normalize_path(vfs_path)))
+        if entry is None:
             raise FileNotFoundError(f"路径不存在: {vfs_path}")
-        return self._entries[path_hash]
+        return entry
     
     def list_all(self) -> List[str]:
         """
@@ -255,13 +503,7 @@ class ArchiveReader:
         if not self._index_decrypted:
             raise IndexNotDecryptedError()
         
-        result = []
-        for entry in self._entries.values():
-            full_path = self._path_dict.get_path(
-                entry.dir_id, entry.name_id, entry.ext_id
-            )
-            result.append(full_path)
-        return result
+        return self._build_paths()
     
     def get_all_entries(self) -> List[Dict]:
         """
@@ -292,10 +534,7 @@ class ArchiveReader:
             raise IndexNotDecryptedError()
         
         result = []
-        for entry in self._entries.values():
-            full_path = self._path_dict.get_path(
-                entry.dir_id, entry.name_id, entry.ext_id
-            )
+        for full_path, entry in zip(self._build_paths(), self._entries.values()):
             result.append({
                 'path': full_path,
                 'raw_size': entry.raw_size,
@@ -319,11 +558,16 @@ class ArchiveReader:
         if not self._index_decrypted:
             raise IndexNotDecryptedError()
         
-        for entry in self._entries.values():
-            full_path = self._path_dict.get_path(
-                entry.dir_id, entry.name_id, entry.ext_id
-            )
-            yield full_path, entry
+        yield from zip(self._build_paths(), self._entries.values())
+    
+    def _build_paths(self) -> List[str]:
+        """按条目存储顺序批量重建所有路径"""
+        column_values = self._entries.column_values
+        return self._path_dict.build_paths(
+            column_values('dir_id'),
+            column_values('name_id'),
+            column_values('ext_id')
+        )
     
     def list_hashes(self) -> List[int]:
         """列出所有路径 Hash"""
@@ -379,7 +623,8 @@ class ArchiveReader:
         """
         批量读取多个文件
         
-        mmap 模式下可实现真正的并行读取。
+        每 _PREFETCH_BATCH 个路径先一次性查找条目并提示内核预读，
+        再逐个读取，每个路径只规范化并计算一次 Hash。
         
         Args:
             vfs_paths: 虚拟路径列表
@@ -390,16 +635,24 @@ class ArchiveReader:
             {vfs_path: data} 字典
         """
         result = {}
-        
-        for path in vfs_paths:
-            try:
-                data = self.read(path, verify)
-                result[path] = data
-            except Exception as e:
-                if on_error == 'raise':
-                    raise
-                elif on_error == 'skip':
-                    continue  # 跳过失败的文件
+        vfs_paths = list(vfs_paths)
+        get = self._entries.get
+        path_hash_func = self._path_hash_func
+        
+        for i in range(0, len(vfs_paths), _PREFETCH_BATCH):
+            window = vfs_paths[i:i + _PREFETCH_BATCH]
+            entries = [get(path_hash_func(normalize_path(p))) for p in window]
+            self._prefetch_entries(entries)
+            for path, entry in zip(window, entries):
+                try:
+                    if entry is None:
+                        raise FileNotFoundError(f"路径不存在: {path}")
+                    result[path] = self._read_entry(path, entry, verify)
+                except Exception as e:
+                    if on_error == 'raise':
+                        raise
+                    elif on_error == 'skip':
+                        continue  # 跳过失败的文件
         
         return result
     
@@ -408,29 +661,35 @@ class ArchiveReader:
         output_dir: str,
         verify: bool = True,
         on_error: str = 'raise',
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        max_workers: Optional[int] = None
     ) -> 'BatchResult':
         """
         解包所有文件到指定目录
         
+        mmap 模式下读取、解压与校验在线程池中提前进行 (zlib / hashlib 会释放 GIL)，
+        最多领先 max_workers * 2 个条目；文件按顺序在主线程中写出。
+        传统模式共享文件指针，始终串行读取。
+        
         Args:
             output_dir: 输出目录路径
             verify: 是否校验数据完整性
             on_error: 错误处理策略
             progress_callback: 进度回调函数
+            max_workers: 工作线程数 (默认按校验 Hook 的 parallelism_hint 决定，1 为串行)
             
         Returns:
             BatchResult 批量操作结果
         """
-        from ..core.batch import BatchResult, ProgressTracker, ProgressInfo
+        from ..core.batch import BatchResult, ProgressTracker, default_worker_count
         
         if not self._index_decrypted:
             raise IndexNotDecryptedError("需要解密索引才能解包所有文件")
         
+        # list_all 与 EntryTable.values 均按条目存储顺序，可直接按行对应
         all_paths = self.list_all()
         total_files = len(all_paths)
-        total_bytes = sum(self._entries[self._path_hash_func(normalize_path(p))].raw_size 
-                         for p in all_paths)
+        total_bytes = sum(self._entries.column_values('raw_size'))
         
         tracker = ProgressTracker(
             total_files=total_files,
@@ -449,31 +708,135 @@ class ArchiveReader:
         for dir_path in dirs_to_create:
             os.makedirs(dir_path, exist_ok=True)
         
-        # 解包文件
-        for vfs_path in all_paths:
-            try:
-                data = self.read(vfs_path, verify)
-                local_path = os.path.join(output_dir, vfs_path.lstrip('/'))
-                
-                with open(local_path, 'wb') as f:
-                    f.write(data)
-                
-                result.success_count += 1
-                result.total_bytes += len(data)
-                tracker.update(vfs_path, len(data))
+        if self._mmap is None:
+            max_workers = 1
+        elif max_workers is None:
+            hint = getattr(self._checksum_hook, 'parallelism_hint', 'cpu')
+            max_workers = default_worker_count(hint)
+        
+        executor = None
+        if max_workers > 1 and total_files > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = ThreadPoolExecutor(max_workers=min(max_workers, total_files))
+        
+        loaded = self._iter_views(
+            zip(all_paths, self._entries.values()), verify, executor, max_workers * 2
+        )
+        try:
+            for vfs_path, entry, data, error in loaded:
+                if error is None:
+                    try:
+                        local_path = os.path.join(output_dir, vfs_path.lstrip('/'))
+                        if data is None:
+                            size = self._copy_entry(vfs_path, entry, local_path)
+                        else:
+                            # mmap 模式下未压缩条目直接从映射区写出，不复制为 bytes
+                            _write_file(local_path, data)
+                            size = data.nbytes
+                    except Exception as e:
+                        error = e
+                    finally:
+                        if data is not None:
+                            data.release()
                 
-            except Exception as e:
-                if on_error == 'raise':
-                    raise
+                if error is None:
+                    result.success_count += 1
+                    result.total_bytes += size
+                    tracker.update(vfs_path, size)
+                elif on_error == 'raise':
+                    raise error
                 elif on_error == 'skip':
                     result.failed_count += 1
-                    result.failed_files.append((vfs_path, e))
+                    result.failed_files.append((vfs_path, error))
                     tracker.update(vfs_path, 0)
                 elif on_error == 'abort':
                     result.failed_count += 1
-                    result.failed_files.append((vfs_path, e))
+                    result.failed_files.append((vfs_path, error))
                     break
+        finally:
+            # 释放已提前读取但未写出的视图，保证之后可以关闭 mmap
+            loaded.close()
+            if executor is not None:
+                executor.shutdown(wait=True)
         
         result.elapsed_time = tracker.finish()
         return result
+    
+    def _copy_entry(self, vfs_path: str, entry: ArchiveEntry, local_path: str) -> int:
+        """
+        将未压缩条目复制到本地文件 (不校验)
+        
+        优先在内核中复制，不支持时回退为读取后写出。
+        
+        Returns:
+            写出的字节数
+        """
+        if _copy_file_range(self._file.fileno(), entry.offset, entry.packed_size, local_path):
+            return entry.packed_size
+        
+        data = self._view_entry(vfs_path, entry, False)
+        try:
+            _write_file(local_path, data)
+            return data.nbytes
+        finally:
+            data.release()
+    
+    def _iter_views(
+        self,
+        items: Iterable[Tuple[str, ArchiveEntry]],
+        verify: bool,
+        executor,
+        depth: int
+    ):
+        """
+        按顺序产出各条目的 (vfs_path, 条目, memoryview, 异常)
+        
+        每 _PREFETCH_BATCH 个条目提示一次预读。提供 executor 时
+        最多提前 depth 个条目在线程池中读取、解压与校验。
+        未压缩且无需校验的条目不读取，memoryview 为 None，
+        由调用方通过 _copy_entry 在内核中复制。
+        
+        Args:
+            items: (虚拟路径, 条目) 序列
+            verify: 是否校验数据完整性
+            executor: 线程池 (None 为串行)
+            depth: 最多同时在途的条目数
+        """
+        from collections import deque
+        from itertools import islice
+        
+        check = verify and self._checksum_hook is not None
+        
+        def load(vfs_path: str, entry: ArchiveEntry):
+            if entry.algo_id == 0 and not (check and entry.checksum):
+                return entry, None, None
+            try:
+                return entry, self._view_entry(vfs_path, entry, verify), None
+            except Exception as e:
+                return entry, None, e
+        
+        items = iter(items)
+        pending = deque()
+        try:
+            while True:
+                window = list(islice(items, _PREFETCH_BATCH))
+                if not window:
+                    break
+                self._prefetch_entries([entry for _, entry in window])
+                for vfs_path, entry in window:
+                    if executor is None:
+                        yield (vfs_path,) + load(vfs_path, entry)
+                        continue
+                    pending.append((vfs_path, executor.submit(load, vfs_path, entry)))
+                    if len(pending) >= depth:
+                        path, future = pending.popleft()
+                        yield (path,) + future.result()
+            while pending:
+                path, future = pending.popleft()
+                yield (path,) + future.result()
+        finally:
+            for _, future in pending:
+                data = future.result()[1]
+                if data is not None:
+                    data.release()
 
@@ -6,11 +6,12 @@
 提供 Manifest/Archive/JSON 之间的互转功能。
 """
 
+import functools
 import json
 import os
 import time
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Callable, Any, Tuple
+from typing import Optional, Dict, List, Callable, Any, Tuple, TextIO
 
 from .manifest import ManifestBuilder, ManifestReader
 from .archive import ArchiveBuilder, ArchiveReader
@@ -41,6 +42,127 @@ class MergeResult:
     elapsed_time: float = 0.0   # 耗时 (秒)
 
 
+# ==================== JSON 读取 ====================
+
+
+def _load_json_file(path: str) -> Any:
+    """
+    读取 JSON 文件
+    
+    以二进制一次读入后交给 json.loads，省去文本层的增量解码；
+    编码由 json.loads 自动识别 (UTF-8，兼容带 BOM 的文件)。
+    
+    Args:
+        path: JSON 文件路径
+        
+    Returns:
+        解析结果
+    """
+    with open(path, 'rb') as f:
+        return json.loads(f.read())
+
+
+# ==================== JSON 输出 ====================
+
+
+def _dump_manifest_json(
+    fp: TextIO,
+    meta: Dict[str, Any],
+    rows: List[Tuple[str, Optional[int], Optional[str]]],
+    indent: Optional[int] = 2,
+) -> None:
+    """
+    流式写出清单 JSON
+    
+    条目以 (path, size, checksum) 元组逐个序列化，不为每个条目构造 dict。
+    输出格式与 ``json.dump(..., ensure_ascii=False, indent=indent)`` 一致，
+    ``entries`` 固定位于最后。
+    
+    Args:
+        fp: 以文本模式打开的输出文件
+        meta: 除 entries 外的顶层字段 (按顺序输出)
+        rows: (path, size, checksum_hex) 元组列表
+        indent: JSON 缩进 (None 为单行)
+    """
+    dumps = functools.partial(json.dumps, ensure_ascii=False)
+    
+    if indent is None:
+        pad1 = pad2 = pad3 = ''
+        sep = ', '
+    else:
+        step = ' ' * indent if isinstance(indent, int) else indent
+        pad1 = '\n' + step
+        pad2 = pad1 + step
+        pad3 = pad2 + step
+        sep = ','
+    
+    write = fp.write
+    write('{')
+    for key, value in meta.items():
+        write(f'{pad1}{dumps(key)}: {dumps(value)}{sep}')
+    write(f'{pad1}"entries": [')
+    
+    for i, (path, size, checksum) in enumerate(rows):
+        if i:
+            write(sep)
+        write(
+            f'{pad2}{{{pad3}"path": {dumps(path)}{sep}'
+            f'{pad3}"size": {dumps(size)}{sep}'
+            f'{pad3}"checksum": {dumps(checksum)}{pad2}}}'
+        )
+    
+    if rows:
+        write(pad1)
+    write(']')
+    write('\n}' if indent is not None else '}')
+
+
+# ==================== 校验值解析 ====================
+
+
+def _decode_checksums(entries: List[Dict[str, Any]]) -> List[bytes]:
+    """
+    批量将条目中的十六进制 checksum 转换为 bytes
+    
+    所有非空 checksum 长度一致时 (常见情况) 拼接后单次 bytes.fromhex
+    再切片，否则逐条解析。
+    
+    Args:
+        entries: JSON 条目列表
+        
+    Returns:
+        与 entries 一一对应的 checksum 字节列表 (缺失为 b'')
+        
+    Raises:
+        ValueError: checksum 无法解析为十六进制字节
+    """
+    hexes = [entry.get('checksum') or '' for entry in entries]
+    present = [h for h in hexes if h]
+    
+    if present:
+        hex_len = len(present[0])
+        if hex_len % 2 == 0 and all(len(h) == hex_len for h in present):
+            try:
+                big = bytes.fromhex(''.join(present))
+            except ValueError:
+                big = None
+            step = hex_len // 2
+            if big is not None and len(big) == step * len(present):
+                chunks = iter([big[i:i + step] for i in range(0, len(big), step)])
+                return [next(chunks) if h else b'' for h in hexes]
+    
+    # 回退: 逐条解析，出错时给出具体条目
+    checksums = []
+    for entry, checksum_hex in zip(entries, hexes):
+        try:
+            checksums.append(bytes.fromhex(checksum_hex) if checksum_hex else b'')
+        except ValueError as exc:
+            raise ValueError(
+                f"条目 '{entry.get('path')}' 的 checksum 无法解析为十六进制字节: {checksum_hex!r}"
+            ) from exc
+    return checksums
+
+
 class ManifestJsonConverter:
     """
     Manifest 和 JSON 互转
@@ -92,28 +214,23 @@ class ManifestJsonConverter:
             checksum_hook=checksum_hook,
             index_crypto=index_crypto
         ) as reader:
-            entries = []
-            for path in reader.list_all():
-                entry = reader.get_entry(path)
-                entries.append({
-                    'path': path,
-                    'size': entry.raw_size,
-                    'checksum': entry.checksum.hex() if entry.checksum else None
-                })
+            rows = [
+                (path, entry.raw_size, entry.checksum.hex() if entry.checksum else None)
+                for path, entry in reader.iter_entries()
+            ]
             
-            data = {
+            meta = {
                 'version': 2,
                 'magic': reader.file_header.magic.decode('ascii', errors='ignore').rstrip('\x00'),
                 'checksum_algo': algo_id,
                 'checksum_algo_name': get_hook_name(checksum_hook),
                 'index_flags': flags,
                 'index_flags_name': get_hook_name(index_crypto),
-                'entry_count': len(entries),
-                'entries': entries
+                'entry_count': len(rows),
             }
         
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=indent)
+            _dump_manifest_json(f, meta, rows, indent=indent)
     
     @staticmethod
     def json_to_manifest(
@@ -123,7 +240,8 @@ class ManifestJsonConverter:
         path_mappings: Optional[Dict[str, str]] = None,
         checksum_hook_override: Optional[ChecksumHook] = None,
         index_crypto_override: Optional[IndexCryptoHook] = None,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        trust_size: bool = False
     ) -> 'BatchResult':
         """
         将 JSON 转换为 Manifest 文件
@@ -138,14 +256,15 @@ class ManifestJsonConverter:
             checksum_hook_override: 覆盖 JSON 中的校验 Hook
             index_crypto_override: 覆盖 JSON 中的索引加密 Hook
             progress_callback: 进度回调
+            trust_size: 信任 JSON 中的 size 字段，不再 stat 本地文件
+                        (校验值仍从本地文件重新计算)
             
         Returns:
             BatchResult
         """
         from .core.batch import FileItem, BatchResult, ProgressTracker
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _load_json_file(json_path)
         
         # 根据 checksum_algo ID 自动创建 Hook (支持 override)
         if checksum_hook_override:
@@ -193,10 +312,13 @@ class ManifestJsonConverter:
             local_path = resolve_local_path(vfs_path)
             
             try:
-                builder.add_file(local_path, vfs_path)
+                size = entry.get('size') if trust_size else None
+                if size is None:
+                    size = os.path.getsize(local_path)
+                builder.add_file(local_path, vfs_path, expected_size=size)
                 result.success_count += 1
-                result.total_bytes += os.path.getsize(local_path)
-                tracker.update(local_path, os.path.getsize(local_path))
+                result.total_bytes += size
+                tracker.update(local_path, size)
             except Exception as e:
                 result.failed_count += 1
                 result.failed_files.append((local_path, e))
@@ -243,8 +365,7 @@ class ManifestJsonConverter:
             ValueError: JSON 中的 checksum 无法解析为字节序列
             KeyError: JSON 条目缺少必要字段 (``path`` / ``size`` / ``checksum``)
         """
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _load_json_file(json_path)
 
         # 确定 Hook（支持 override）
         if checksum_hook_override:
@@ -268,26 +389,33 @@ class ManifestJsonConverter:
             index_crypto=index_crypto,
         )
 
-        from .utils import split_path, default_path_hash
+        from .utils import split_path_many, default_path_hash_many
         from .core.schema import ManifestEntry
 
-        for entry in data.get('entries', []):
-            vfs_path = entry['path']
-            raw_size = int(entry['size'])
+        path_dict = builder._path_dict
+        # 相邻条目通常位于同一目录，缓存上一个目录的 ID
+        prev_dir = None
+        prev_dir_id = None
 
-            # 信任 JSON 中的 checksum，直接转换为 bytes
-            checksum_hex = entry.get('checksum') or ''
-            try:
-                checksum_bytes = bytes.fromhex(checksum_hex) if checksum_hex else b''
-            except ValueError as exc:
-                raise ValueError(
-                    f"条目 '{vfs_path}' 的 checksum 无法解析为十六进制字节: {checksum_hex!r}"
-                ) from exc
+        entries = data.get('entries', [])
+        # 信任 JSON 中的 checksum，批量转换为 bytes
+        checksums = _decode_checksums(entries)
+        normalized_paths = [normalize_path(entry['path']) for entry in entries]
+        path_hashes = default_path_hash_many(normalized_paths)
+        split_parts = split_path_many(normalized_paths)
+
+        for entry, normalized, path_hash, checksum_bytes, (dir_part, name, ext) in zip(
+            entries, normalized_paths, path_hashes, checksums, split_parts
+        ):
+            raw_size = int(entry['size'])
 
-            normalized = normalize_path(vfs_path)
-            dir_part, name, ext = split_path(normalized)
-            path_hash = default_path_hash(normalized)
-            dir_id, name_id, ext_id = builder._path_dict.add_path(dir_part, name, ext)
+            if dir_part == prev_dir:
+                dir_id = prev_dir_id
+                name_id, ext_id = path_dict.add_name_ext(name, ext)
+            else:
+                dir_id, name_id, ext_id = path_dict.add_path(dir_part, name, ext)
+                prev_dir = dir_part
+                prev_dir_id = dir_id
 
             manifest_entry = ManifestEntry(
                 path_hash=path_hash,
@@ -318,12 +446,15 @@ class ModeConverter:
         # 输出配置
         output_checksum_hook: Optional[ChecksumHook] = None,
         output_index_crypto: Optional[IndexCryptoHook] = None,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        max_workers: Optional[int] = None
     ) -> 'BatchResult':
         """
         将 Archive 转换为 Manifest
         
         仅保留元信息，不包含文件数据。
+        读取解压与校验计算在线程池中并行执行 (zlib/hashlib 会释放 GIL)，
+        条目按原顺序在主线程中写入。
         
         Args:
             archive_path: Archive 文件路径
@@ -334,16 +465,26 @@ class ModeConverter:
             output_checksum_hook: 输出 Manifest 校验 Hook (默认继承)
             output_index_crypto: 输出 Manifest 索引加密 Hook (默认不加密)
             progress_callback: 进度回调
+            max_workers: 工作线程数 (默认按校验 Hook 的 parallelism_hint 决定)
             
         Returns:
             BatchResult
         """
-        from .core.batch import BatchResult, ProgressTracker
+        from concurrent.futures import ThreadPoolExecutor
+        from .core.batch import (
+            BatchResult, ProgressTracker, bounded_map, default_worker_count
+        )
+        from .core.schema import ManifestEntry
+        from .utils import split_path, default_path_hash
         
         # 使用继承的 checksum_hook
         if output_checksum_hook is None:
             output_checksum_hook = checksum_hook
         
+        if max_workers is None:
+            hint = getattr(output_checksum_hook, 'parallelism_hint', 'cpu')
+            max_workers = default_worker_count(hint)
+        
         with ArchiveReader(
             archive_path,
             compression_hooks=compression_hooks,
@@ -352,6 +493,21 @@ class ModeConverter:
         ) as reader:
             all_paths = reader.list_all()
             
+            if not reader.is_mmap:
+                # 传统模式下 read 共享文件指针 (seek + read)，不能并发读取
+                max_workers = 1
+            
+            def process(vfs_path: str):
+                """读取数据并计算校验 (工作线程)，返回 (路径, 大小, 校验值, 异常)"""
+                try:
+                    data = reader.read(vfs_path, verify=False)
+                    checksum = b''
+                    if output_checksum_hook:
+                        checksum = output_checksum_hook.compute(data)
+                    return vfs_path, len(data), checksum, None
+                except Exception as e:
+                    return vfs_path, 0, b'', e
+            
             builder = ManifestBuilder(
                 output_path,
                 magic=reader.file_header.magic,
@@ -366,43 +522,37 @@ class ModeConverter:
             
             result = BatchResult()
             
-            for vfs_path in all_paths:
-                try:
-                    # 从 Archive 读取数据并计算校验
-                    data = reader.read(vfs_path, verify=False)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # 按输入顺序取回结果，条目写入只在主线程进行
+                loaded = bounded_map(executor, process, all_paths, max_workers * 2)
+                for vfs_path, size, checksum, error in loaded:
+                    if error is not None:
+                        result.failed_count += 1
+                        result.failed_files.append((vfs_path, error))
+                        tracker.update(vfs_path, 0)
+                        continue
                     
                     # 手动添加条目 (绕过 add_file 的本地文件检查)
                     normalized = normalize_path(vfs_path)
-                    from .utils import split_path, default_path_hash
                     dir_part, name, ext = split_path(normalized)
                     
                     path_hash = default_path_hash(normalized)
                     dir_id, name_id, ext_id = builder._path_dict.add_path(dir_part, name, ext)
                     
-                    checksum = b''
-                    if output_checksum_hook:
-                        checksum = output_checksum_hook.compute(data)
-                    
-                    from .core.schema import ManifestEntry
                     entry = ManifestEntry(
                         path_hash=path_hash,
                         dir_id=dir_id,
                         name_id=name_id,
                         ext_id=ext_id,
-                        raw_size=len(data),
+                        raw_size=size,
                         checksum=checksum
                     )
                     builder._entries.append(entry)
                     builder._hash_to_path[path_hash] = normalized
                     
                     result.success_count += 1
-                    result.total_bytes += len(data)
-                    tracker.update(vfs_path, len(data))
-                    
-                except Exception as e:
-                    result.failed_count += 1
-                    result.failed_files.append((vfs_path, e))
-                    tracker.update(vfs_path, 0)
+                    result.total_bytes += size
+                    tracker.update(vfs_path, size)
             
             builder.build()
             result.elapsed_time = tracker.finish()
@@ -509,34 +659,35 @@ def _load_manifest_as_dict(source_path: str) -> dict:
     
     if ext == '.json':
         # 直接读取 JSON
-        with open(source_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _load_json_file(source_path)
     else:
-        # 二进制格式，先读取文件头
+        # 二进制格式，mmap 一次后文件头与索引都从同一缓冲区解析
+        import mmap
         from .core.schema import FileHeader
         
-        with open(source_path, 'rb') as f:
-            header = FileHeader.unpack(f.read(FileHeader.SIZE))
-        
-        algo_id = header.checksum_algo
-        flags = header.flags
-        
-        checksum_hook = get_checksum_hook_by_id(algo_id)
-        index_crypto = get_index_crypto_by_flags(flags)
-        
-        with ManifestReader(
-            source_path,
-            checksum_hook=checksum_hook,
-            index_crypto=index_crypto
-        ) as reader:
-            entries = []
-            for path in reader.list_all():
-                entry = reader.get_entry(path)
-                entries.append({
+        with open(source_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header = FileHeader.unpack(mm[:FileHeader.SIZE])
+            
+            algo_id = header.checksum_algo
+            flags = header.flags
+            
+            checksum_hook = get_checksum_hook_by_id(algo_id)
+            index_crypto = get_index_crypto_by_flags(flags)
+            
+            reader = ManifestReader.from_buffer(
+                mm,
+                checksum_hook=checksum_hook,
+                index_crypto=index_crypto
+            )
+            entries = [
+                {
                     'path': path,
                     'size': entry.raw_size,
                     'checksum': entry.checksum.hex() if entry.checksum else None
-                })
+                }
+                for path, entry in reader.iter_entries()
+            ]
             
             return {
                 'version': 2,
@@ -589,26 +740,28 @@ def merge_manifests(
     if not sources:
         return MergeResult()
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     # 1. 加载所有源清单
     manifests = [_load_manifest_as_dict(src) for src in sources]
     
-    # 2. 验证兼容性
-    versions = [m.get('version', 2) for m in manifests]
-    if len(set(versions)) > 1:
-        raise ManifestVersionMismatchError(versions)
-    
-    algos = [m.get('checksum_algo', 0) for m in manifests]
-    if len(set(algos)) > 1:
-        raise ManifestAlgorithmMismatchError(algos)
-    
-    flags_list = [m.get('index_flags', 0) for m in manifests]
-    if len(set(flags_list)) > 1:
-        raise ManifestAlgorithmMismatchError(flags_list)  # 复用异常
+    # 2. 验证兼容性 (与第一个清单比较，遇到首个不一致即报错)
+    base_manifest = manifests[0]
+    for key, default, error_cls in (
+        ('version', 2, ManifestVersionMismatchError),
+        ('checksum_algo', 0, ManifestAlgorithmMismatchError),
+        ('index_flags', 0, ManifestAlgorithmMismatchError),  # 复用异常
+    ):
+        base_value = base_manifest.get(key, default)
+        for manifest in manifests[1:]:
+            value = manifest.get(key, default)
+            if value != base_value:
+                raise error_cls([base_value, value])
     
     # 3. 合并 entries
-    merged_entries: Dict[str, Tuple[int, dict]] = {}  # path -> (source_index, entry)
+    merged_entries: Dict[str, dict] = {}  # path -> entry
+    # 仅 'error' 策略需要记录来源索引
+    first_source: Optional[Dict[str, int]] = {} if on_conflict == "error" else None
     duplicate_count = 0
     
     for src_idx, manifest in enumerate(manifests):
@@ -617,37 +770,40 @@ def merge_manifests(
             
             if path in merged_entries:
                 duplicate_count += 1
-                existing_idx = merged_entries[path][0]
                 
                 if on_conflict == "error":
-                    raise PathConflictError(path, [existing_idx, src_idx])
+                    raise PathConflictError(path, [first_source[path], src_idx])
                 elif on_conflict == "keep_first":
                     continue  # 保留已有的
                 elif on_conflict == "keep_last":
-                    merged_entries[path] = (src_idx, entry)
+                    merged_entries[path] = entry
             else:
-                merged_entries[path] = (src_idx, entry)
+                merged_entries[path] = entry
+                if first_source is not None:
+                    first_source[path] = src_idx
     
     # 4. 构建输出数据
-    base_manifest = manifests[0]
-    output_entries = [
-        {
-            'path': path,
-            'size': entry.get('size'),
-            'checksum': entry.get('checksum')
-        }
-        for path, (_, entry) in merged_entries.items()
-    ]
-    
-    merged_data = {
+    try:
+        # 常见情况: 条目字段齐全，直接索引
+        output_rows = [
+            (path, entry['size'], entry['checksum'])
+            for path, entry in merged_entries.items()
+        ]
+    except KeyError:
+        # 手写 JSON 可能缺少 size/checksum
+        output_rows = [
+            (path, entry.get('size'), entry.get('checksum'))
+            for path, entry in merged_entries.items()
+        ]
+    
+    merged_meta = {
         'version': base_manifest.get('version', 2),
         'magic': base_manifest.get('magic', 'GRIM'),
         'checksum_algo': base_manifest.get('checksum_algo', 0),
         'checksum_algo_name': base_manifest.get('checksum_algo_name'),
         'index_flags': base_manifest.get('index_flags', 0),
         'index_flags_name': base_manifest.get('index_flags_name'),
-        'entry_count': len(output_entries),
-        'entries': output_entries
+        'entry_count': len(output_rows),
     }
     
     # 5. 确定输出格式
@@ -658,7 +814,7 @@ def merge_manifests(
     # 6. 写入输出
     if output_format == "json":
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(merged_data, f, ensure_ascii=False, indent=2)
+            _dump_manifest_json(f, merged_meta, output_rows, indent=2)
     else:
         # 输出二进制，需要重新构建
         if local_base_path is None:
@@ -673,7 +829,7 @@ def merge_manifests(
         # 临时 JSON 处理 - 直接写入再转换
         import tempfile
         with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as tmp:
-            json.dump(merged_data, tmp, ensure_ascii=False)
+            _dump_manifest_json(tmp, merged_meta, output_rows, indent=None)
             tmp_path = tmp.name
         
         try:
@@ -686,10 +842,10 @@ def merge_manifests(
         finally:
             os.unlink(tmp_path)
     
-    elapsed = time.time() - start_time
+    elapsed = time.perf_counter() - start_time
     
     return MergeResult(
-        total_entries=len(output_entries),
+        total_entries=len(output_rows),
         source_count=len(sources),
         duplicate_count=duplicate_count,
         elapsed_time=elapsed
@@ -785,8 +941,7 @@ class ManifestVersionMigrator:
         if target_version not in cls.SUPPORTED_VERSIONS:
             raise ValueError(f"不支持的目标版本: {target_version}")
         
-        with open(source_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _load_json_file(source_path)
         
         source_version = data.get('version', 1)
         
@@ -9,6 +9,7 @@ GrimoireVFS 核心模块
 from .binary_io import BinaryReader, BinaryWriter
 from .schema import FileHeader, IndexHeader, ManifestEntry, ArchiveEntry
 from .string_table import StringTable, PathDictionary
+from .entry_table import EntryTable
 from .batch import (
     FileItem, ProgressInfo, BatchResult, ProgressTracker,
     ErrorPolicy, scan_directory, estimate_total_bytes
@@ -23,6 +24,7 @@ __all__ = [
     "ArchiveEntry",
     "StringTable",
     "PathDictionary",
+    "EntryTable",
     # 批量操作
     "FileItem",
     "ProgressInfo",
@@ -8,8 +8,9 @@
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Callable, Optional, List, Tuple, Iterator, Union
+from typing import Callable, Optional, List, Tuple, Iterable, Iterator, Union
 from pathlib import Path
+import os
 import time
 
 
@@ -30,6 +31,7 @@ class FileItem:
     local_path: str           # 本地文件路径
     vfs_path: Optional[str] = None  # 虚拟路径 (可选)
     algo_id: int = 0          # 压缩算法 ID (仅 Archive)
+    size: Optional[int] = None  # 文件大小 (扫描时缓存，用于估算总大小)
 
 
 @dataclass
@@ -37,8 +39,14 @@ class ProgressInfo:
     """
     进度信息
     
-    传递给进度回调函数的数据结构。
+    传递给进度回调函数的数据结构。每次回调都会新建一个实例，
+    使用 __slots__ 省去实例字典；progress / rate / eta 按需计算。
     """
+    __slots__ = (
+        'current', 'total', 'current_file',
+        'bytes_processed', 'bytes_total', 'elapsed_time'
+    )
+    
     current: int              # 当前已处理文件数
     total: int                # 总文件数
     current_file: str         # 当前正在处理的文件路径
@@ -63,10 +71,11 @@ class ProgressInfo:
     @property
     def eta(self) -> float:
         """预计剩余时间 (秒)"""
-        if self.rate == 0:
+        rate = self.rate
+        if rate == 0:
             return float('inf')
         remaining_bytes = self.bytes_total - self.bytes_processed
-        return remaining_bytes / self.rate
+        return remaining_bytes / rate
 
 
 @dataclass
@@ -120,8 +129,9 @@ class ProgressTracker:
         
         self._current_file = 0
         self._processed_bytes = 0
-        self._start_time = time.time()
-        self._last_callback_time = 0.0
+        self._start_time = time.perf_counter()
+        # perf_counter 起点不确定，用 -inf 保证首次更新必定回调
+        self._last_callback_time = float('-inf')
     
     def update(self, file_path: str, bytes_processed: int = 0) -> None:
         """
@@ -135,7 +145,7 @@ class ProgressTracker:
         self._processed_bytes += bytes_processed
         
         if self._callback:
-            now = time.time()
+            now = time.perf_counter()
             # 限制回调频率
             if now - self._last_callback_time >= self._callback_interval:
                 info = ProgressInfo(
@@ -151,7 +161,59 @@ class ProgressTracker:
     
     def finish(self) -> float:
         """完成并返回总耗时"""
-        return time.time() - self._start_time
+        return time.perf_counter() - self._start_time
+
+
+def default_worker_count(parallelism_hint: str = 'cpu') -> int:
+    """
+    根据 ChecksumHook.parallelism_hint 给出默认工作线程数
+    
+    Args:
+        parallelism_hint: 'cpu' / 'cpu_fast' / 'io'
+        
+    Returns:
+        工作线程数 (至少为 1)
+    """
+    cpu_count = os.cpu_count() or 1
+    if parallelism_hint == 'io':
+        # 与 ThreadPoolExecutor 的默认值一致
+        return min(32, cpu_count + 4)
+    if parallelism_hint == 'cpu_fast':
+        return min(4, cpu_count)
+    return cpu_count
+
+
+def bounded_map(executor, fn: Callable, items: Iterable, depth: int) -> Iterator:
+    """
+    在线程池中执行 fn(item)，按输入顺序产出结果
+    
+    与 executor.map 不同，最多只有 depth 个任务已提交，之后每取走一个
+    结果再提交一个。调用方提前退出 (break / 异常) 时生成器被关闭，
+    尚未开始的任务会被取消，不会继续处理剩余输入。
+    
+    Args:
+        executor: 线程池
+        fn: 任务函数
+        items: 输入序列
+        depth: 最多同时在途的任务数 (至少为 1)
+        
+    Yields:
+        fn(item) 的返回值
+    """
+    from collections import deque
+    
+    depth = max(1, depth)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
 
 
 def scan_directory(
@@ -165,6 +227,7 @@ def scan_directory(
     扫描目录生成 FileItem 迭代器
     
     使用生成器节省内存，适用于大目录。
+    扫描时顺带记录文件大小，estimate_total_bytes 无需再次 stat。
     
     Args:
         directory: 本地目录路径
@@ -179,49 +242,76 @@ def scan_directory(
     import fnmatch
     from ..utils import normalize_path
     
-    base_path = Path(directory)
     mount_point = normalize_path(mount_point)
     
-    def should_exclude(path: Path) -> bool:
+    def should_exclude(name: str) -> bool:
         if not exclude_patterns:
             return False
-        name = path.name
         return any(fnmatch.fnmatch(name, pattern) for pattern in exclude_patterns)
     
-    if recursive:
-        for file_path in base_path.rglob("*"):
-            if file_path.is_file() and not should_exclude(file_path):
-                rel_path = file_path.relative_to(base_path)
-                vfs_path = mount_point + "/" + str(rel_path).replace("\\", "/")
-                yield FileItem(
-                    local_path=str(file_path),
-                    vfs_path=vfs_path,
-                    algo_id=algo_id
-                )
-    else:
-        for file_path in base_path.iterdir():
-            if file_path.is_file() and not should_exclude(file_path):
-                vfs_path = mount_point + "/" + file_path.name
-                yield FileItem(
-                    local_path=str(file_path),
-                    vfs_path=vfs_path,
-                    algo_id=algo_id
-                )
+    for entry, rel_path in _iter_dir_files(str(Path(directory)), recursive):
+        if should_exclude(entry.name):
+            continue
+        try:
+            size = entry.stat().st_size
+        except OSError:
+            size = None
+        yield FileItem(
+            local_path=entry.path,
+            vfs_path=mount_point + "/" + rel_path,
+            algo_id=algo_id,
+            size=size
+        )
+
+
+def _iter_dir_files(root: str, recursive: bool) -> Iterator[Tuple[os.DirEntry, str]]:
+    """
+    使用 os.scandir 遍历目录下的文件
+    
+    DirEntry 的类型判断直接使用 readdir 返回的文件类型，
+    大多数文件系统上不需要为每个条目额外 stat。
+    与 Path.rglob 一致，不进入指向目录的符号链接。
+    
+    Args:
+        root: 根目录
+        recursive: 是否递归子目录
+        
+    Yields:
+        (DirEntry, 以 / 分隔的相对路径) 元组
+    """
+    stack = [(root, "")]
+    while stack:
+        dir_path, prefix = stack.pop()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry, prefix + entry.name
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, prefix + entry.name + "/"))
 
 
 def estimate_total_bytes(items: List[FileItem]) -> int:
     """
     估算文件总大小
     
+    优先使用 FileItem.size 中缓存的大小，缺失时才 stat。
+    
     Args:
         items: FileItem 列表
         
     Returns:
         总字节数
     """
-    import os
+    sizes = [item.size for item in items]
+    if None not in sizes:
+        # 全部来自 scan_directory 时只需一次求和
+        return sum(sizes)
+    
     total = 0
-    for item in items:
+    for item, size in zip(items, sizes):
+        if size is not None:
+            total += size
+            continue
         try:
             total += os.path.getsize(item.local_path)
         except OSError:
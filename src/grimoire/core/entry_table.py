@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+列式条目表
+
+以列 (SoA) 形式保存 Entry Table，按需构造 ManifestEntry / ArchiveEntry。
+"""
+
+import struct
+from array import array
+from bisect import bisect_left
+from dataclasses import fields
+from typing import Iterator, List, Sequence, Type, Union
+
+
+class EntryTable:
+    """
+    列式条目表
+
+    每个数值字段保存为一个紧凑的 array.array，校验值保留在原始
+    Entry Table 字节中按偏移切片，不为每个条目常驻 Python 对象。
+    对外提供以 path_hash 为键的只读映射接口 (in / [] / get / keys / values)，
+    查找通过有序 path_hash 数组二分完成，条目对象仅在访问时构造。
+    """
+
+    def __init__(
+        self,
+        entry_cls: Type,
+        data: Union[bytes, memoryview],
+        count: int,
+        checksum_size: int = 0
+    ):
+        """
+        从 Entry Table 字节构建
+
+        Args:
+            entry_cls: 条目类型 (ManifestEntry 或 ArchiveEntry)
+            data: Entry Table 字节数据
+            count: 条目数量
+            checksum_size: 校验值长度
+        """
+        self._entry_cls = entry_cls
+        self._checksum_size = checksum_size
+        self._entry_size = entry_cls.entry_size(checksum_size)
+        self._count = count
+        table_size = self._entry_size * count
+        if type(data) is bytes and len(data) == table_size:
+            self._table = data
+        else:
+            self._table = bytes(memoryview(data)[:table_size])
+
+        # 字段名与类型码 (不含 checksum)，顺序与 BASE_FORMAT 一致
+        codes = entry_cls.BASE_FORMAT.lstrip('<')
+        self._field_names = [f.name for f in fields(entry_cls)][:len(codes)]
+
+        # 跳过校验值，一次解析所有数值字段并按列存储
+        row_struct = struct.Struct(f'{entry_cls.BASE_FORMAT}{checksum_size}x')
+        rows = row_struct.iter_unpack(self._table)
+        columns = list(zip(*rows)) or [()] * len(codes)
+        self._columns: List[array] = [
+            array(code, column) for code, column in zip(codes, columns)
+        ]
+
+        self._build_lookup()
+
+    def _build_lookup(self) -> None:
+        """
+        构建按 path_hash 排序的查找表
+
+        有序的 uint64 数组 + 二分查找代替 dict，每个条目仅占 12 字节。
+        path_hash 重复时保留最后一行 (与逐条写入 dict 的语义一致)。
+        """
+        hashes = self._columns[0]
+        order = sorted(range(len(hashes)), key=hashes.__getitem__)
+
+        sorted_hashes = array('Q')
+        sorted_rows = array('I')
+        for row in order:
+            path_hash = hashes[row]
+            if sorted_hashes and sorted_hashes[-1] == path_hash:
+                sorted_rows[-1] = row
+            else:
+                sorted_hashes.append(path_hash)
+                sorted_rows.append(row)
+
+        self._sorted_hashes = sorted_hashes
+        self._sorted_rows = sorted_rows
+
+        # 无重复时按存储顺序遍历全部行，否则只遍历保留的行
+        if len(sorted_rows) == len(hashes):
+            self._rows: Sequence[int] = range(len(hashes))
+        else:
+            self._rows = sorted(sorted_rows)
+
+    def _find(self, path_hash: int) -> int:
+        """二分查找 path_hash 所在行，不存在返回 -1"""
+        sorted_hashes = self._sorted_hashes
+        i = bisect_left(sorted_hashes, path_hash)
+        if i < len(sorted_hashes) and sorted_hashes[i] == path_hash:
+            return self._sorted_rows[i]
+        return -1
+
+    def __len__(self) -> int:
+        return len(self._sorted_hashes)
+
+    def __contains__(self, path_hash: int) -> bool:
+        return self._find(path_hash) >= 0
+
+    def __getitem__(self, path_hash: int):
+        row = self._find(path_hash)
+        if row < 0:
+            raise KeyError(path_hash)
+        return self.entry_at(row)
+
+    def get(self, path_hash: int, default=None):
+        """根据 path_hash 获取条目，不存在返回 default"""
+        row = self._find(path_hash)
+        if row < 0:
+            return default
+        return self.entry_at(row)
+
+    def keys(self) -> List[int]:
+        """所有 path_hash (按存储顺序)"""
+        hashes = self._columns[0]
+        return [hashes[row] for row in self._rows]
+
+    def values(self) -> Iterator:
+        """按存储顺序迭代所有条目"""
+        for row in self._rows:
+            yield self.entry_at(row)
+
+    def column(self, name: str) -> array:
+        """
+        获取指定字段的整列数据
+
+        Args:
+            name: 字段名 (如 'path_hash', 'raw_size')
+
+        Returns:
+            该字段的 array.array
+        """
+        return self._columns[self._field_names.index(name)]
+
+    def column_values(self, name: str) -> List[int]:
+        """
+        按迭代顺序 (与 keys / values 一致) 获取字段值列表
+
+        Args:
+            name: 字段名
+
+        Returns:
+            字段值列表
+        """
+        column = self.column(name)
+        if type(self._rows) is range:
+            return column.tolist()
+        return [column[row] for row in self._rows]
+    
+    def entry_at(self, row: int):
+        """
+        构造指定行的条目对象
+
+        Args:
+            row: 行号
+
+        Returns:
+            ManifestEntry / ArchiveEntry 实例
+        """
+        start = row * self._entry_size + self._entry_cls.BASE_SIZE
+        checksum = self._table[start:start + self._checksum_size]
+        return self._entry_cls(
+            *[column[row] for column in self._columns], checksum
+        )
@@ -6,9 +6,12 @@ GrimoireVFS 数据结构定义
 定义 FileHeader、IndexHeader、ManifestEntry、ArchiveEntry 等核心数据结构。
 """
 
+import functools
+import operator
 import struct
-from dataclasses import dataclass, field
-from typing import ClassVar, Optional
+import sys
+from dataclasses import dataclass
+from typing import ClassVar, Iterable, Optional, Union
 
 
 # ==================== 常量定义 ====================
@@ -26,9 +29,21 @@ ENTRY_FLAG_COMPRESSED = 0x01
 ENTRY_FLAG_EXTERNAL = 0x02
 
 
+# dataclass(slots=True) 需要 Python 3.10+，旧版本回退为普通 dataclass
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+# ==================== 辅助函数 ====================
+
+@functools.lru_cache(maxsize=None)
+def _entry_struct(base_format: str, checksum_size: int) -> struct.Struct:
+    """获取 "基础字段 + 定长校验值" 的整条目 Struct (按校验值长度缓存)"""
+    return struct.Struct(f'{base_format}{checksum_size}s')
+
+
 # ==================== 文件头 ====================
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class FileHeader:
     """
     文件头 (32 bytes)
@@ -37,6 +52,7 @@ class FileHeader:
     """
     FORMAT: ClassVar[str] = '<4sBBBBQIQI'
     SIZE: ClassVar[int] = 32
+    STRUCT: ClassVar[struct.Struct] = struct.Struct(FORMAT)
     
     magic: bytes = b'GRIM'
     version: int = 3
@@ -50,8 +66,7 @@ class FileHeader:
     
     def pack(self) -> bytes:
         """序列化为字节"""
-        return struct.pack(
-            self.FORMAT,
+        return self.STRUCT.pack(
             self.magic,
             self.version,
             self.mode,
@@ -66,7 +81,7 @@ class FileHeader:
     @classmethod
     def unpack(cls, data: bytes) -> 'FileHeader':
         """从字节反序列化"""
-        values = struct.unpack(cls.FORMAT, data)
+        values = cls.STRUCT.unpack_from(data)
         return cls(
             magic=values[0],
             version=values[1],
@@ -82,52 +97,49 @@ class FileHeader:
 
 # ==================== 索引头 ====================
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class IndexHeader:
     """
     索引头 (16 bytes)
     
     位于 Index Block 开头，描述字典和 Entry 的元信息。
     """
-    FORMAT: ClassVar[str] = '<HIHIB3s'
+    FORMAT: ClassVar[str] = '<HIHIB3x'  # 末尾 3 字节保留 (写入 0，读取时忽略)
     SIZE: ClassVar[int] = 16
+    STRUCT: ClassVar[struct.Struct] = struct.Struct(FORMAT)
     
     dir_count: int = 0        # 目录字典条目数
     name_count: int = 0       # 文件名字典条目数
     ext_count: int = 0        # 扩展名字典条目数
     string_table_size: int = 0  # String Tables 总大小 (bytes)
     checksum_size: int = 0    # 单个校验值大小 (bytes)
-    _reserved: bytes = field(default=b'\x00\x00\x00', repr=False)
     
     def pack(self) -> bytes:
         """序列化为字节"""
-        return struct.pack(
-            self.FORMAT,
+        return self.STRUCT.pack(
             self.dir_count,
             self.name_count,
             self.ext_count,
             self.string_table_size,
-            self.checksum_size,
-            self._reserved
+            self.checksum_size
         )
     
     @classmethod
     def unpack(cls, data: bytes) -> 'IndexHeader':
         """从字节反序列化"""
-        values = struct.unpack(cls.FORMAT, data)
+        values = cls.STRUCT.unpack_from(data)
         return cls(
             dir_count=values[0],
             name_count=values[1],
             ext_count=values[2],
             string_table_size=values[3],
-            checksum_size=values[4],
-            _reserved=values[5]
+            checksum_size=values[4]
         )
 
 
 # ==================== 数据头 (仅 Archive) ====================
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class DataHeader:
     """
     数据头 (16 bytes)
@@ -136,24 +148,40 @@ class DataHeader:
     """
     FORMAT: ClassVar[str] = '<4sIQ'
     SIZE: ClassVar[int] = 16
+    STRUCT: ClassVar[struct.Struct] = struct.Struct(FORMAT)
+    MAGIC: ClassVar[bytes] = b'DATA'
+    # 魔法数按小端 u32 解释后的整数值，用于直接校验原始字节
+    MAGIC_INT: ClassVar[int] = int.from_bytes(MAGIC, 'little')
+    _MAGIC_STRUCT: ClassVar[struct.Struct] = struct.Struct('<I')
     
-    magic: bytes = b'DATA'
+    magic: bytes = MAGIC
     block_count: int = 0      # 数据块数量 (= entry_count)
     total_size: int = 0       # Data Block 总大小
     
     def pack(self) -> bytes:
         """序列化为字节"""
-        return struct.pack(
-            self.FORMAT,
+        return self.STRUCT.pack(
             self.magic,
             self.block_count,
             self.total_size
         )
     
+    @classmethod
+    def has_valid_magic(cls, data: bytes) -> bool:
+        """
+        检查原始字节开头是否为 DATA 魔法数
+        
+        以 u32 整数比较，无需先构造 DataHeader。
+        
+        Args:
+            data: 数据头原始字节 (至少 4 字节)
+        """
+        return cls._MAGIC_STRUCT.unpack_from(data)[0] == cls.MAGIC_INT
+    
     @classmethod
     def unpack(cls, data: bytes) -> 'DataHeader':
         """从字节反序列化"""
-        values = struct.unpack(cls.FORMAT, data)
+        values = cls.STRUCT.unpack_from(data)
         return cls(
             magic=values[0],
             block_count=values[1],
@@ -163,7 +191,7 @@ class DataHeader:
 
 # ==================== Manifest Entry ====================
 
-@dataclass
+@dataclass(repr=False, **_DATACLASS_OPTIONS)
 class ManifestEntry:
     """
     Manifest 条目 (24 bytes + checksum)
@@ -172,6 +200,10 @@ class ManifestEntry:
     """
     BASE_FORMAT: ClassVar[str] = '<QHIHQ'
     BASE_SIZE: ClassVar[int] = 24
+    BASE_STRUCT: ClassVar[struct.Struct] = struct.Struct(BASE_FORMAT)
+    _FIELD_GETTER: ClassVar[operator.attrgetter] = operator.attrgetter(
+        'path_hash', 'dir_id', 'name_id', 'ext_id', 'raw_size', 'checksum'
+    )
     
     path_hash: int = 0      # 完整路径的 xxHash64
     dir_id: int = 0         # 目录字典索引
@@ -180,10 +212,13 @@ class ManifestEntry:
     raw_size: int = 0       # 原始文件大小
     checksum: bytes = b''   # 校验值 (长度由 IndexHeader.checksum_size 决定)
     
+    def __repr__(self) -> str:
+        # 条目数量可达数十万，仅输出标识字段，避免逐字段 repr
+        return f"ManifestEntry({self.path_hash:#018x})"
+    
     def pack(self) -> bytes:
         """序列化为字节"""
-        base = struct.pack(
-            self.BASE_FORMAT,
+        base = self.BASE_STRUCT.pack(
             self.path_hash,
             self.dir_id,
             self.name_id,
@@ -193,10 +228,23 @@ class ManifestEntry:
         return base + self.checksum
     
     @classmethod
-    def unpack(cls, data: bytes, checksum_size: int = 0) -> 'ManifestEntry':
-        """从字节反序列化"""
-        base_values = struct.unpack(cls.BASE_FORMAT, data[:cls.BASE_SIZE])
-        checksum = data[cls.BASE_SIZE:cls.BASE_SIZE + checksum_size]
+    def unpack(
+        cls,
+        data: Union[bytes, memoryview],
+        checksum_size: int = 0,
+        offset: int = 0
+    ) -> 'ManifestEntry':
+        """
+        从字节反序列化
+        
+        Args:
+            data: 字节数据 (可为整个 Entry Table 的 memoryview)
+            checksum_size: 校验值长度
+            offset: 条目在 data 中的起始偏移
+        """
+        base_values = cls.BASE_STRUCT.unpack_from(data, offset)
+        start = offset + cls.BASE_SIZE
+        checksum = bytes(data[start:start + checksum_size])
         return cls(
             path_hash=base_values[0],
             dir_id=base_values[1],
@@ -206,6 +254,61 @@ class ManifestEntry:
             checksum=checksum
         )
     
+    @classmethod
+    def pack_many(
+        cls,
+        entries: Iterable['ManifestEntry'],
+        checksum_size: int = 0
+    ) -> bytes:
+        """
+        批量序列化为连续的 Entry Table
+        
+        每个条目通过 attrgetter 一次取出全部字段，由整条目 Struct
+        直接打包 (校验值按 checksum_size 定长写入)，见 pack_many_into。
+        
+        Args:
+            entries: 条目序列
+            checksum_size: 校验值长度
+            
+        Returns:
+            Entry Table 字节数据
+        """
+        entries = list(entries)
+        out = bytearray(cls.entry_size(checksum_size) * len(entries))
+        cls.pack_many_into(entries, out, 0, checksum_size)
+        return bytes(out)
+    
+    @classmethod
+    def pack_many_into(
+        cls,
+        entries: Iterable['ManifestEntry'],
+        out: bytearray,
+        offset: int = 0,
+        checksum_size: int = 0
+    ) -> int:
+        """
+        批量序列化到预分配的缓冲区
+        
+        逐条 pack_into 写入 out，不为每个条目创建中间 bytes。
+        
+        Args:
+            entries: 条目序列
+            out: 可写缓冲区 (bytearray / 可写 memoryview / mmap)
+            offset: 起始写入偏移
+            checksum_size: 校验值长度
+            
+        Returns:
+            写入结束后的偏移
+        """
+        entry_struct = _entry_struct(cls.BASE_FORMAT, checksum_size)
+        pack_into = entry_struct.pack_into
+        stride = entry_struct.size
+        get_values = cls._FIELD_GETTER
+        for entry in entries:
+            pack_into(out, offset, *get_values(entry))
+            offset += stride
+        return offset
+    
     @classmethod
     def entry_size(cls, checksum_size: int) -> int:
         """计算单个 Entry 的总大小"""
@@ -214,7 +317,7 @@ class ManifestEntry:
 
 # ==================== Archive Entry ====================
 
-@dataclass
+@dataclass(repr=False, **_DATACLASS_OPTIONS)
 class ArchiveEntry:
     """
     Archive 条目 (42 bytes + checksum)
@@ -223,6 +326,11 @@ class ArchiveEntry:
     """
     BASE_FORMAT: ClassVar[str] = '<QHIHQQQBB'
     BASE_SIZE: ClassVar[int] = 42
+    BASE_STRUCT: ClassVar[struct.Struct] = struct.Struct(BASE_FORMAT)
+    _FIELD_GETTER: ClassVar[operator.attrgetter] = operator.attrgetter(
+        'path_hash', 'dir_id', 'name_id', 'ext_id', 'offset',
+        'packed_size', 'raw_size', 'algo_id', 'flags', 'checksum'
+    )
     
     path_hash: int = 0      # 完整路径的 xxHash64
     dir_id: int = 0         # 目录字典索引
@@ -235,10 +343,13 @@ class ArchiveEntry:
     flags: int = 0          # Entry 标志位
     checksum: bytes = b''   # 校验值
     
+    def __repr__(self) -> str:
+        # 条目数量可达数十万，仅输出标识字段，避免逐字段 repr
+        return f"ArchiveEntry({self.path_hash:#018x})"
+    
     def pack(self) -> bytes:
         """序列化为字节"""
-        base = struct.pack(
-            self.BASE_FORMAT,
+        base = self.BASE_STRUCT.pack(
             self.path_hash,
             self.dir_id,
             self.name_id,
@@ -252,10 +363,23 @@ class ArchiveEntry:
         return base + self.checksum
     
     @classmethod
-    def unpack(cls, data: bytes, checksum_size: int = 0) -> 'ArchiveEntry':
-        """从字节反序列化"""
-        base_values = struct.unpack(cls.BASE_FORMAT, data[:cls.BASE_SIZE])
-        checksum = data[cls.BASE_SIZE:cls.BASE_SIZE + checksum_size]
+    def unpack(
+        cls,
+        data: Union[bytes, memoryview],
+        checksum_size: int = 0,
+        offset: int = 0
+    ) -> 'ArchiveEntry':
+        """
+        从字节反序列化
+        
+        Args:
+            data: 字节数据 (可为整个 Entry Table 的 memoryview)
+            checksum_size: 校验值长度
+            offset: 条目在 data 中的起始偏移
+        """
+        base_values = cls.BASE_STRUCT.unpack_from(data, offset)
+        start = offset + cls.BASE_SIZE
+        checksum = bytes(data[start:start + checksum_size])
         return cls(
             path_hash=base_values[0],
             dir_id=base_values[1],
@@ -269,6 +393,61 @@ class ArchiveEntry:
             checksum=checksum
         )
     
+    @classmethod
+    def pack_many(
+        cls,
+        entries: Iterable['ArchiveEntry'],
+        checksum_size: int = 0
+    ) -> bytes:
+        """
+        批量序列化为连续的 Entry Table
+        
+        每个条目通过 attrgetter 一次取出全部字段，由整条目 Struct
+        直接打包 (校验值按 checksum_size 定长写入)，见 pack_many_into。
+        
+        Args:
+            entries: 条目序列
+            checksum_size: 校验值长度
+            
+        Returns:
+            Entry Table 字节数据
+        """
+        entries = list(entries)
+        out = bytearray(cls.entry_size(checksum_size) * len(entries))
+        cls.pack_many_into(entries, out, 0, checksum_size)
+        return bytes(out)
+    
+    @classmethod
+    def pack_many_into(
+        cls,
+        entries: Iterable['ArchiveEntry'],
+        out: bytearray,
+        offset: int = 0,
+        checksum_size: int = 0
+    ) -> int:
+        """
+        批量序列化到预分配的缓冲区
+        
+        逐条 pack_into 写入 out，不为每个条目创建中间 bytes。
+        
+        Args:
+            entries: 条目序列
+            out: 可写缓冲区 (bytearray / 可写 memoryview / mmap)
+            offset: 起始写入偏移
+            checksum_size: 校验值长度
+            
+        Returns:
+            写入结束后的偏移
+        """
+        entry_struct = _entry_struct(cls.BASE_FORMAT, checksum_size)
+        pack_into = entry_struct.pack_into
+        stride = entry_struct.size
+        get_values = cls._FIELD_GETTER
+        for entry in entries:
+            pack_into(out, offset, *get_values(entry))
+            offset += stride
+        return offset
+    
     @classmethod
     def entry_size(cls, checksum_size: int) -> int:
         """计算单个 Entry 的总大小"""
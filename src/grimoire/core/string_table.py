@@ -6,12 +6,92 @@
 提供 StringTable 和 PathDictionary 类，用于管理三级路径字典。
 """
 
-from typing import Dict, List, Tuple, TYPE_CHECKING
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .binary_io import BinaryWriter, BinaryReader
 
 
+_U16 = struct.Struct('<H')
+
+
+def _ascii_text(data: bytes) -> Optional[str]:
+    """
+    整块数据均为 ASCII 时一次解码为 str，否则返回 None
+
+    ASCII 下字节偏移即字符偏移，可直接按偏移切片 str，
+    省去逐条切片 bytes 再解码。
+
+    Args:
+        data: 字节数据
+
+    Returns:
+        解码后的 str 或 None
+    """
+    if isinstance(data, (bytes, bytearray)) and data.isascii():
+        return data.decode('ascii')
+    return None
+
+
+def _decode_strings(data: bytes, count: int, offset: int = 0,
+                    text: Optional[str] = None) -> Tuple[List[str], int]:
+    """
+    单次遍历解码连续的长度前缀字符串
+
+    格式: [len1: u16][utf8_1][len2: u16][utf8_2]...
+
+    Args:
+        data: 字节数据
+        count: 字符串数量
+        offset: 起始偏移
+        text: _ascii_text(data) 的结果，提供时直接切片 str
+
+    Returns:
+        (字符串列表, 结束偏移) 元组
+
+    Raises:
+        EOFError: 数据不足
+    """
+    unpack_from = _U16.unpack_from
+    size = len(data)
+    strings = []
+    append = strings.append
+    for _ in range(count):
+        if offset + 2 > size:
+            raise EOFError(f"字符串表结束: 偏移 {offset} 处缺少长度字段")
+        (length,) = unpack_from(data, offset)
+        offset += 2
+        end = offset + length
+        if end > size:
+            raise EOFError(
+                f"字符串表结束: 期望读取 {length} 字节，实际只有 {size - offset} 字节"
+            )
+        if text is not None:
+            append(text[offset:end])
+        else:
+            append(data[offset:end].decode('utf-8'))
+        offset = end
+    return strings, offset
+
+
+def _encode_strings(strings: Iterable[str], out: bytearray) -> None:
+    """
+    将字符串按长度前缀格式追加到缓冲区
+
+    格式: [len1: u16][utf8_1][len2: u16][utf8_2]...
+
+    Args:
+        strings: 字符串序列
+        out: 输出缓冲区 (原地追加，整体线性增长)
+    """
+    pack_u16 = _U16.pack
+    for s in strings:
+        encoded = s.encode('utf-8')
+        out += pack_u16(len(encoded))
+        out += encoded
+
+
 class StringTable:
     """
     字符串字典
@@ -22,7 +102,30 @@ class StringTable:
     
     def __init__(self):
         self._strings: List[str] = []
-        self._index: Dict[str, int] = {}
+        # 反向索引仅在 add / in 时需要，从字节解析的表延迟构建
+        self._index: Optional[Dict[str, int]] = {}
+    
+    @classmethod
+    def from_strings(cls, strings: List[str]) -> 'StringTable':
+        """
+        直接由已解码的字符串列表构建 (不复制列表)
+        
+        Args:
+            strings: 字符串列表，下标即索引
+            
+        Returns:
+            StringTable 实例
+        """
+        table = cls()
+        table._strings = strings
+        table._index = None
+        return table
+    
+    def _get_index(self) -> Dict[str, int]:
+        """获取 (必要时构建) 字符串 -> 索引映射"""
+        if self._index is None:
+            self._index = {s: i for i, s in enumerate(self._strings)}
+        return self._index
     
     def add(self, s: str) -> int:
         """
@@ -36,12 +139,13 @@ class StringTable:
         Returns:
             字符串的索引
         """
-        if s in self._index:
-            return self._index[s]
+        index = self._get_index()
+        if s in index:
+            return index[s]
         
         idx = len(self._strings)
         self._strings.append(s)
-        self._index[s] = idx
+        index[s] = idx
         return idx
     
     def get(self, index: int) -> str:
@@ -65,7 +169,7 @@ class StringTable:
     
     def __contains__(self, s: str) -> bool:
         """检查字符串是否存在"""
-        return s in self._index
+        return s in self._get_index()
     
     def __iter__(self):
         """迭代所有字符串"""
@@ -83,10 +187,20 @@ class StringTable:
         Returns:
             写入的字节数
         """
-        start = writer.position
-        for s in self._strings:
-            writer.write_string(s)
-        return writer.position - start
+        return writer.write_bytes(self.to_bytes())
+    
+    def to_bytes(self) -> bytes:
+        """
+        序列化为字节
+        
+        格式: [len1: u16][utf8_1][len2: u16][utf8_2]...
+        
+        Returns:
+            字节数据
+        """
+        out = bytearray()
+        _encode_strings(self._strings, out)
+        return bytes(out)
     
     @classmethod
     def unpack(cls, reader: 'BinaryReader', count: int) -> 'StringTable':
@@ -107,6 +221,11 @@ class StringTable:
             table._index[s] = len(table._strings) - 1
         return table
     
+    @property
+    def strings(self) -> List[str]:
+        """按索引排列的字符串列表 (只读使用)"""
+        return self._strings
+    
     @classmethod
     def from_bytes(cls, data: bytes, count: int) -> 'StringTable':
         """
@@ -119,11 +238,8 @@ class StringTable:
         Returns:
             StringTable 实例
         """
-        import io
-        from .binary_io import BinaryReader
-        
-        reader = BinaryReader(io.BytesIO(data))
-        return cls.unpack(reader, count)
+        strings, _ = _decode_strings(data, count, text=_ascii_text(data))
+        return cls.from_strings(strings)
 
 
 class PathDictionary:
@@ -157,6 +273,21 @@ class PathDictionary:
             self.exts.add(ext)
         )
     
+    def add_name_ext(self, name: str, ext: str) -> Tuple[int, int]:
+        """
+        仅添加文件名和扩展名
+        
+        用于连续条目目录相同时跳过目录查找。
+        
+        Args:
+            name: 文件名 (不含扩展名)
+            ext: 扩展名 (含点号)
+            
+        Returns:
+            (name_id, ext_id) 元组
+        """
+        return self.names.add(name), self.exts.add(ext)
+    
     def get_path(self, dir_id: int, name_id: int, ext_id: int) -> str:
         """
         根据 ID 重建完整路径
@@ -178,6 +309,36 @@ class PathDictionary:
             return f"/{name}{ext}"
         return f"{dir_path}/{name}{ext}"
     
+    def build_paths(
+        self,
+        dir_ids: Iterable[int],
+        name_ids: Iterable[int],
+        ext_ids: Iterable[int]
+    ) -> List[str]:
+        """
+        批量重建完整路径
+        
+        每个目录的前缀只拼接一次，之后按 ID 直接索引列表，
+        结果与逐条调用 get_path 一致。
+        
+        Args:
+            dir_ids: 目录索引序列
+            name_ids: 文件名索引序列
+            ext_ids: 扩展名索引序列
+            
+        Returns:
+            完整路径列表
+        """
+        prefixes = [
+            "/" if d == "/" else f"{d}/" for d in self.dirs.strings
+        ]
+        names = self.names.strings
+        exts = self.exts.strings
+        return [
+            prefixes[d] + names[n] + exts[e]
+            for d, n, e in zip(dir_ids, name_ids, ext_ids)
+        ]
+    
     def pack(self, writer: 'BinaryWriter') -> int:
         """
         序列化到 BinaryWriter
@@ -190,11 +351,22 @@ class PathDictionary:
         Returns:
             写入的字节数
         """
-        start = writer.position
-        self.dirs.pack(writer)
-        self.names.pack(writer)
-        self.exts.pack(writer)
-        return writer.position - start
+        return writer.write_bytes(self.to_bytes())
+    
+    def to_bytes(self) -> bytes:
+        """
+        序列化为字节 (三个字典写入同一缓冲区)
+        
+        顺序: dirs → names → exts
+        
+        Returns:
+            字节数据
+        """
+        out = bytearray()
+        _encode_strings(self.dirs.strings, out)
+        _encode_strings(self.names.strings, out)
+        _encode_strings(self.exts.strings, out)
+        return bytes(out)
     
     @classmethod
     def unpack(cls, reader: 'BinaryReader', 
@@ -217,6 +389,36 @@ class PathDictionary:
         path_dict.exts = StringTable.unpack(reader, ext_count)
         return path_dict
     
+    @classmethod
+    def from_bytes(cls, data: bytes,
+                   dir_count: int, name_count: int, ext_count: int) -> 'PathDictionary':
+        """
+        从 String Tables 原始字节单次遍历反序列化
+        
+        Args:
+            data: String Tables 字节数据 (dirs → names → exts)
+            dir_count: 目录数量
+            name_count: 文件名数量
+            ext_count: 扩展名数量
+            
+        Returns:
+            PathDictionary 实例
+            
+        Raises:
+            EOFError: 数据不足
+        """
+        # 整块为 ASCII (常见情况) 时只解码一次，各字符串按偏移切片
+        text = _ascii_text(data)
+        dirs, offset = _decode_strings(data, dir_count, 0, text)
+        names, offset = _decode_strings(data, name_count, offset, text)
+        exts, _ = _decode_strings(data, ext_count, offset, text)
+        
+        path_dict = cls()
+        path_dict.dirs = StringTable.from_strings(dirs)
+        path_dict.names = StringTable.from_strings(names)
+        path_dict.exts = StringTable.from_strings(exts)
+        return path_dict
+    
     @property
     def stats(self) -> Dict[str, int]:
         """返回字典统计信息"""
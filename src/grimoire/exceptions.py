@@ -29,6 +29,9 @@ class HashCollisionError(GrimoireError):
             f"路径 Hash 冲突: '{path1}' 与 '{path2}' "
             f"产生相同的 Hash 值 {hash_value:#018x}"
         )
+    
+    def __reduce__(self):
+        return type(self), (self.path1, self.path2, self.hash_value)
 
 
 class CorruptedDataError(GrimoireError):
@@ -45,6 +48,9 @@ class CorruptedDataError(GrimoireError):
             f"文件 '{vfs_path}' 校验失败: "
             f"期望 {expected.hex()}, 实际 {actual.hex()}"
         )
+    
+    def __reduce__(self):
+        return type(self), (self.vfs_path, self.expected, self.actual)
 
 
 class UnknownAlgorithmError(GrimoireError):
@@ -57,6 +63,9 @@ class UnknownAlgorithmError(GrimoireError):
         self.algo_id = algo_id
         self.algo_type = algo_type
         super().__init__(f"未知的 {algo_type} ID: {algo_id}")
+    
+    def __reduce__(self):
+        return type(self), (self.algo_id, self.algo_type)
 
 
 class InvalidFormatError(GrimoireError):
@@ -86,6 +95,9 @@ class VersionMismatchError(GrimoireError):
             f"不支持的文件版本 {file_version}, "
             f"支持的版本: {supported_versions}"
         )
+    
+    def __reduce__(self):
+        return type(self), (self.file_version, self.supported_versions)
 
 
 class IndexNotDecryptedError(GrimoireError):
@@ -119,6 +131,9 @@ class ManifestVersionMismatchError(ManifestMergeError):
         super().__init__(
             f"清单版本不匹配，无法合并: {versions}"
         )
+    
+    def __reduce__(self):
+        return type(self), (self.versions,)
 
 
 class ManifestAlgorithmMismatchError(ManifestMergeError):
@@ -132,6 +147,9 @@ class ManifestAlgorithmMismatchError(ManifestMergeError):
         super().__init__(
             f"校验算法不匹配，无法合并: {algorithms}"
         )
+    
+    def __reduce__(self):
+        return type(self), (self.algorithms,)
 
 
 class PathConflictError(ManifestMergeError):
@@ -146,3 +164,6 @@ class PathConflictError(ManifestMergeError):
         super().__init__(
             f"路径冲突: '{path}' 在多个源清单中存在 (索引: {source_indices})"
         )
+    
+    def __reduce__(self):
+        return type(self), (self.path, self.source_indices)
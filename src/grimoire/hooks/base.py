@@ -6,7 +6,9 @@ Hook 基类定义
 定义压缩、校验、加密和路径 Hash 的抽象接口。
 """
 
+import hmac
 from abc import ABC, abstractmethod
+from typing import Any, ClassVar, Iterable, List
 
 
 class CompressionHook(ABC):
@@ -56,6 +58,25 @@ class CompressionHook(ABC):
             解压后的数据
         """
         pass
+    
+    def decompress_into(self, data, out: memoryview) -> int:
+        """
+        解压数据到调用方提供的缓冲区
+        
+        默认实现调用 decompress() 后复制到 out。底层库支持写入
+        外部缓冲区时可覆盖此方法，省去中间 bytes 对象。
+        
+        Args:
+            data: 压缩后的数据 (bytes 或 memoryview)
+            out: 输出缓冲区，长度为原始大小
+            
+        Returns:
+            实际写入的字节数
+        """
+        raw = self.decompress(data, len(out))
+        size = len(raw)
+        out[:size] = raw
+        return size
 
 
 class ChecksumHook(ABC):
@@ -65,6 +86,12 @@ class ChecksumHook(ABC):
     用于实现自定义校验算法 (如 MD5, SHA1, CRC32)。
     """
     
+    # 并行度提示，供批量处理选择默认工作线程数:
+    #   'cpu'      - 计算密集且在 C 层释放 GIL (如 hashlib)，按 CPU 核数并行
+    #   'cpu_fast' - 计算量很小，线程调度开销占主导，少量线程即可
+    #   'io'       - 主要等待外部进程或磁盘 I/O，可使用多于核数的线程
+    parallelism_hint: ClassVar[str] = 'cpu'
+    
     @property
     @abstractmethod
     def algo_id(self) -> int:
@@ -74,6 +101,8 @@ class ChecksumHook(ABC):
         对应 FileHeader 中的 checksum_algo 字段。
         0 = 无校验, 1 = CRC32, 2 = MD5, 3 = SHA1, 4 = SHA256
         
+        固定算法的 Hook 可直接声明为类属性 (内置注册表按类读取)。
+        
         Returns:
             算法 ID
         """
@@ -102,24 +131,28 @@ class ChecksumHook(ABC):
         """
         pass
     
-    @abstractmethod
     def compute(self, data: bytes) -> bytes:
         """
         计算校验值
         
+        默认通过 new_stream() 一次性计算，子类需至少实现
+        compute() 或 new_stream() 之一。
+        
         Args:
             data: 要校验的数据
             
         Returns:
             校验值字节
         """
-        pass
+        stream = self.new_stream()
+        stream.update(data)
+        return stream.digest()
     
     def verify(self, data: bytes, expected: bytes) -> bool:
         """
         验证校验值
         
-        默认实现直接比较计算结果和期望值。
+        默认实现计算校验值后交给 verify_digest 比较。
         
         Args:
             data: 要校验的数据
@@ -128,7 +161,40 @@ class ChecksumHook(ABC):
         Returns:
             校验是否通过
         """
-        return self.compute(data) == expected
+        return self.verify_digest(self.compute(data), expected)
+    
+    def verify_digest(self, actual: bytes, expected: bytes) -> bool:
+        """
+        比较已计算的校验值
+        
+        供已通过 new_stream() 等方式得到校验值的调用方使用，
+        使用 hmac.compare_digest 做常数时间比较。
+        
+        Args:
+            actual: 实际校验值
+            expected: 期望的校验值
+            
+        Returns:
+            校验是否通过
+        """
+        return hmac.compare_digest(actual, expected)
+    
+    def new_stream(self) -> Any:
+        """
+        创建增量校验对象
+        
+        返回的对象需提供 ``update(chunk)`` 与 ``digest()`` 方法
+        (与 hashlib 对象一致)，用于分块流式计算大文件校验值，
+        避免将整个文件读入内存。chunk 可能是复用缓冲区上的
+        memoryview，update() 返回后不应再持有其引用。
+        
+        Returns:
+            增量校验对象
+            
+        Raises:
+            NotImplementedError: 不支持流式计算，调用方应回退到 compute()
+        """
+        raise NotImplementedError(f"{type(self).__name__} 不支持流式校验")
 
 class IndexCryptoHook(ABC):
     """
@@ -211,3 +277,18 @@ class PathHashHook(ABC):
             64-bit 整数 Hash 值
         """
         pass
+    
+    def hash_many(self, paths: Iterable[str]) -> List[int]:
+        """
+        批量计算路径 Hash 值
+        
+        默认逐个调用 hash()，子类可覆盖为批量实现。
+        
+        Args:
+            paths: 规范化后的路径序列
+            
+        Returns:
+            64-bit 整数 Hash 值列表 (与输入顺序一致)
+        """
+        hash_path = self.hash
+        return [hash_path(path) for path in paths]
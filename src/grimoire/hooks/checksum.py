@@ -7,10 +7,51 @@
 """
 
 import hashlib
+import struct
 import zlib
 from .base import ChecksumHook
 
 
+# CRC32 校验值序列化 (4 bytes, Little-Endian)
+_CRC32_STRUCT = struct.Struct('<I')
+
+# hashlib 构造函数 (OpenSSL 后端在运行时自动选用 SHA-NI / ARMv8 SHA 指令)
+_md5 = hashlib.md5
+_sha1 = hashlib.sha1
+_sha256 = hashlib.sha256
+
+
+# ==================== 增量校验对象 ====================
+
+class _NoneStream:
+    """无校验的增量对象"""
+    
+    __slots__ = ()
+    
+    def update(self, data: bytes) -> None:
+        pass
+    
+    def digest(self) -> bytes:
+        return b''
+
+
+class _CRC32Stream:
+    """CRC32 增量对象 (接口与 hashlib 一致)"""
+    
+    __slots__ = ('_crc',)
+    
+    def __init__(self):
+        self._crc = 0
+    
+    def update(self, data: bytes) -> None:
+        self._crc = zlib.crc32(data, self._crc)
+    
+    def digest(self) -> bytes:
+        return _CRC32_STRUCT.pack(self._crc)
+
+
+# ==================== 校验 Hook ====================
+
 class NoneChecksumHook(ChecksumHook):
     """
     无校验
@@ -18,23 +59,25 @@ class NoneChecksumHook(ChecksumHook):
     不进行任何校验操作。
     """
     
-    @property
-    def algo_id(self) -> int:
-        return 0
+    algo_id = 0
+    digest_size = 0
+    parallelism_hint = 'cpu_fast'
     
     @property
     def display_name(self) -> str:
         return "none"
     
-    @property
-    def digest_size(self) -> int:
-        return 0
-    
     def compute(self, data: bytes) -> bytes:
         return b''
     
+    def new_stream(self):
+        return _NoneStream()
+    
     def verify(self, data: bytes, expected: bytes) -> bool:
         return True
+    
+    def verify_digest(self, actual: bytes, expected: bytes) -> bool:
+        return True
 
 
 class CRC32Hook(ChecksumHook):
@@ -44,21 +87,20 @@ class CRC32Hook(ChecksumHook):
     快速但较弱的校验算法，4 字节输出。
     """
     
-    @property
-    def algo_id(self) -> int:
-        return 1
+    algo_id = 1
+    digest_size = 4
+    parallelism_hint = 'cpu_fast'
     
     @property
     def display_name(self) -> str:
         return "crc32"
     
-    @property
-    def digest_size(self) -> int:
-        return 4
-    
     def compute(self, data: bytes) -> bytes:
-        crc = zlib.crc32(data) & 0xFFFFFFFF
-        return crc.to_bytes(4, 'little')
+        # Python 3 的 zlib.crc32 已返回无符号值
+        return _CRC32_STRUCT.pack(zlib.crc32(data))
+    
+    def new_stream(self):
+        return _CRC32Stream()
 
 
 class MD5Hook(ChecksumHook):
@@ -69,20 +111,18 @@ class MD5Hook(ChecksumHook):
     注意：MD5 不应用于安全目的，但适合文件完整性校验。
     """
     
-    @property
-    def algo_id(self) -> int:
-        return 2
+    algo_id = 2
+    digest_size = 16
     
     @property
     def display_name(self) -> str:
         return "md5"
     
-    @property
-    def digest_size(self) -> int:
-        return 16
-    
     def compute(self, data: bytes) -> bytes:
-        return hashlib.md5(data).digest()
+        return _md5(data).digest()
+    
+    def new_stream(self):
+        return _md5()
 
 
 class SHA1Hook(ChecksumHook):
@@ -92,20 +132,18 @@ class SHA1Hook(ChecksumHook):
     Git 使用的校验算法，20 字节输出。
     """
     
-    @property
-    def algo_id(self) -> int:
-        return 3
+    algo_id = 3
+    digest_size = 20
     
     @property
     def display_name(self) -> str:
         return "sha1"
     
-    @property
-    def digest_size(self) -> int:
-        return 20
-    
     def compute(self, data: bytes) -> bytes:
-        return hashlib.sha1(data).digest()
+        return _sha1(data).digest()
+    
+    def new_stream(self):
+        return _sha1()
 
 
 class SHA256Hook(ChecksumHook):
@@ -115,17 +153,15 @@ class SHA256Hook(ChecksumHook):
     强校验算法，32 字节输出。
     """
     
-    @property
-    def algo_id(self) -> int:
-        return 4
+    algo_id = 4
+    digest_size = 32
     
     @property
     def display_name(self) -> str:
         return "sha256"
     
-    @property
-    def digest_size(self) -> int:
-        return 32
-    
     def compute(self, data: bytes) -> bytes:
-        return hashlib.sha256(data).digest()
+        return _sha256(data).digest()
+    
+    def new_stream(self):
+        return _sha256()
@@ -15,10 +15,8 @@ class ZlibCompressHook(IndexCryptoHook):
     这不是加密，只是压缩，可以减少索引区体积。
     """
     
-    # flags_id = 0x02 (FLAG_INDEX_COMPRESSED)
-    @property
-    def flags_id(self) -> int:
-        return 0x02
+    # FLAG_INDEX_COMPRESSED
+    flags_id = 0x02
     
     @property
     def display_name(self) -> str:
@@ -48,10 +46,8 @@ class XorObfuscateHook(IndexCryptoHook):
     注意：这不是安全的加密，仅用于防止直接查看。
     """
     
-    # flags_id = 0x01 (FLAG_INDEX_ENCRYPTED)
-    @property
-    def flags_id(self) -> int:
-        return 0x01
+    # FLAG_INDEX_ENCRYPTED
+    flags_id = 0x01
     
     @property
     def display_name(self) -> str:
@@ -65,8 +61,14 @@ class XorObfuscateHook(IndexCryptoHook):
         self._key = key
     
     def _xor(self, data: bytes) -> bytes:
+        # 密钥平铺到数据长度后整体作为大整数异或，由 C 层一次完成
+        n = len(data)
+        if not n:
+            return b''
         key_len = len(self._key)
-        return bytes(b ^ self._key[i % key_len] for i, b in enumerate(data))
+        stream = (self._key * (n // key_len + 1))[:n]
+        value = int.from_bytes(data, 'little') ^ int.from_bytes(stream, 'little')
+        return value.to_bytes(n, 'little')
     
     def encrypt(self, data: bytes) -> bytes:
         return self._xor(data)
@@ -82,10 +84,8 @@ class ZlibXorHook(IndexCryptoHook):
     结合压缩和混淆，既减少体积又提供基本保护。
     """
     
-    # flags_id = 0x03 (FLAG_INDEX_COMPRESSED | FLAG_INDEX_ENCRYPTED)
-    @property
-    def flags_id(self) -> int:
-        return 0x03
+    # FLAG_INDEX_COMPRESSED | FLAG_INDEX_ENCRYPTED
+    flags_id = 0x03
     
     @property
     def display_name(self) -> str:
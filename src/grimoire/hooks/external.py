@@ -6,11 +6,15 @@
 提供统一的外置可执行文件（如 fhash、rclone）定位策略。
 """
 
+import json
 import os
 import shutil
 import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from dataclasses import dataclass
 
 
@@ -44,12 +48,26 @@ class ExternalToolLocator:
     # Windows 可执行文件扩展名
     WINDOWS_EXTS = ['.exe', '.cmd', '.bat']
     
+    # 工具信息持久化缓存文件名 (位于 ~/.grimoire/)
+    TOOL_CACHE_FILE = 'tool_cache.json'
+    
+    # 是否将工具信息缓存写入磁盘
+    persist_info_cache: bool = True
+    
+    # 版本探测子进程超时 (秒)
+    VERSION_PROBE_TIMEOUT = 5
+    
     _cache: Dict[str, Optional[str]] = {}
     
+    # (name, path, st_mtime_ns, st_size) -> ToolInfo
+    _info_cache: Dict[Tuple[str, str, int, int], ToolInfo] = {}
+    _info_cache_loaded: bool = False
+    
     @classmethod
     def clear_cache(cls) -> None:
-        """清空路径缓存"""
+        """清空路径缓存和内存中的工具信息缓存"""
         cls._cache.clear()
+        cls._info_cache.clear()
     
     @classmethod
     def find_executable(
@@ -183,13 +201,20 @@ class ExternalToolLocator:
         return home / '.grimoire' / 'bin'
     
     @classmethod
-    def get_tool_info(cls, name: str, path: Optional[str] = None) -> Optional[ToolInfo]:
+    def get_tool_info(
+        cls,
+        name: str,
+        path: Optional[str] = None,
+        probe_version: bool = True
+    ) -> Optional[ToolInfo]:
         """
         获取工具信息（包括版本）
         
         Args:
             name: 工具名
             path: 可选的显式路径
+            probe_version: 缓存未命中时是否启动子进程探测版本。
+                为 False 时仅定位可执行文件，返回的 version 可能为空字符串
             
         Returns:
             ToolInfo 对象，工具不可用返回 None
@@ -198,60 +223,131 @@ class ExternalToolLocator:
         if not executable:
             return None
         
+        # 以可执行文件的 (mtime, size) 作为缓存失效依据，避免重复启动子进程
+        try:
+            st = os.stat(executable)
+        except OSError:
+            return None
+        key = (name, executable, st.st_mtime_ns, st.st_size)
+        
+        cls._load_info_cache()
+        cached = cls._info_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if not probe_version:
+            return ToolInfo(name=name, path=executable, version='')
+        
         version = cls._get_tool_version(executable)
         if version is None:
             return None
         
-        return ToolInfo(
+        info = ToolInfo(
             name=name,
             path=executable,
             version=version,
             available=True
         )
+        cls._info_cache[key] = info
+        cls._save_info_cache()
+        return info
+    
+    @classmethod
+    def get_tool_cache_path(cls) -> Path:
+        """
+        获取工具信息缓存文件路径
+        
+        返回 ~/.grimoire/tool_cache.json 路径。
+        """
+        return cls.get_user_data_path().parent / cls.TOOL_CACHE_FILE
+    
+    @classmethod
+    def _load_info_cache(cls) -> None:
+        """首次使用时从磁盘加载工具信息缓存 (失败时忽略)"""
+        if cls._info_cache_loaded:
+            return
+        cls._info_cache_loaded = True
+        
+        if not cls.persist_info_cache:
+            return
+        
+        try:
+            with open(cls.get_tool_cache_path(), 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            for record in records:
+                key = (
+                    record['name'], record['path'],
+                    int(record['mtime_ns']), int(record['size'])
+                )
+                cls._info_cache.setdefault(key, ToolInfo(
+                    name=record['name'],
+                    path=record['path'],
+                    version=record['version'],
+                ))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    
+    @classmethod
+    def _save_info_cache(cls) -> None:
+        """将工具信息缓存写入磁盘 (失败时忽略)"""
+        if not cls.persist_info_cache:
+            return
+        
+        records = [
+            {
+                'name': name,
+                'path': path,
+                'mtime_ns': mtime_ns,
+                'size': size,
+                'version': info.version,
+            }
+            for (name, path, mtime_ns, size), info in cls._info_cache.items()
+        ]
+        try:
+            cache_path = cls.get_tool_cache_path()
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False, indent=2)
+        except OSError:
+            pass
     
     @classmethod
     def _get_tool_version(cls, path: str) -> Optional[str]:
         """获取工具版本号"""
-        try:
-            # fhash 和 rclone 都支持 -v 或 version 命令
-            result = subprocess.run(
-                [path, '-v'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+        # fhash 支持 -v，rclone 使用 version 子命令
+        for args in (['-v'], ['version']):
+            try:
+                result = subprocess.run(
+                    [path, *args],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    timeout=cls.VERSION_PROBE_TIMEOUT
+                )
+            except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+                return None
             
             if result.returncode == 0:
-                # 解析版本输出
-                # fhash: "fhash v0.1.0"
-                # rclone: "rclone v1.72.1"
                 output = result.stdout.strip()
                 if output:
-                    first_line = output.split('\n')[0]
-                    # 提取 vX.X.X 部分
-                    for part in first_line.split():
-                        if part.startswith('v') and '.' in part:
-                            return part
-                    return first_line
-            
-            # 尝试 version 命令 (rclone)
-            result = subprocess.run(
-                [path, 'version'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                first_line = result.stdout.strip().split('\n')[0]
-                for part in first_line.split():
-                    if part.startswith('v') and '.' in part:
-                        return part
-                return first_line
-                
-        except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-            pass
+                    return cls._parse_version(output)
         
         return None
+    
+    @staticmethod
+    def _parse_version(output: str) -> str:
+        """
+        从版本输出中提取版本号
+        
+        fhash: "fhash v0.1.0"，rclone: "rclone v1.72.1"，
+        取首行的 vX.X.X 部分，找不到则返回首行。
+        """
+        first_line = output.split('\n')[0]
+        for part in first_line.split():
+            if part.startswith('v') and '.' in part:
+                return part
+        return first_line
 
 
 class ExternalToolManager:
@@ -269,16 +365,45 @@ class ExternalToolManager:
         self._initialized = False
     
     def initialize(self) -> None:
-        """初始化，检测所有可用工具"""
+        """
+        初始化，检测所有可用工具
+        
+        仅定位可执行文件，不启动子进程探测版本；
+        版本号在首次调用 get_tool_version() 时获取。
+        """
         if self._initialized:
             return
         
         for tool_name in self.CHECKSUM_TOOL_PRIORITY:
-            info = ExternalToolLocator.get_tool_info(tool_name)
+            info = ExternalToolLocator.get_tool_info(tool_name, probe_version=False)
             self._tools[tool_name] = info
         
         self._initialized = True
     
+    def get_tool_version(self, name: str) -> Optional[str]:
+        """
+        获取工具版本号 (按需探测并缓存)
+        
+        探测失败的工具会被视为不可用。
+        
+        Args:
+            name: 工具名
+            
+        Returns:
+            版本号，工具不可用返回 None
+        """
+        info = self.get_tool(name)
+        if info is None or not info.available:
+            return None
+        
+        if not info.version:
+            info = ExternalToolLocator.get_tool_info(name, info.path)
+            self._tools[name] = info
+            if info is None:
+                return None
+        
+        return info.version
+    
     def get_best_checksum_tool(self) -> Optional[ToolInfo]:
         """
         获取最佳的校验工具
@@ -313,6 +438,105 @@ class ExternalToolManager:
         return [name for name, info in self._tools.items() if info and info.available]
 
 
+def iter_process_lines(
+    cmd: List[str],
+    timeout: Optional[float] = None,
+    check: bool = False
+) -> Iterator[bytes]:
+    """
+    运行外置工具并逐行读取 stdout
+    
+    输出边读边交给调用方，不在内存中缓存完整输出。
+    
+    Args:
+        cmd: 完整命令行
+        timeout: 超时时间 (秒)，超时后终止进程
+        check: 为 True 时进程返回非零退出码抛出 CalledProcessError
+        
+    Yields:
+        stdout 的每一行 (bytes，含换行符)
+        
+    Raises:
+        subprocess.TimeoutExpired: 超时
+        subprocess.CalledProcessError: check=True 且退出码非零
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+    timer = None
+    timed_out = threading.Event()
+    if timeout is not None:
+        def on_timeout():
+            timed_out.set()
+            proc.kill()
+        
+        timer = threading.Timer(timeout, on_timeout)
+        timer.daemon = True
+        timer.start()
+    finished = False
+    try:
+        yield from proc.stdout
+        finished = True
+    finally:
+        proc.stdout.close()
+        # 调用方提前停止迭代时结束子进程
+        if not finished and proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        if timer is not None:
+            timer.cancel()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    if check and proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+@contextmanager
+def data_as_file(data: bytes) -> Iterator[Tuple[str, Tuple[int, ...]]]:
+    """
+    将内存数据提供为外置工具可读取的文件路径
+    
+    Linux 上写入 memfd (纯内存，不经过磁盘文件系统)，子进程通过
+    /proc/self/fd/N 读取，需要在启动子进程时传入 pass_fds；
+    其他平台回退到临时文件。
+    
+    Args:
+        data: 数据
+        
+    Yields:
+        (文件路径, 需要传给子进程的 fd 元组)
+    """
+    fd = -1
+    memfd_create = getattr(os, 'memfd_create', None)
+    if memfd_create is not None and os.path.isdir('/proc/self/fd'):
+        try:
+            fd = memfd_create('grimoire-data')
+        except OSError:
+            fd = -1
+    
+    if fd >= 0:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            yield f'/proc/self/fd/{fd}', (fd,)
+        finally:
+            os.close(fd)
+        return
+    
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        tmp.write(data)
+        tmp_path = tmp.name
+    try:
+        yield tmp_path, ()
+    finally:
+        os.unlink(tmp_path)
+
+
 # 全局单例
 _tool_manager: Optional[ExternalToolManager] = None
 
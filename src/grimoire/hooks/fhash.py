@@ -10,14 +10,22 @@ fhash 项目地址: https://github.com/Virace/fast-hasher
 """
 
 import base64
+import functools
+import hashlib
 import json
 import os
 import subprocess
+import sys
 import tempfile
-from typing import Optional, Dict, List
+from contextlib import closing
+from typing import Optional, Dict, Iterable, Iterator, List, Tuple
 
 from .base import ChecksumHook
-from .external import ExternalToolLocator
+from .external import ExternalToolLocator, data_as_file, iter_process_lines
+
+
+# JSON Lines 输出按此行数合并为一次 json.loads
+_JSON_CHUNK_LINES = 256
 
 
 class FhashNotFoundError(Exception):
@@ -25,6 +33,36 @@ class FhashNotFoundError(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=8)
+def _probe_fhash(fhash_path: str) -> None:
+    """
+    运行 fhash -v 检查可用性
+    
+    成功结果按路径缓存，每个进程只探测一次；失败时抛出异常 (不缓存)。
+    
+    Args:
+        fhash_path: fhash 可执行文件路径
+        
+    Raises:
+        FhashNotFoundError: fhash 不可用
+    """
+    try:
+        result = subprocess.run(
+            [fhash_path, '-v'],
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            timeout=5
+        )
+        if result.returncode != 0:
+            raise FhashNotFoundError(f"fhash 执行失败: {result.stderr.decode()}")
+    except FileNotFoundError:
+        raise FhashNotFoundError(
+            f"找不到 fhash: {fhash_path}。请安装或指定正确路径。"
+        )
+    except subprocess.TimeoutExpired:
+        raise FhashNotFoundError("fhash 响应超时")
+
+
 class FhashHook(ChecksumHook):
     """
     fhash 外置工具 Hook
@@ -43,6 +81,9 @@ class FhashHook(ChecksumHook):
         results = hook.compute_files_batch(['/path/to/file1', '/path/to/file2'])
     """
     
+    # 计算在外部进程中完成，线程仅等待子进程
+    parallelism_hint = 'io'
+    
     # fhash 支持的算法列表
     SUPPORTED_ALGORITHMS = {
         'md5', 'sha1', 'sha256', 'sha512', 'crc32',
@@ -52,6 +93,9 @@ class FhashHook(ChecksumHook):
     # 使用 Base64 编码输出的算法
     BASE64_ALGORITHMS = {'quickxor'}
     
+    # 内存数据可直接由 hashlib 计算的算法 (结果与 fhash 一致，无需启动子进程)
+    HASHLIB_ALGORITHMS = {'md5', 'sha1', 'sha256', 'sha512'}
+    
     def __init__(
         self,
         algorithm: str = 'sha256',
@@ -66,7 +110,7 @@ class FhashHook(ChecksumHook):
             fhash_path: fhash 可执行文件路径 (可选，自动查找)
             check_on_init: 是否在初始化时检查 fhash 可用性
         """
-        algorithm = algorithm.lower()
+        algorithm = sys.intern(algorithm.lower())
         if algorithm not in self.SUPPORTED_ALGORITHMS:
             raise ValueError(
                 f"不支持的算法: {algorithm}。"
@@ -78,6 +122,12 @@ class FhashHook(ChecksumHook):
         self._algorithm = algorithm
         self._algo_id, self._digest_size = ALGORITHM_REGISTRY[algorithm]
         
+        # quickxor 使用 Base64 编码，其他算法使用十六进制
+        if algorithm in self.BASE64_ALGORITHMS:
+            self._decoder = base64.b64decode
+        else:
+            self._decoder = bytes.fromhex
+        
         # 查找 fhash 可执行文件
         self._fhash_path = fhash_path or ExternalToolLocator.find_executable('fhash')
         
@@ -95,21 +145,7 @@ class FhashHook(ChecksumHook):
             raise FhashNotFoundError(
                 "找不到 fhash。请安装 fhash 或设置 GRIMOIRE_FHASH_PATH 环境变量。"
             )
-        
-        try:
-            result = subprocess.run(
-                [self._fhash_path, '-v'],
-                capture_output=True,
-                timeout=5
-            )
-            if result.returncode != 0:
-                raise FhashNotFoundError(f"fhash 执行失败: {result.stderr.decode()}")
-        except FileNotFoundError:
-            raise FhashNotFoundError(
-                f"找不到 fhash: {self._fhash_path}。请安装或指定正确路径。"
-            )
-        except subprocess.TimeoutExpired:
-            raise FhashNotFoundError("fhash 响应超时")
+        _probe_fhash(self._fhash_path)
     
     @property
     def algo_id(self) -> int:
@@ -140,16 +176,15 @@ class FhashHook(ChecksumHook):
         Returns:
             哈希值 (bytes)
         """
-        if self._algorithm in self.BASE64_ALGORITHMS:
-            return base64.b64decode(hash_str)
-        return bytes.fromhex(hash_str)
+        return self._decoder(hash_str)
     
     def compute(self, data: bytes) -> bytes:
         """
         计算内存数据的哈希
         
-        注意: 此方法会将数据写入临时文件，效率较低。
-        如果可能，请使用 compute_file() 直接计算文件。
+        md5/sha1/sha256/sha512 直接使用 hashlib 计算；其他算法需将数据
+        提供为文件 (Linux 上为 memfd，其他平台为临时文件) 再调用 fhash，
+        效率较低，如果可能请使用 compute_file()。
         
         Args:
             data: 要计算哈希的数据
@@ -157,15 +192,11 @@ class FhashHook(ChecksumHook):
         Returns:
             哈希值 (bytes)
         """
-        # 写入临时文件
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            tmp.write(data)
-            tmp_path = tmp.name
+        if self._algorithm in self.HASHLIB_ALGORITHMS:
+            return hashlib.new(self._algorithm, data).digest()
         
-        try:
-            return self.compute_file(tmp_path)
-        finally:
-            os.unlink(tmp_path)
+        with data_as_file(data) as (path, pass_fds):
+            return self._compute_path(path, pass_fds)
     
     def compute_file(self, file_path: str) -> bytes:
         """
@@ -174,17 +205,32 @@ class FhashHook(ChecksumHook):
         Args:
             file_path: 文件路径
             
+        Returns:
+            哈希值 (bytes)
+        """
+        return self._compute_path(file_path)
+    
+    def _compute_path(self, file_path: str, pass_fds: Tuple[int, ...] = ()) -> bytes:
+        """
+        调用 fhash 计算单个路径的哈希
+        
+        Args:
+            file_path: 文件路径
+            pass_fds: 需要继承给 fhash 的文件描述符
+            
         Returns:
             哈希值 (bytes)
         """
         result = subprocess.run(
             [self._fhash_path, '-a', self._algorithm, '-m', '-j', file_path],
+            stdin=subprocess.DEVNULL,
             capture_output=True,
-            check=True
+            check=True,
+            pass_fds=pass_fds
         )
         
-        # 解析 JSON Lines 输出
-        output = result.stdout.decode('utf-8').strip()
+        # 解析 JSON Lines 输出 (json.loads 直接接受 UTF-8 bytes，无需先解码)
+        output = result.stdout.strip()
         if not output:
             raise ValueError(f"fhash 无输出: {file_path}")
         
@@ -194,11 +240,11 @@ class FhashHook(ChecksumHook):
         if 'error' in data:
             raise ValueError(f"fhash 错误: {data['error']}")
         
-        hash_hex = data.get(self._algorithm)
-        if not hash_hex:
+        hash_str = data.get(self._algorithm)
+        if not hash_str:
             raise ValueError(f"fhash 输出中找不到 {self._algorithm} 哈希")
         
-        return self._decode_hash(hash_hex)
+        return self._decoder(hash_str)
     
     def compute_files_batch(
         self,
@@ -227,34 +273,130 @@ class FhashHook(ChecksumHook):
             tmp_list_path = tmp.name
         
         try:
-            result = subprocess.run(
+            # 逐行解析输出，错误的文件被跳过
+            return dict(self._iter_json_results(
                 [self._fhash_path, '-a', self._algorithm, '-m', '-j', '-f', tmp_list_path],
-                capture_output=True,
                 timeout=timeout
+            ))
+        finally:
+            os.unlink(tmp_list_path)
+    
+    def compute_files_batch_streaming(
+        self,
+        file_paths: Iterable[str],
+        batch_size: int = 1024
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        分批计算文件哈希，边输出边产出结果
+        
+        每 batch_size 个路径启动一次 fhash (-f 列表文件)，
+        逐行解析其 JSON Lines 输出，不缓存完整 stdout。
+        出错的文件会被跳过，调用方可对缺失的路径单独处理。
+        
+        Args:
+            file_paths: 文件路径序列 (可为迭代器)
+            batch_size: 每次调用 fhash 处理的文件数
+            
+        Yields:
+            (file_path, hash_bytes) 元组，顺序取决于 fhash 输出
+        """
+        batch = []
+        for path in file_paths:
+            batch.append(path)
+            if len(batch) >= batch_size:
+                yield from self._stream_list_batch(batch)
+                batch = []
+        if batch:
+            yield from self._stream_list_batch(batch)
+    
+    def _stream_list_batch(self, file_paths: List[str]) -> Iterator[Tuple[str, bytes]]:
+        """将一批路径写入列表文件并流式解析 fhash 输出"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as tmp:
+            for path in file_paths:
+                tmp.write(f"{path}\n")
+            tmp_list_path = tmp.name
+        
+        try:
+            yield from self._iter_json_results(
+                [self._fhash_path, '-a', self._algorithm, '-m', '-j', '-f', tmp_list_path]
             )
+        finally:
+            os.unlink(tmp_list_path)
+    
+    def _iter_json_results(
+        self,
+        cmd: List[str],
+        timeout: Optional[float] = None,
+        check: bool = False
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        运行 fhash 并解析 JSON Lines 输出
+        
+        每累积 _JSON_CHUNK_LINES 行拼成一个 JSON 数组，只调用一次 json.loads；
+        数组解析失败时 (存在损坏行) 回退为逐行解析，跳过无法解析的行。
+        
+        Args:
+            cmd: 完整命令行
+            timeout: 超时时间 (秒)，超时后终止 fhash
+            check: 为 True 时 fhash 返回非零退出码抛出 CalledProcessError
+            
+        Yields:
+            (path, hash_bytes) 元组，错误行被跳过
             
-            results = {}
-            for line in result.stdout.decode('utf-8').strip().split('\n'):
+        Raises:
+            subprocess.TimeoutExpired: 超时
+            subprocess.CalledProcessError: check=True 且退出码非零
+        """
+        pending: List[bytes] = []
+        with closing(iter_process_lines(cmd, timeout, check)) as lines:
+            for line in lines:
+                line = line.strip()
                 if not line:
                     continue
+                pending.append(line)
+                if len(pending) >= _JSON_CHUNK_LINES:
+                    yield from self._parse_json_records(pending)
+                    pending = []
+            if pending:
+                yield from self._parse_json_records(pending)
+    
+    def _parse_json_records(self, lines: List[bytes]) -> Iterator[Tuple[str, bytes]]:
+        """
+        解析一组 JSON Lines 记录
+        
+        Args:
+            lines: 去除空白的非空行
+            
+        Yields:
+            (path, hash_bytes) 元组，错误记录被跳过
+        """
+        loads = json.loads
+        try:
+            records = loads(b'[' + b','.join(lines) + b']')
+        except ValueError:
+            records = []
+            for line in lines:
                 try:
-                    data = json.loads(line)
-                    if 'error' in data:
-                        # 跳过错误的文件
-                        continue
-                    
-                    path = data.get('path', '')
-                    hash_hex = data.get(self._algorithm)
-                    
-                    if path and hash_hex:
-                        results[path] = self._decode_hash(hash_hex)
-                except (json.JSONDecodeError, ValueError):
+                    records.append(loads(line))
+                except ValueError:
                     continue
+        
+        # 循环内只使用局部变量
+        decoder = self._decoder
+        algorithm = self._algorithm
+        for data in records:
+            if type(data) is not dict or 'error' in data:
+                continue
             
-            return results
-            
-        finally:
-            os.unlink(tmp_list_path)
+            path = data.get('path', '')
+            hash_str = data.get(algorithm)
+            if not (path and hash_str):
+                continue
+            try:
+                digest = decoder(hash_str)
+            except (TypeError, ValueError):
+                continue
+            yield path, digest
     
     def compute_dir(
         self,
@@ -279,33 +421,10 @@ class FhashHook(ChecksumHook):
             # fhash 默认递归，需要限制深度
             cmd.extend(['--max-depth', '1'])
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            timeout=timeout
-        )
-        
-        if result.returncode != 0:
+        try:
+            return dict(self._iter_json_results(cmd, timeout=timeout, check=True))
+        except subprocess.CalledProcessError:
             return {}
-        
-        results = {}
-        for line in result.stdout.decode('utf-8').strip().split('\n'):
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-                if 'error' in data:
-                    continue
-                
-                path = data.get('path', '')
-                hash_hex = data.get(self._algorithm)
-                
-                if path and hash_hex:
-                    results[path] = self._decode_hash(hash_hex)
-            except (json.JSONDecodeError, ValueError):
-                continue
-        
-        return results
     
     def __repr__(self) -> str:
         return f"FhashHook('{self._algorithm}')"
@@ -7,11 +7,14 @@ Rclone 兼容的哈希 Hook
 需要系统已安装 rclone。
 """
 
+import functools
 import os
 import subprocess
+import sys
 import tempfile
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterator, List, Tuple
 from .base import ChecksumHook
+from .external import iter_process_lines
 
 
 class RcloneNotFoundError(Exception):
@@ -19,6 +22,37 @@ class RcloneNotFoundError(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=8)
+def _probe_rclone(rclone_path: str) -> None:
+    """
+    运行 rclone version 检查可用性
+    
+    成功结果按路径缓存，每个进程只探测一次；失败时抛出异常 (不缓存)。
+    
+    Args:
+        rclone_path: rclone 可执行文件路径或命令名
+        
+    Raises:
+        RcloneNotFoundError: rclone 不可用
+    """
+    try:
+        result = subprocess.run(
+            [rclone_path, 'version'],
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            timeout=5
+        )
+        if result.returncode != 0:
+            raise RcloneNotFoundError(f"rclone 执行失败: {result.stderr.decode()}")
+    except FileNotFoundError:
+        raise RcloneNotFoundError(
+            f"找不到 rclone: {rclone_path}。"
+            "请安装 rclone 或指定正确路径。"
+        )
+    except subprocess.TimeoutExpired:
+        raise RcloneNotFoundError("rclone 响应超时")
+
+
 class RcloneHashHook(ChecksumHook):
     """
     Rclone 兼容的哈希 Hook
@@ -35,6 +69,9 @@ class RcloneHashHook(ChecksumHook):
         hash_bytes = hook.compute_file('/path/to/file')
     """
     
+    # 计算在外部进程中完成，线程仅等待子进程
+    parallelism_hint = 'io'
+    
     # rclone 支持的算法列表
     SUPPORTED_ALGORITHMS = {
         'md5', 'sha1', 'sha256', 'sha512', 'crc32',
@@ -55,7 +92,7 @@ class RcloneHashHook(ChecksumHook):
             rclone_path: rclone 可执行文件路径或命令名
             check_on_init: 是否在初始化时检查 rclone 可用性
         """
-        algorithm = algorithm.lower()
+        algorithm = sys.intern(algorithm.lower())
         if algorithm not in self.SUPPORTED_ALGORITHMS:
             raise ValueError(
                 f"不支持的算法: {algorithm}。"
@@ -78,21 +115,7 @@ class RcloneHashHook(ChecksumHook):
     
     def _check_rclone(self) -> None:
         """检查 rclone 是否可用"""
-        try:
-            result = subprocess.run(
-                [self._rclone_path, 'version'],
-                capture_output=True,
-                timeout=5
-            )
-            if result.returncode != 0:
-                raise RcloneNotFoundError(f"rclone 执行失败: {result.stderr.decode()}")
-        except FileNotFoundError:
-            raise RcloneNotFoundError(
-                f"找不到 rclone: {self._rclone_path}。"
-                "请安装 rclone 或指定正确路径。"
-            )
-        except subprocess.TimeoutExpired:
-            raise RcloneNotFoundError("rclone 响应超时")
+        _probe_rclone(self._rclone_path)
     
     @property
     def algo_id(self) -> int:
@@ -182,10 +205,7 @@ class RcloneHashHook(ChecksumHook):
         
         results = {}
         
-        for dir_path, paths in dir_groups.items():
-            # 对每个目录调用 rclone hashsum
-            dir_results = self.compute_dir(dir_path, timeout=timeout)
-            
+        for paths, dir_results in self._compute_dir_groups(dir_groups, timeout):
             # 匹配请求的文件
             for path in paths:
                 filename = os.path.basename(path)
@@ -200,6 +220,40 @@ class RcloneHashHook(ChecksumHook):
         
         return results
     
+    def _compute_dir_groups(
+        self,
+        dir_groups: Dict[str, List[str]],
+        timeout: Optional[int] = None
+    ) -> Iterator[Tuple[List[str], Dict[str, bytes]]]:
+        """
+        并发计算各目录的哈希
+        
+        每个目录一个 rclone 进程，线程只等待子进程 (不持有 GIL)，
+        多个目录可同时占满多个核心。
+        
+        Args:
+            dir_groups: {目录: 该目录下请求的文件列表}
+            timeout: 单个 rclone 进程的超时时间 (秒)
+            
+        Yields:
+            (文件列表, 目录计算结果)，按完成顺序
+        """
+        if len(dir_groups) == 1:
+            (dir_path, paths), = dir_groups.items()
+            yield paths, self.compute_dir(dir_path, timeout=timeout)
+            return
+        
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        max_workers = min(len(dir_groups), os.cpu_count() or 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.compute_dir, dir_path, timeout=timeout): paths
+                for dir_path, paths in dir_groups.items()
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
     def compute_dir(
         self,
         dir_path: str,
@@ -222,26 +276,19 @@ class RcloneHashHook(ChecksumHook):
         if not recursive:
             cmd.extend(['--max-depth', '1'])
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            timeout=timeout
-        )
-        
-        if result.returncode != 0:
-            return {}
-        
-        # 解析输出
+        # 逐行解析输出: "hash  filename\n"
         results = {}
-        for line in result.stdout.decode('utf-8').strip().split('\n'):
-            if line:
-                parts = line.split(maxsplit=1)
+        try:
+            for line in iter_process_lines(cmd, timeout=timeout, check=True):
+                parts = line.decode('utf-8').rstrip('\r\n').split(maxsplit=1)
                 if len(parts) == 2:
                     hash_hex, filename = parts
                     try:
                         results[filename] = bytes.fromhex(hash_hex)
                     except ValueError:
                         pass
+        except subprocess.CalledProcessError:
+            return {}
         
         return results
     
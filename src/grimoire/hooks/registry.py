@@ -7,6 +7,8 @@ Hook 注册表
 支持内置 Python 实现和外置工具 (fhash, rclone)。
 """
 
+import functools
+import sys
 from typing import Dict, Type, Optional, Tuple, TYPE_CHECKING
 
 from .base import ChecksumHook, IndexCryptoHook
@@ -21,6 +23,7 @@ if TYPE_CHECKING:
 
 # 算法名 -> (algo_id, digest_size)
 # 这是全局唯一的算法定义,所有 Hook 实现必须使用相同的 ID
+# 键是源码字面量 (已被驻留)，传入的算法名经 sys.intern 后查找可走身份比较
 ALGORITHM_REGISTRY: Dict[str, Tuple[int, int]] = {
     'none':     (0, 0),
     'crc32':    (1, 4),
@@ -37,6 +40,11 @@ ALGORITHM_REGISTRY: Dict[str, Tuple[int, int]] = {
 # algo_id -> 算法名 (反向映射)
 ID_TO_ALGORITHM: Dict[int, str] = {v[0]: k for k, v in ALGORITHM_REGISTRY.items()}
 
+# algo_id 为连续小整数，按下标直接索引的查找表 (空位为 None)
+_ALGORITHM_BY_ID: Tuple[Optional[str], ...] = tuple(
+    ID_TO_ALGORITHM.get(i) for i in range(max(ID_TO_ALGORITHM) + 1)
+)
+
 
 # ==================== Checksum Hook 注册表 ====================
 
@@ -51,17 +59,18 @@ _BUILTIN_CHECKSUM_HOOKS = [
 
 
 def _build_checksum_registry() -> Dict[int, Type[ChecksumHook]]:
-    """从 Hook 类自动构建 algo_id -> Hook 类映射"""
-    registry = {}
-    for hook_cls in _BUILTIN_CHECKSUM_HOOKS:
-        instance = hook_cls()
-        registry[instance.algo_id] = hook_cls
-    return registry
+    """从 Hook 类自动构建 algo_id -> Hook 类映射 (读取类属性，无需实例化)"""
+    return {hook_cls.algo_id: hook_cls for hook_cls in _BUILTIN_CHECKSUM_HOOKS}
 
 
 # algo_id -> Hook 类 映射表
 CHECKSUM_REGISTRY: Dict[int, Type[ChecksumHook]] = _build_checksum_registry()
 
+# 按 algo_id 下标索引的 Hook 类查找表 (与 _ALGORITHM_BY_ID 等长)
+_CHECKSUM_HOOK_BY_ID: Tuple[Optional[Type[ChecksumHook]], ...] = tuple(
+    CHECKSUM_REGISTRY.get(i) for i in range(len(_ALGORITHM_BY_ID))
+)
+
 
 def get_checksum_hook_by_id(algo_id: int) -> Optional[ChecksumHook]:
     """
@@ -76,12 +85,16 @@ def get_checksum_hook_by_id(algo_id: int) -> Optional[ChecksumHook]:
     Returns:
         对应的 Hook 实例，未找到返回 None
     """
+    if not 0 <= algo_id < len(_ALGORITHM_BY_ID):
+        return None
+    
     # 1. 优先使用内置 Hook
-    if algo_id in CHECKSUM_REGISTRY:
-        return CHECKSUM_REGISTRY[algo_id]()
+    hook_cls = _CHECKSUM_HOOK_BY_ID[algo_id]
+    if hook_cls is not None:
+        return hook_cls()
     
     # 2. 对于内置不支持的算法，尝试使用外置工具
-    algorithm = ID_TO_ALGORITHM.get(algo_id)
+    algorithm = _ALGORITHM_BY_ID[algo_id]
     if algorithm:
         hook = get_external_checksum_hook(algorithm)
         if hook:
@@ -90,56 +103,73 @@ def get_checksum_hook_by_id(algo_id: int) -> Optional[ChecksumHook]:
     return None
 
 
-def get_external_checksum_hook(algorithm: str) -> Optional[ChecksumHook]:
+def _resolve_external_hook_cls(algorithm: str) -> Optional[Type[ChecksumHook]]:
     """
-    获取外置工具的 ChecksumHook
+    探测支持指定算法的外置工具 Hook 类
     
-    优先使用 fhash，其次是 rclone。
+    探测成功的结果由 _probe_fhash / _probe_rclone 按路径缓存，
+    失败不缓存，之后安装的工具仍可被发现。
     
     Args:
-        algorithm: 算法名 (如 'sha256', 'quickxor')
+        algorithm: 算法名 (小写)
         
     Returns:
-        Hook 实例，工具不可用返回 None
+        可用的 Hook 类，工具不可用返回 None
     """
     # 尝试 fhash
     try:
         from .fhash import FhashHook
-        if algorithm.lower() in FhashHook.SUPPORTED_ALGORITHMS:
-            return FhashHook(algorithm, check_on_init=True)
+        if algorithm in FhashHook.SUPPORTED_ALGORITHMS:
+            FhashHook(algorithm, check_on_init=True)
+            return FhashHook
     except Exception:
         pass
     
     # 尝试 rclone
     try:
         from .rclone import RcloneHashHook
-        if algorithm.lower() in RcloneHashHook.SUPPORTED_ALGORITHMS:
-            return RcloneHashHook(algorithm, check_on_init=True)
+        if algorithm in RcloneHashHook.SUPPORTED_ALGORITHMS:
+            RcloneHashHook(algorithm, check_on_init=True)
+            return RcloneHashHook
     except Exception:
         pass
     
     return None
 
 
-def get_best_checksum_hook(algorithm: str) -> Optional[ChecksumHook]:
+def get_external_checksum_hook(algorithm: str) -> Optional[ChecksumHook]:
     """
-    获取指定算法的最佳 Hook 实现
-    
-    优先顺序:
-    1. fhash (如果可用)
-    2. 内置 Python 实现
-    3. rclone (如果可用)
+    获取外置工具的 ChecksumHook
     
-    对于批量文件处理场景，建议使用此函数获取外置工具实现。
+    优先使用 fhash，其次是 rclone。工具探测成功的结果会被缓存，
+    每次调用返回新的 Hook 实例。
     
     Args:
-        algorithm: 算法名
+        algorithm: 算法名 (如 'sha256', 'quickxor')
         
     Returns:
-        最佳的 Hook 实例，失败返回 None
+        Hook 实例，工具不可用返回 None
+    """
+    algorithm = sys.intern(algorithm.lower())
+    hook_cls = _resolve_external_hook_cls(algorithm)
+    if hook_cls is None:
+        return None
+    return hook_cls(algorithm, check_on_init=False)
+
+
+def _resolve_best_hook_cls(algorithm: str) -> Optional[Type[ChecksumHook]]:
     """
-    algorithm = algorithm.lower()
+    按优先级探测指定算法的最佳 Hook 类
+    
+    不缓存解析结果: 外置工具探测成功后由 _probe_fhash / _probe_rclone
+    按路径缓存，失败不缓存，之后安装的工具仍可被发现。
     
+    Args:
+        algorithm: 算法名 (小写)
+        
+    Returns:
+        最佳的 Hook 类，均不可用返回 None
+    """
     if algorithm not in ALGORITHM_REGISTRY:
         return None
     
@@ -149,55 +179,70 @@ def get_best_checksum_hook(algorithm: str) -> Optional[ChecksumHook]:
     try:
         from .fhash import FhashHook
         if algorithm in FhashHook.SUPPORTED_ALGORITHMS:
-            return FhashHook(algorithm, check_on_init=True)
+            FhashHook(algorithm, check_on_init=True)
+            return FhashHook
     except Exception:
         pass
     
     # 2. 内置实现
     if algo_id in CHECKSUM_REGISTRY:
-        return CHECKSUM_REGISTRY[algo_id]()
+        return CHECKSUM_REGISTRY[algo_id]
     
     # 3. rclone
     try:
         from .rclone import RcloneHashHook
         if algorithm in RcloneHashHook.SUPPORTED_ALGORITHMS:
-            return RcloneHashHook(algorithm, check_on_init=True)
+            RcloneHashHook(algorithm, check_on_init=True)
+            return RcloneHashHook
     except Exception:
         pass
     
     return None
 
 
-# ==================== IndexCrypto Hook 注册表 ====================
-
-# 内置 IndexCrypto Hook 列表
-_BUILTIN_INDEX_CRYPTO_HOOKS = None  # 延迟初始化避免循环导入
-
-
-def _get_index_crypto_hooks():
-    """延迟加载 IndexCrypto Hook 列表"""
-    global _BUILTIN_INDEX_CRYPTO_HOOKS
-    if _BUILTIN_INDEX_CRYPTO_HOOKS is None:
-        from .crypto import ZlibCompressHook, XorObfuscateHook, ZlibXorHook
-        _BUILTIN_INDEX_CRYPTO_HOOKS = [
-            ZlibCompressHook,
-            XorObfuscateHook, 
-            ZlibXorHook,
-        ]
-    return _BUILTIN_INDEX_CRYPTO_HOOKS
-
+def get_best_checksum_hook(algorithm: str) -> Optional[ChecksumHook]:
+    """
+    获取指定算法的最佳 Hook 实现
+    
+    优先顺序:
+    1. fhash (如果可用)
+    2. 内置 Python 实现
+    3. rclone (如果可用)
+    
+    对于批量文件处理场景，建议使用此函数获取外置工具实现。
+    外置工具探测成功的结果会被缓存，每次调用返回新的 Hook 实例。
+    
+    Args:
+        algorithm: 算法名
+        
+    Returns:
+        最佳的 Hook 实例，失败返回 None
+    """
+    algorithm = sys.intern(algorithm.lower())
+    hook_cls = _resolve_best_hook_cls(algorithm)
+    if hook_cls is None:
+        return None
+    
+    if hook_cls in _CHECKSUM_HOOK_BY_ID:
+        return hook_cls()
+    return hook_cls(algorithm, check_on_init=False)
 
-def _build_index_crypto_registry() -> Dict[int, Type[IndexCryptoHook]]:
-    """从 Hook 类自动构建 flags_id -> Hook 类映射"""
-    registry = {}
-    for hook_cls in _get_index_crypto_hooks():
-        instance = hook_cls()
-        registry[instance.flags_id] = hook_cls
-    return registry
 
+# ==================== IndexCrypto Hook 注册表 ====================
 
-# 延迟构建的注册表
-_INDEX_CRYPTO_REGISTRY: Optional[Dict[int, Type[IndexCryptoHook]]] = None
+@functools.lru_cache(maxsize=None)
+def _index_crypto_registry() -> Dict[int, Type[IndexCryptoHook]]:
+    """
+    首次使用时构建 flags_id -> Hook 类映射
+    
+    crypto 模块在此处导入，避免循环导入。
+    """
+    from .crypto import ZlibCompressHook, XorObfuscateHook, ZlibXorHook
+    
+    return {
+        hook_cls.flags_id: hook_cls
+        for hook_cls in (ZlibCompressHook, XorObfuscateHook, ZlibXorHook)
+    }
 
 
 def get_index_crypto_by_flags(flags: int) -> Optional[IndexCryptoHook]:
@@ -212,12 +257,9 @@ def get_index_crypto_by_flags(flags: int) -> Optional[IndexCryptoHook]:
     Returns:
         对应的 Hook 实例，未找到返回 None
     """
-    global _INDEX_CRYPTO_REGISTRY
-    if _INDEX_CRYPTO_REGISTRY is None:
-        _INDEX_CRYPTO_REGISTRY = _build_index_crypto_registry()
-    
-    if flags in _INDEX_CRYPTO_REGISTRY:
-        return _INDEX_CRYPTO_REGISTRY[flags]()
+    hook_cls = _index_crypto_registry().get(flags)
+    if hook_cls is not None:
+        return hook_cls()
     
     return None
 
@@ -7,7 +7,9 @@ Manifest 文件构建器
 """
 
 import os
-from typing import Optional, List, Callable
+import stat
+import subprocess
+from typing import Optional, List, Callable, Iterator, Tuple
 
 from ..core.binary_io import BinaryWriter
 from ..core.schema import FileHeader, IndexHeader, ManifestEntry, MODE_MANIFEST
@@ -17,6 +19,40 @@ from ..utils import normalize_path, split_path, default_path_hash
 from ..exceptions import HashCollisionError
 
 
+# 流式校验的分块大小
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# 批量添加时每次交给外部工具计算的文件数
+_BATCH_HASH_SIZE = 1024
+
+
+def _stream_file_digest(stream, local_path: str) -> bytes:
+    """
+    分块读入同一个复用缓冲区并交给增量校验对象
+    
+    readinto 直接写入预分配的 bytearray，每块以 memoryview 切片传给
+    update()，不为每块分配新的 bytes。
+    
+    Args:
+        stream: new_stream() 返回的增量校验对象
+        local_path: 本地文件路径
+        
+    Returns:
+        校验值
+    """
+    buf = bytearray(_HASH_CHUNK_SIZE)
+    view = memoryview(buf)
+    update = stream.update
+    with open(local_path, 'rb', buffering=0) as f:
+        readinto = f.readinto
+        while True:
+            n = readinto(buf)
+            if not n:
+                break
+            update(view[:n])
+    return stream.digest()
+
+
 class ManifestBuilder:
     """
     Manifest 文件构建器
@@ -53,20 +89,35 @@ class ManifestBuilder:
         self._entries: List[ManifestEntry] = []
         self._hash_to_path: dict[int, str] = {}  # 用于冲突检测
     
-    def add_file(self, local_path: str, vfs_path: Optional[str] = None) -> None:
+    def add_file(
+        self,
+        local_path: str,
+        vfs_path: Optional[str] = None,
+        stream_hash: bool = True,
+        expected_size: Optional[int] = None,
+        checksum: Optional[bytes] = None
+    ) -> None:
         """
         添加单个文件到清单
         
         Args:
             local_path: 本地文件路径
             vfs_path: 虚拟路径 (默认使用文件名)
+            stream_hash: 校验 Hook 支持 new_stream() 时分块流式计算校验值，
+                         避免将整个文件读入内存
+            expected_size: 已知的文件大小，提供时直接写入 (不使用 stat 得到的大小)
+            checksum: 已计算好的校验值 (如批量计算的结果)，提供时不再计算
             
         Raises:
             FileNotFoundError: 本地文件不存在
             HashCollisionError: 路径 Hash 冲突
         """
-        # 1. 检查文件存在
-        if not os.path.isfile(local_path):
+        # 1. 检查文件存在 (一次 stat 同时得到文件类型和大小)
+        try:
+            st = os.stat(local_path)
+        except (OSError, ValueError):
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
             raise FileNotFoundError(f"文件不存在: {local_path}")
         
         # 2. 确定虚拟路径
@@ -92,17 +143,33 @@ class ManifestBuilder:
         dir_id, name_id, ext_id = self._path_dict.add_path(dir_part, name, ext)
         
         # 6. 获取文件大小和计算校验值
-        raw_size = os.path.getsize(local_path)
-        
-        checksum = b''
-        if self._checksum_hook:
-            # 优先使用 compute_file (如 RcloneHashHook)，避免双重 I/O
-            if hasattr(self._checksum_hook, 'compute_file'):
-                checksum = self._checksum_hook.compute_file(local_path)
-            else:
-                # 回退到读取内存
-                with open(local_path, 'rb') as f:
-                    checksum = self._checksum_hook.compute(f.read())
+        if expected_size is not None:
+            raw_size = expected_size
+        else:
+            raw_size = st.st_size
+        
+        if checksum is None:
+            checksum = b''
+            if self._checksum_hook:
+                # 优先使用 compute_file (如 RcloneHashHook)，避免双重 I/O
+                stream = None
+                # 不超过一个分块的文件直接整块计算，省去增量对象和读缓冲区
+                if (stream_hash and st.st_size > _HASH_CHUNK_SIZE
+                        and not hasattr(self._checksum_hook, 'compute_file')):
+                    try:
+                        stream = self._checksum_hook.new_stream()
+                    except NotImplementedError:
+                        stream = None
+                
+                if hasattr(self._checksum_hook, 'compute_file'):
+                    checksum = self._checksum_hook.compute_file(local_path)
+                elif stream is not None:
+                    # 分块流式计算，内存占用固定
+                    checksum = _stream_file_digest(stream, local_path)
+                else:
+                    # 小文件或不支持流式时读入内存，单次 compute
+                    with open(local_path, 'rb') as f:
+                        checksum = self._checksum_hook.compute(f.read())
         
         # 7. 创建 Entry
         entry = ManifestEntry(
@@ -182,33 +249,20 @@ class ManifestBuilder:
             
             # ========== 3. 写入 String Tables ==========
             string_start = writer.position
-            self._path_dict.pack(writer)
-            string_size = writer.position - string_start
+            string_data = self._path_dict.to_bytes()
             
-            # 如果需要加密/压缩
+            # 如果需要加密/压缩 (在内存中完成，无需写入后读回)
             if self._index_crypto:
-                # 读回 String Tables 数据
-                f.seek(string_start)
-                string_data = f.read(string_size)
-                
-                # 加密/压缩
-                encrypted = self._index_crypto.encrypt(string_data)
-                
-                # 重写
-                f.seek(string_start)
-                f.write(encrypted)
-                
-                # 更新 string_size 为压缩后的大小！
-                string_size = len(encrypted)
-                
-                # 更新位置
-                writer.seek(string_start + string_size)
+                string_data = self._index_crypto.encrypt(string_data)
+            
+            string_size = writer.write_bytes(string_data)
             
             # ========== 4. 写入 Entry Table ==========
             checksum_size = self._checksum_hook.digest_size if self._checksum_hook else 0
             
-            for entry in self._entries:
-                writer.write_bytes(entry.pack())
+            entry_table = bytearray(ManifestEntry.entry_size(checksum_size) * len(self._entries))
+            ManifestEntry.pack_many_into(self._entries, entry_table, 0, checksum_size)
+            writer.write_bytes(entry_table)
             
             index_size = writer.position - index_start
             
@@ -289,10 +343,13 @@ class ManifestBuilder:
         
         result = BatchResult()
         
-        for item in items:
+        for item, checksum in self._iter_batch_checksums(items):
             try:
                 file_size = os.path.getsize(item.local_path)
-                self.add_file(item.local_path, item.vfs_path)
+                self.add_file(
+                    item.local_path, item.vfs_path,
+                    expected_size=file_size, checksum=checksum
+                )
                 result.success_count += 1
                 result.total_bytes += file_size
                 tracker.update(item.local_path, file_size)
@@ -312,6 +369,37 @@ class ManifestBuilder:
         result.elapsed_time = tracker.finish()
         return result
     
+    def _iter_batch_checksums(
+        self,
+        items: 'List[FileItem]'
+    ) -> 'Iterator[Tuple[FileItem, Optional[bytes]]]':
+        """
+        为批量添加预先计算校验值
+        
+        校验 Hook 提供 compute_files_batch_streaming (如 FhashHook) 时，
+        每 _BATCH_HASH_SIZE 个文件只启动一次外部进程；
+        未得到结果的文件返回 None，由 add_file 单独计算。
+        
+        Yields:
+            (FileItem, 校验值或 None) 元组
+        """
+        batch_hash = getattr(self._checksum_hook, 'compute_files_batch_streaming', None)
+        if batch_hash is None:
+            for item in items:
+                yield item, None
+            return
+        
+        for start in range(0, len(items), _BATCH_HASH_SIZE):
+            chunk = items[start:start + _BATCH_HASH_SIZE]
+            try:
+                digests = dict(batch_hash(
+                    [item.local_path for item in chunk], batch_size=len(chunk)
+                ))
+            except (OSError, ValueError, subprocess.SubprocessError):
+                digests = {}
+            for item in chunk:
+                yield item, digests.get(item.local_path)
+    
     def add_dir_batch(
         self,
         local_dir: str,
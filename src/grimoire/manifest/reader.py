@@ -7,12 +7,14 @@ Manifest 文件读取器
 """
 
 import io
+import mmap
 import os
-from typing import Optional, List, Dict, Callable
+from typing import Optional, List, Dict, Callable, Union, BinaryIO
 
 from ..core.binary_io import BinaryReader
 from ..core.schema import FileHeader, IndexHeader, ManifestEntry, MODE_MANIFEST
 from ..core.string_table import PathDictionary
+from ..core.entry_table import EntryTable
 from ..hooks.base import ChecksumHook, IndexCryptoHook
 from ..utils import normalize_path, default_path_hash
 from ..exceptions import (
@@ -52,12 +54,55 @@ class ManifestReader:
         
         # 内部状态
         self._file = open(file_path, 'rb')
-        self._reader = BinaryReader(self._file)
+        self._init_state(self._file)
+    
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: Union[bytes, bytearray, memoryview, mmap.mmap],
+        checksum_hook: Optional[ChecksumHook] = None,
+        index_crypto: Optional[IndexCryptoHook] = None,
+        path_hash_func: Optional[Callable[[str], int]] = None
+    ) -> 'ManifestReader':
+        """
+        从内存缓冲区创建读取器
+        
+        适用于已 mmap 或已读入内存的清单数据，不再重新打开文件。
+        缓冲区的生命周期由调用方管理，close() 不会关闭它。
+        
+        Args:
+            buffer: 完整的 Manifest 文件内容 (bytes 或 mmap 对象)
+            checksum_hook: 校验算法钩子 (需与创建时一致)
+            index_crypto: 索引解密钩子 (如果索引已加密)
+            path_hash_func: 自定义路径 Hash 函数
+            
+        Returns:
+            ManifestReader 实例
+        """
+        self = cls.__new__(cls)
+        self._file_path = None
+        self._checksum_hook = checksum_hook
+        self._index_crypto = index_crypto
+        self._path_hash_func = path_hash_func or default_path_hash
+        self._file = None
+        
+        if isinstance(buffer, mmap.mmap):
+            # mmap 本身支持 read()，直接读取避免复制
+            buffer.seek(0)
+            stream = buffer
+        else:
+            stream = io.BytesIO(buffer)
+        self._init_state(stream)
+        return self
+    
+    def _init_state(self, stream: BinaryIO) -> None:
+        """初始化内部状态并加载内容"""
+        self._reader = BinaryReader(stream)
         
         self._file_header: Optional[FileHeader] = None
         self._index_header: Optional[IndexHeader] = None
         self._path_dict: Optional[PathDictionary] = None
-        self._entries: Dict[int, ManifestEntry] = {}  # path_hash -> Entry
+        self._entries: Optional[EntryTable] = None  # path_hash -> Entry
         self._index_decrypted: bool = False
         
         # 加载文件
@@ -104,9 +149,8 @@ class ManifestReader:
         
         # 如果已解密，解析字典
         if self._index_decrypted:
-            string_reader = BinaryReader(io.BytesIO(string_data))
-            self._path_dict = PathDictionary.unpack(
-                string_reader,
+            self._path_dict = PathDictionary.from_bytes(
+                string_data,
                 self._index_header.dir_count,
                 self._index_header.name_count,
                 self._index_header.ext_count
@@ -116,10 +160,10 @@ class ManifestReader:
         checksum_size = self._index_header.checksum_size
         entry_size = ManifestEntry.entry_size(checksum_size)
         
-        for _ in range(self._file_header.entry_count):
-            entry_data = self._reader.read_bytes(entry_size)
-            entry = ManifestEntry.unpack(entry_data, checksum_size)
-            self._entries[entry.path_hash] = entry
+        # 一次读取整个 Entry Table，按列存储
+        entry_count = self._file_header.entry_count
+        table = self._reader.read_bytes(entry_size * entry_count)
+        self._entries = EntryTable(ManifestEntry, table, entry_count, checksum_size)
     
     def exists(self, vfs_path: str) -> bool:
         """
@@ -199,13 +243,7 @@ class ManifestReader:
         if not self._index_decrypted:
             raise IndexNotDecryptedError()
         
-        result = []
-        for entry in self._entries.values():
-            full_path = self._path_dict.get_path(
-                entry.dir_id, entry.name_id, entry.ext_id
-            )
-            result.append(full_path)
-        return result
+        return self._build_paths()
     
     def get_all_entries(self) -> List[Dict]:
         """
@@ -231,10 +269,7 @@ class ManifestReader:
             raise IndexNotDecryptedError()
         
         result = []
-        for entry in self._entries.values():
-            full_path = self._path_dict.get_path(
-                entry.dir_id, entry.name_id, entry.ext_id
-            )
+        for full_path, entry in zip(self._build_paths(), self._entries.values()):
             result.append({
                 'path': full_path,
                 'size': entry.raw_size,
@@ -256,11 +291,16 @@ class ManifestReader:
         if not self._index_decrypted:
             raise IndexNotDecryptedError()
         
-        for entry in self._entries.values():
-            full_path = self._path_dict.get_path(
-                entry.dir_id, entry.name_id, entry.ext_id
-            )
-            yield full_path, entry
+        yield from zip(self._build_paths(), self._entries.values())
+    
+    def _build_paths(self) -> List[str]:
+        """按条目存储顺序批量重建所有路径"""
+        column_values = self._entries.column_values
+        return self._path_dict.build_paths(
+            column_values('dir_id'),
+            column_values('name_id'),
+            column_values('ext_id')
+        )
     
     def list_hashes(self) -> List[int]:
         """
@@ -8,7 +8,26 @@ GrimoireVFS 工具函数
 
 import os
 import hashlib
-from typing import Tuple
+import mmap
+import re
+import struct
+import sys
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+
+# 文件大小不小于该值时使用 mmap 计算 Hash
+MMAP_THRESHOLD = 10 * 1024 * 1024
+
+# 连续斜杠
+_MULTI_SLASH = re.compile(r'/{2,}')
+
+# 路径 Hash: MD5 摘要前 8 字节按小端 u64 解释 (文件格式的一部分，不可更换算法)
+_md5 = hashlib.md5
+_unpack_u64 = struct.Struct('<Q').unpack_from
+
+# normalize_path 缓存容量 (目录前缀等路径会被反复规范化)
+NORMALIZE_CACHE_SIZE = 65536
 
 
 def normalize_path(path: str, absolute: bool = False) -> str:
@@ -37,12 +56,18 @@ def normalize_path(path: str, absolute: bool = False) -> str:
         >>> normalize_path("Game/MOD", absolute=True)
         '/Game/MOD'
     """
+    return _normalize_path_cached(path, absolute)
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalize_path_cached(path: str, absolute: bool) -> str:
+    """normalize_path 的实际实现，结果按 (path, absolute) 缓存"""
     # 反斜杠 → 正斜杠
     path = path.replace("\\", "/")
     
-    # 合并连续斜杠
-    while "//" in path:
-        path = path.replace("//", "/")
+    # 合并连续斜杠 (一次正则替换，常见路径无需进入正则)
+    if "//" in path:
+        path = _MULTI_SLASH.sub("/", path)
     
     # 移除末尾斜杠 (除非是根目录)
     path = path.rstrip("/")
@@ -88,16 +113,46 @@ def split_path(full_path: str) -> Tuple[str, str, str]:
     # 检测原始路径是否以 / 开头，尊重用户输入
     is_absolute = full_path.startswith('/') or full_path.startswith('\\')
     normalized = normalize_path(full_path, absolute=is_absolute)
+    return _split_normalized(normalized, is_absolute)
+
+
+def split_path_many(normalized_paths: Iterable[str]) -> List[Tuple[str, str, str]]:
+    """
+    批量拆分路径 (与 split_path 结果一致)
     
+    输入须为 normalize_path 默认模式 (无前导斜杠) 规范化后的路径，
+    不再重复规范化。目录与扩展名大量重复，结果中的这两部分经
+    sys.intern 驻留，同值共享一个字符串对象；文件名基本唯一，不驻留。
+    
+    Args:
+        normalized_paths: 已规范化的路径序列
+        
+    Returns:
+        (目录路径, 文件名, 扩展名) 元组列表 (与输入顺序一致)
+    """
+    split = _split_normalized
+    intern = sys.intern
+    result = []
+    append = result.append
+    for path in normalized_paths:
+        dir_part, name, ext = split(path, False)
+        append((intern(dir_part), name, intern(ext)))
+    return result
+
+
+def _split_normalized(normalized: str, is_absolute: bool) -> Tuple[str, str, str]:
+    """拆分已规范化的路径 (只有 / 一种分隔符)"""
     # 分离目录和文件名
-    dir_part = os.path.dirname(normalized)
+    dir_part, _, basename = normalized.rpartition("/")
     if not dir_part:
         dir_part = "/" if is_absolute else ""
     
-    basename = os.path.basename(normalized)
-    
-    # 分离文件名和扩展名
-    name, ext = os.path.splitext(basename)
+    # 分离文件名和扩展名 (与 os.path.splitext 一致: 忽略开头的点)
+    name, dot, ext = basename.rpartition(".")
+    if dot and name.lstrip("."):
+        ext = dot + ext
+    else:
+        name, ext = basename, ""
     
     return dir_part, name, ext
 
@@ -106,8 +161,8 @@ def default_path_hash(path: str) -> int:
     """
     计算路径的 64-bit Hash 值 (用于快速查找)
     
-    使用 MD5 的前 8 字节作为 Hash 值。
-    可被 xxhash 替换以获得更好的性能。
+    使用 MD5 的前 8 字节作为 Hash 值，该值写入文件，更换算法会导致
+    已有文件无法查找。需要其他算法时可通过 path_hash_func 参数自定义。
     
     Args:
         path: 路径字符串
@@ -116,8 +171,28 @@ def default_path_hash(path: str) -> int:
         64-bit 整数 Hash 值
     """
     normalized = normalize_path(path)
-    digest = hashlib.md5(normalized.encode('utf-8')).digest()
-    return int.from_bytes(digest[:8], 'little')
+    return _unpack_u64(_md5(normalized.encode('utf-8')).digest())[0]
+
+
+def default_path_hash_many(normalized_paths: Iterable[str]) -> List[int]:
+    """
+    批量计算路径 Hash (与 default_path_hash 结果一致)
+    
+    输入须为已规范化的路径，不再重复调用 normalize_path；
+    直接对 MD5 摘要做 u64 解包，不切片。
+    
+    Args:
+        normalized_paths: 已规范化的路径序列
+        
+    Returns:
+        64-bit 整数 Hash 值列表 (与输入顺序一致)
+    """
+    md5 = _md5
+    unpack_u64 = _unpack_u64
+    return [
+        unpack_u64(md5(path.encode('utf-8')).digest())[0]
+        for path in normalized_paths
+    ]
 
 
 def compute_file_hash(file_path: str, algorithm: str = 'md5', 
@@ -125,7 +200,8 @@ def compute_file_hash(file_path: str, algorithm: str = 'md5',
     """
     计算文件的 Hash 值 (用于校验)
     
-    支持分块读取，适用于大文件。
+    小文件一次读入；不小于 MMAP_THRESHOLD 的文件通过 mmap 计算，
+    mmap 不可用时回退为分块读取。
     
     Args:
         file_path: 文件路径
@@ -138,6 +214,23 @@ def compute_file_hash(file_path: str, algorithm: str = 'md5',
     hasher = hashlib.new(algorithm)
     
     with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        
+        # 小文件一次读入，省去分块循环
+        if size <= chunk_size:
+            hasher.update(f.read())
+            return hasher.digest()
+        
+        # 大文件直接把 mmap 交给 hasher，不逐块分配 bytes
+        if size >= MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    hasher.update(mm)
+                return hasher.digest()
+            except (OSError, ValueError):
+                # 部分文件系统不支持 mmap，回退到分块读取
+                f.seek(0)
+        
         while True:
             chunk = f.read(chunk_size)
             if not chunk:
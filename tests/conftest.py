@@ -6,11 +6,12 @@ pytest 全局配置
 提供共享 fixtures、自定义 markers 和测试工具。
 """
 
+import functools
 import os
 import shutil
-import tempfile
 from pathlib import Path
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, Optional
 
 import pytest
 
@@ -35,14 +36,23 @@ def pytest_configure(config):
 
 # ==================== 外置工具检测 ====================
 
-RCLONE_AVAILABLE = shutil.which('rclone') is not None
-
-# fhash 检测：先检查环境变量，再检查 PATH
-_fhash_env = os.environ.get('GRIMOIRE_FHASH_PATH')
-FHASH_AVAILABLE = (
-    (_fhash_env and os.path.exists(_fhash_env)) or
-    shutil.which('fhash') is not None
-)
+@functools.lru_cache(maxsize=None)
+def _tool_available(name: str, env_var: Optional[str] = None) -> bool:
+    """
+    检测外置工具是否可用 (首次调用时才扫描 PATH，结果缓存)
+    
+    Args:
+        name: 可执行文件名
+        env_var: 指定工具路径的环境变量，优先于 PATH
+        
+    Returns:
+        是否可用
+    """
+    if env_var:
+        env_path = os.environ.get(env_var)
+        if env_path and os.path.exists(env_path):
+            return True
+    return shutil.which(name) is not None
 
 
 def pytest_collection_modifyitems(config, items):
@@ -51,9 +61,9 @@ def pytest_collection_modifyitems(config, items):
     skip_fhash = pytest.mark.skip(reason="fhash 未安装，跳过相关测试")
     
     for item in items:
-        if "rclone" in item.keywords and not RCLONE_AVAILABLE:
+        if "rclone" in item.keywords and not _tool_available("rclone"):
             item.add_marker(skip_rclone)
-        if "fhash" in item.keywords and not FHASH_AVAILABLE:
+        if "fhash" in item.keywords and not _tool_available("fhash", "GRIMOIRE_FHASH_PATH"):
             item.add_marker(skip_fhash)
 
 
@@ -69,6 +79,30 @@ def temp_dir(tmp_path):
     return tmp_path
 
 
+# 标准测试文件集 (路径 -> 内容)
+SAMPLE_FILES = {
+    "hero.txt": b"Hero data content",
+    "config.json": b'{"name": "test", "value": 123}',
+    "subdir/data.bin": b"\x00\x01\x02\x03\x04\x05\x06\x07",
+    "subdir/nested/deep.txt": b"Deep nested file content",
+    "中文文件.txt": "这是中文内容测试".encode("utf-8"),
+}
+
+
+# 大文件测试集的固定内容 (只构造一次)
+_REPEATED_DATA = b"Hello, GrimoireVFS! " * 1000  # 可压缩内容
+_BINARY_DATA = bytes(range(256)) * 100  # 二进制数据
+
+
+def _write_files(root: Path, files: Dict[str, bytes]) -> None:
+    """将文件内容字典写入 root 目录 (每个父目录只创建一次，无缓冲单次写入)"""
+    for parent in {os.path.dirname(name) for name in files} - {""}:
+        os.makedirs(root / parent, exist_ok=True)
+    for name, content in files.items():
+        with open(root / name, "wb", buffering=0) as f:
+            f.write(content)
+
+
 @pytest.fixture
 def sample_files(tmp_path) -> tuple:
     """
@@ -77,20 +111,25 @@ def sample_files(tmp_path) -> tuple:
     Returns:
         (目录路径, 文件内容字典)
     """
-    files = {
-        "hero.txt": b"Hero data content",
-        "config.json": b'{"name": "test", "value": 123}',
-        "subdir/data.bin": b"\x00\x01\x02\x03\x04\x05\x06\x07",
-        "subdir/nested/deep.txt": b"Deep nested file content",
-        "中文文件.txt": "这是中文内容测试".encode("utf-8"),
-    }
+    files = dict(SAMPLE_FILES)
+    _write_files(tmp_path, files)
+    return tmp_path, files
+
+
+@pytest.fixture(scope="session")
+def shared_sample_files(tmp_path_factory) -> tuple:
+    """
+    会话内共享的只读测试文件集
     
-    for name, content in files.items():
-        path = tmp_path / name
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_bytes(content)
+    与 sample_files 内容相同，每个会话 (xdist 下为每个 worker) 只创建一次，
+    供只读取源文件的测试和 session 级 fixture 使用，测试中不得修改。
     
-    return tmp_path, files
+    Returns:
+        (目录路径, 只读文件内容映射)
+    """
+    root = tmp_path_factory.mktemp("samples")
+    _write_files(root, SAMPLE_FILES)
+    return root, MappingProxyType(SAMPLE_FILES)
 
 
 @pytest.fixture
@@ -102,16 +141,11 @@ def large_files(tmp_path) -> tuple:
         (目录路径, 文件内容字典)
     """
     files = {
-        "repeated.txt": b"Hello, GrimoireVFS! " * 1000,  # 可压缩内容
-        "binary.dat": bytes(range(256)) * 100,  # 二进制数据
+        "repeated.txt": _REPEATED_DATA,
+        "binary.dat": _BINARY_DATA,
         "random.bin": os.urandom(10000),  # 随机数据 (难压缩)
     }
-    
-    for name, content in files.items():
-        path = tmp_path / name
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_bytes(content)
-    
+    _write_files(tmp_path, files)
     return tmp_path, files
 
 
@@ -128,21 +162,21 @@ def src_directory():
 
 # ==================== Hook Fixtures ====================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def md5_hook():
     """MD5Hook 实例"""
     from grimoire.hooks.checksum import MD5Hook
     return MD5Hook()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sha256_hook():
     """SHA256Hook 实例"""
     from grimoire.hooks.checksum import SHA256Hook
     return SHA256Hook()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def crc32_hook():
     """CRC32Hook 实例"""
     from grimoire.hooks.checksum import CRC32Hook
@@ -172,7 +206,7 @@ def zlib_xor_crypto():
 
 # ==================== 压缩 Hook Fixture ====================
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def zlib_compression_hook():
     """
     创建 zlib 压缩 Hook
@@ -188,28 +222,28 @@ def zlib_compression_hook():
             return 1
         
         def compress(self, data: bytes) -> bytes:
-            return zlib.compress(data, level=6)
+            return zlib.compress(data, level=1)
         
         def decompress(self, data: bytes, raw_size: int) -> bytes:
-            return zlib.decompress(data)
+            return zlib.decompress(data, bufsize=raw_size)
     
     return ZlibHook()
 
 
 # ==================== Manifest/Archive Fixtures ====================
 
-@pytest.fixture
-def manifest_file(tmp_path, sample_files, md5_hook):
+@pytest.fixture(scope="session")
+def manifest_file(tmp_path_factory, shared_sample_files, md5_hook):
     """
-    创建一个预构建的 Manifest 文件
+    创建一个预构建的 Manifest 文件 (每个会话构建一次，只读)
     
     Returns:
         (manifest路径, 源文件目录, 文件内容字典)
     """
     from grimoire import ManifestBuilder
     
-    src_dir, files = sample_files
-    manifest_path = tmp_path / "test.manifest"
+    src_dir, files = shared_sample_files
+    manifest_path = tmp_path_factory.mktemp("manifest") / "test.manifest"
     
     builder = ManifestBuilder(str(manifest_path), checksum_hook=md5_hook)
     builder.add_dir(str(src_dir), "/assets")
@@ -218,18 +252,18 @@ def manifest_file(tmp_path, sample_files, md5_hook):
     return manifest_path, src_dir, files
 
 
-@pytest.fixture
-def archive_file(tmp_path, sample_files, md5_hook, zlib_compression_hook):
+@pytest.fixture(scope="session")
+def archive_file(tmp_path_factory, shared_sample_files, md5_hook, zlib_compression_hook):
     """
-    创建一个预构建的 Archive 文件
+    创建一个预构建的 Archive 文件 (每个会话构建一次，只读)
     
     Returns:
         (archive路径, 源文件目录, 文件内容字典)
     """
     from grimoire import ArchiveBuilder
     
-    src_dir, files = sample_files
-    archive_path = tmp_path / "test.archive"
+    src_dir, files = shared_sample_files
+    archive_path = tmp_path_factory.mktemp("archive") / "test.archive"
     
     builder = ArchiveBuilder(
         str(archive_path),
@@ -267,11 +301,20 @@ def custom_checksum_hook():
             return 8
         
         def compute(self, data: bytes) -> bytes:
-            """简单的 XOR 折叠哈希"""
-            result = 0
-            for i, b in enumerate(data):
-                result ^= b << (i % 8 * 8)
-            return (result & 0xFFFFFFFFFFFFFFFF).to_bytes(8, 'little')
+            """
+            简单的 XOR 折叠哈希
+            
+            按 8 字节小端分组逐组异或。整块数据视为一个大整数，
+            每轮把高半部分异或到低半部分，只需 O(log n) 次整数运算。
+            """
+            value = int.from_bytes(data, 'little')
+            lanes = (len(data) + 7) // 8
+            while lanes > 1:
+                half = (lanes + 1) // 2
+                shift = half * 64
+                value = (value >> shift) ^ (value & ((1 << shift) - 1))
+                lanes = half
+            return value.to_bytes(8, 'little')
     
     return SimpleHash()
 
@@ -31,17 +31,20 @@ from grimoire.exceptions import CorruptedDataError, UnknownAlgorithmError
 # ==================== 测试用压缩 Hook ====================
 
 class ZlibHook(CompressionHook):
-    """Zlib 压缩 Hook (测试用)"""
+    """Zlib 压缩 Hook (测试用，默认最快级别，需要压缩率时可指定 level)"""
+    
+    def __init__(self, level: int = 1):
+        self._level = level
     
     @property
     def algo_id(self) -> int:
         return 1
     
     def compress(self, data: bytes) -> bytes:
-        return zlib.compress(data, level=6)
+        return zlib.compress(data, level=self._level)
     
     def decompress(self, data: bytes, raw_size: int) -> bytes:
-        return zlib.decompress(data)
+        return zlib.decompress(data, bufsize=raw_size)
 
 
 class LZ4MockHook(CompressionHook):
@@ -55,7 +58,15 @@ class LZ4MockHook(CompressionHook):
         return zlib.compress(data, level=1)
     
     def decompress(self, data: bytes, raw_size: int) -> bytes:
-        return zlib.decompress(data)
+        return zlib.decompress(data, bufsize=raw_size)
+
+
+# Hook 无状态，模块内共享同一实例
+_ZLIB = ZlibHook()
+_LZ4 = LZ4MockHook()
+
+# 批量读取测试使用的固定路径
+_BATCH_PATHS = ("/assets/hero.txt", "/assets/config.json")
 
 
 # ==================== ArchiveBuilder 测试 ====================
@@ -73,9 +84,9 @@ class TestArchiveBuilderBasic:
         assert archive_path.exists()
         assert archive_path.stat().st_size > 0
     
-    def test_add_single_file_no_compression(self, tmp_path, sample_files):
+    def test_add_single_file_no_compression(self, tmp_path, shared_sample_files):
         """添加单个文件 (无压缩)"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "single.archive"
         
         builder = ArchiveBuilder(str(archive_path))
@@ -91,7 +102,7 @@ class TestArchiveBuilderBasic:
         
         builder = ArchiveBuilder(
             str(archive_path),
-            compression_hooks=[ZlibHook()]
+            compression_hooks=[_ZLIB]
         )
         builder.add_file(str(src_dir / "repeated.txt"), "/data/repeated.txt", algo_id=1)
         builder.build()
@@ -100,9 +111,9 @@ class TestArchiveBuilderBasic:
         stats = builder.compression_stats
         assert stats["total_raw"] > stats["total_packed"]
     
-    def test_add_directory(self, tmp_path, sample_files):
+    def test_add_directory(self, tmp_path, shared_sample_files):
         """添加整个目录"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "dir.archive"
         
         builder = ArchiveBuilder(str(archive_path))
@@ -118,7 +129,7 @@ class TestArchiveBuilderCompression:
     
     @pytest.fixture
     def compression_hooks(self):
-        return [ZlibHook(), LZ4MockHook()]
+        return [_ZLIB, _LZ4]
     
     def test_multiple_compression_hooks(self, tmp_path, large_files, compression_hooks):
         """注册多个压缩 Hook"""
@@ -144,7 +155,7 @@ class TestArchiveBuilderCompression:
         
         builder = ArchiveBuilder(
             str(archive_path),
-            compression_hooks=[ZlibHook()]
+            compression_hooks=[_ZLIB]
         )
         builder.add_dir(str(src_dir), "/data", algo_id=1)
         builder.build()
@@ -153,6 +164,58 @@ class TestArchiveBuilderCompression:
         assert "total_raw" in stats
         assert "total_packed" in stats
         assert "ratio" in stats
+    
+    def test_store_tiny_and_incompressible_raw(self, tmp_path, large_files):
+        """过小或压缩后不变小的文件原样存储 (algo_id 为 0)"""
+        src_dir, files = large_files
+        (src_dir / "tiny.txt").write_bytes(b"tiny")
+        files = dict(files, **{"tiny.txt": b"tiny"})
+        archive_path = tmp_path / "adaptive.archive"
+        
+        builder = ArchiveBuilder(str(archive_path), compression_hooks=[_ZLIB])
+        builder.add_dir(str(src_dir), "/data", algo_id=1)
+        builder.build()
+        
+        with ArchiveReader(str(archive_path), compression_hooks=[_ZLIB]) as reader:
+            algo_ids = {
+                name: reader.get_entry(f"/data/{name}").algo_id for name in files
+            }
+            for name, expected in files.items():
+                assert reader.read(f"/data/{name}") == expected
+        
+        assert algo_ids == {
+            "repeated.txt": 1, "binary.dat": 1, "random.bin": 0, "tiny.txt": 0
+        }
+    
+    @pytest.mark.parametrize("compressible", [True, False], ids=["repeated", "random"])
+    @pytest.mark.parametrize("size", [0, 1, 64, 65, 1024, 1_000_000])
+    def test_no_inflation(self, tmp_path, size, compressible):
+        """任意大小与内容的文件压缩后都不会变大，小文件不经过压缩"""
+        from grimoire.archive.builder import _MIN_COMPRESS_SIZE
+        
+        if compressible:
+            data = (b"grimoire " * (size // 9 + 1))[:size]
+        else:
+            data = os.urandom(size)
+        local_path = tmp_path / "file.bin"
+        local_path.write_bytes(data)
+        archive_path = tmp_path / "size.archive"
+        
+        builder = ArchiveBuilder(str(archive_path), compression_hooks=[_ZLIB])
+        builder.add_file(str(local_path), "/file.bin", algo_id=1)
+        builder.build()
+        
+        with ArchiveReader(str(archive_path), compression_hooks=[_ZLIB]) as reader:
+            entry = reader.get_entry("/file.bin")
+            assert reader.read("/file.bin") == data
+        
+        assert entry.raw_size == size
+        assert entry.packed_size <= entry.raw_size
+        if size <= _MIN_COMPRESS_SIZE or not compressible:
+            assert entry.algo_id == 0
+            assert entry.packed_size == entry.raw_size
+        else:
+            assert entry.algo_id == 1
 
 
 class TestArchiveBuilderChecksum:
@@ -160,10 +223,10 @@ class TestArchiveBuilderChecksum:
     
     @pytest.mark.parametrize("checksum_hook", [
         None, NoneChecksumHook(), CRC32Hook(), MD5Hook(), SHA256Hook()
-    ])
-    def test_different_checksum_hooks(self, checksum_hook, tmp_path, sample_files):
+    ], ids=lambda hook: "no-hook" if hook is None else hook.display_name)
+    def test_different_checksum_hooks(self, checksum_hook, tmp_path, shared_sample_files):
         """测试不同校验算法"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "checksum.archive"
         
         builder = ArchiveBuilder(
@@ -184,11 +247,11 @@ class TestArchiveBuilderChecksum:
 class TestArchiveBuilderBatch:
     """ArchiveBuilder 批量操作测试"""
     
-    def test_add_files_batch(self, tmp_path, sample_files):
+    def test_add_files_batch(self, tmp_path, shared_sample_files):
         """批量添加文件"""
         from grimoire.core.batch import FileItem
         
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "batch.archive"
         
         items = [
@@ -203,11 +266,11 @@ class TestArchiveBuilderBatch:
         assert result.success_count == len(files)
         assert result.failed_count == 0
     
-    def test_add_files_batch_skip_missing(self, tmp_path, sample_files):
+    def test_add_files_batch_skip_missing(self, tmp_path, shared_sample_files):
         """批量添加时跳过不存在的文件"""
         from grimoire.core.batch import FileItem
         
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "skip.archive"
         
         items = [
@@ -222,9 +285,61 @@ class TestArchiveBuilderBatch:
         assert result.success_count == 1
         assert result.failed_count == 1
     
-    def test_add_dir_batch_with_progress(self, tmp_path, sample_files):
+    def test_add_files_batch_parallel_matches_serial(self, tmp_path, shared_sample_files):
+        """并行批量添加与串行结果逐字节一致"""
+        from grimoire.core.batch import FileItem
+        
+        src_dir, files = shared_sample_files
+        items = [
+            FileItem(str(src_dir / name), f"/batch/{name}", algo_id=1)
+            for name in files.keys()
+        ]
+        items.append(FileItem(str(src_dir / "NOT_EXISTS.txt"), "/missing.txt"))
+        
+        outputs = []
+        for max_workers in (1, 4):
+            archive_path = tmp_path / f"workers_{max_workers}.archive"
+            builder = ArchiveBuilder(
+                str(archive_path),
+                compression_hooks=[_ZLIB],
+                checksum_hook=MD5Hook()
+            )
+            result = builder.add_files_batch(items, on_error='skip', max_workers=max_workers)
+            builder.build()
+            
+            assert result.success_count == len(files)
+            assert result.failed_count == 1
+            outputs.append(archive_path.read_bytes())
+        
+        assert outputs[0] == outputs[1]
+    
+    def test_add_files_batch_abort_stops_loading(self, tmp_path, shared_sample_files):
+        """并行批量添加中止后不再读取剩余文件"""
+        from grimoire.core.batch import FileItem
+        
+        src_dir, files = shared_sample_files
+        loaded = []
+        
+        class CountingHook(MD5Hook):
+            def compute(self, data):
+                loaded.append(len(data))
+                return super().compute(data)
+        
+        items = [FileItem(str(src_dir / "NOT_EXISTS.txt"), "/missing.txt")]
+        items += [
+            FileItem(str(src_dir / "hero.txt"), f"/copies/{i}.txt") for i in range(100)
+        ]
+        
+        builder = ArchiveBuilder(str(tmp_path / "abort.archive"), checksum_hook=CountingHook())
+        result = builder.add_files_batch(items, on_error='abort', max_workers=2)
+        
+        assert result.failed_count == 1
+        assert result.success_count == 0
+        assert len(loaded) <= 4
+    
+    def test_add_dir_batch_with_progress(self, tmp_path, shared_sample_files):
         """带进度回调的批量添加"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "progress.archive"
         
         progress_calls = []
@@ -237,7 +352,7 @@ class TestArchiveBuilderBatch:
         
         builder = ArchiveBuilder(
             str(archive_path),
-            compression_hooks=[ZlibHook()]
+            compression_hooks=[_ZLIB]
         )
         result = builder.add_dir_batch(
             str(src_dir), "/assets",
@@ -259,14 +374,14 @@ class TestArchiveReaderBasic:
         """读取 Archive"""
         archive_path, src_dir, files = archive_file
         
-        with ArchiveReader(str(archive_path), compression_hooks=[ZlibHook()]) as reader:
+        with ArchiveReader(str(archive_path), compression_hooks=[_ZLIB]) as reader:
             assert reader.entry_count == len(files)
     
     def test_exists(self, archive_file):
         """检查路径存在性"""
         archive_path, src_dir, files = archive_file
         
-        with ArchiveReader(str(archive_path), compression_hooks=[ZlibHook()]) as reader:
+        with ArchiveReader(str(archive_path), compression_hooks=[_ZLIB]) as reader:
             assert reader.exists("/assets/hero.txt") is True
             assert reader.exists("/not/exist.txt") is False
     
@@ -276,7 +391,7 @@ class TestArchiveReaderBasic:
         
         with ArchiveReader(
             str(archive_path),
-            compression_hooks=[ZlibHook()],
+            compression_hooks=[_ZLIB],
             checksum_hook=MD5Hook()
         ) as reader:
             for name, expected in files.items():
@@ -294,7 +409,7 @@ class TestArchiveReaderModes:
         
         with ArchiveReader(
             str(archive_path),
-            compression_hooks=[ZlibHook()],
+            compression_hooks=[_ZLIB],
             use_mmap=True
         ) as reader:
             assert reader.is_mmap is True
@@ -308,13 +423,53 @@ class TestArchiveReaderModes:
         
         with ArchiveReader(
             str(archive_path),
-            compression_hooks=[ZlibHook()],
+            compression_hooks=[_ZLIB],
             use_mmap=False
         ) as reader:
             assert reader.is_mmap is False
             
             data = reader.read("/assets/hero.txt")
             assert data == files["hero.txt"]
+    
+    def test_modes_load_same_index(self, archive_file):
+        """两种模式解析出的索引一致"""
+        archive_path, src_dir, files = archive_file
+        
+        results = []
+        for use_mmap in (True, False):
+            with ArchiveReader(
+                str(archive_path),
+                compression_hooks=[_ZLIB],
+                use_mmap=use_mmap
+            ) as reader:
+                results.append((reader.file_header, reader.get_all_entries()))
+        
+        assert results[0] == results[1]
+    
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    def test_truncated_index_raises_eof(self, archive_file, tmp_path, use_mmap):
+        """索引区被截断时抛出 EOFError"""
+        archive_path, src_dir, files = archive_file
+        truncated = tmp_path / "truncated.archive"
+        truncated.write_bytes(archive_path.read_bytes()[:60])
+        
+        with pytest.raises(EOFError):
+            ArchiveReader(str(truncated), use_mmap=use_mmap)
+    
+    def test_bad_data_magic(self, archive_file, tmp_path):
+        """数据头魔法数错误时抛出 InvalidFormatError"""
+        from grimoire.core.schema import FileHeader
+        from grimoire.exceptions import InvalidFormatError
+        
+        archive_path, src_dir, files = archive_file
+        data = bytearray(archive_path.read_bytes())
+        data_offset = FileHeader.unpack(bytes(data[:FileHeader.SIZE])).data_offset
+        data[data_offset:data_offset + 4] = b'BAD!'
+        corrupted = tmp_path / "bad_magic.archive"
+        corrupted.write_bytes(bytes(data))
+        
+        with pytest.raises(InvalidFormatError, match="数据头魔法数"):
+            ArchiveReader(str(corrupted))
 
 
 class TestArchiveReaderOpen:
@@ -326,7 +481,7 @@ class TestArchiveReaderOpen:
         
         with ArchiveReader(
             str(archive_path),
-            compression_hooks=[ZlibHook()]
+            compression_hooks=[_ZLIB]
         ) as reader:
             file_obj = reader.open("/assets/hero.txt")
             
@@ -339,7 +494,7 @@ class TestArchiveReaderOpen:
         
         with ArchiveReader(
             str(archive_path),
-            compression_hooks=[ZlibHook()]
+            compression_hooks=[_ZLIB]
         ) as reader:
             file_obj = reader.open("/assets/hero.txt")
             
@@ -351,14 +506,109 @@ class TestArchiveReaderOpen:
             
             # 重新读取应相同
             assert file_obj.read(5) == first
+    
+    def test_view_uncompressed_mmap(self, tmp_path, shared_sample_files):
+        """mmap 模式下未压缩条目返回映射区视图"""
+        src_dir, files = shared_sample_files
+        archive_path = tmp_path / "view.archive"
+        
+        builder = ArchiveBuilder(str(archive_path), checksum_hook=MD5Hook())
+        builder.add_dir(str(src_dir), "/assets")
+        builder.build()
+        
+        with ArchiveReader(str(archive_path), checksum_hook=MD5Hook()) as reader:
+            for name, expected in files.items():
+                data = reader.view(f"/assets/{name}")
+                assert isinstance(data, memoryview)
+                assert data.readonly
+                assert data == expected
+                data.release()
+    
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    def test_view_matches_read(self, archive_file, use_mmap):
+        """压缩条目或传统模式下 view 与 read 内容一致"""
+        archive_path, src_dir, files = archive_file
+        
+        with ArchiveReader(
+            str(archive_path),
+            compression_hooks=[_ZLIB],
+            use_mmap=use_mmap
+        ) as reader:
+            for name, expected in files.items():
+                data = reader.view(f"/assets/{name}")
+                assert isinstance(data, memoryview)
+                assert data.tobytes() == expected
+                data.release()
+    
+    @pytest.fixture
+    def compressed_archive(self, tmp_path, large_files):
+        """以 zlib 压缩构建的大文件归档"""
+        src_dir, files = large_files
+        archive_path = tmp_path / "compressed.archive"
+        
+        builder = ArchiveBuilder(str(archive_path), compression_hooks=[_ZLIB])
+        builder.add_dir(str(src_dir), "/assets", algo_id=1)
+        builder.build()
+        
+        return archive_path, files
+    
+    def test_view_decompress_into(self, compressed_archive):
+        """压缩条目解压到预分配缓冲区，Hook 的 decompress_into 被调用"""
+        archive_path, files = compressed_archive
+        
+        class IntoHook(ZlibHook):
+            def __init__(self):
+                super().__init__()
+                self.sizes = []
+            
+            def decompress_into(self, data, out):
+                self.sizes.append(len(out))
+                raw = zlib.decompress(data, bufsize=len(out))
+                out[:len(raw)] = raw
+                return len(raw)
+        
+        hook = IntoHook()
+        with ArchiveReader(str(archive_path), compression_hooks=[hook]) as reader:
+            for name, expected in files.items():
+                assert reader.view(f"/assets/{name}") == expected
+        
+        # random.bin 无法压缩，原样存储
+        assert sorted(hook.sizes) == sorted(
+            len(files[name]) for name in ("repeated.txt", "binary.dat")
+        )
+    
+    def test_view_duck_typed_hook(self, compressed_archive):
+        """未继承 CompressionHook 的 Hook 回退为 decompress"""
+        archive_path, files = compressed_archive
+        
+        class PlainHook:
+            algo_id = 1
+            
+            def compress(self, data):
+                return zlib.compress(data)
+            
+            def decompress(self, data, raw_size):
+                return zlib.decompress(data)
+        
+        with ArchiveReader(str(archive_path), compression_hooks=[PlainHook()]) as reader:
+            for name, expected in files.items():
+                assert reader.view(f"/assets/{name}") == expected
+    
+    def test_view_missing(self, archive_file):
+        """不存在的路径抛出 FileNotFoundError"""
+        archive_path, src_dir, files = archive_file
+        
+        with ArchiveReader(str(archive_path), compression_hooks=[_ZLIB]) as reader:
+            with pytest.raises(FileNotFoundError):
+                reader.view("/assets/missing.txt")
 
 
 class TestArchiveReaderVerify:
     """ArchiveReader 校验测试"""
     
-    def test_verify_success(self, tmp_path, sample_files):
+    def test_verify_success(self, tmp_path, shared_sample_files):
         """校验正确的数据"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "verify.archive"
         
         builder = ArchiveBuilder(
@@ -373,41 +623,56 @@ class TestArchiveReaderVerify:
                 data = reader.read(f"/assets/{name}", verify=True)
                 assert data == files[name]
     
-    def test_verify_corrupted(self, tmp_path, sample_files):
-        """校验损坏的数据应抛出异常"""
-        src_dir, files = sample_files
-        archive_path = tmp_path / "corrupt.archive"
-        
-        builder = ArchiveBuilder(
-            str(archive_path),
-            checksum_hook=MD5Hook()
-        )
+    @pytest.fixture(scope="class", params=[MD5Hook(), SHA256Hook()], ids=["md5", "sha256"])
+    def corrupted_archive(self, request, tmp_path_factory, shared_sample_files):
+        """
+        每种校验算法构建一次并篡改其中一个条目数据的 Archive
+        
+        Returns:
+            (archive路径, 被篡改的 VFS 路径, 原始内容, 校验 Hook)
+        """
+        checksum_hook = request.param
+        src_dir, files = shared_sample_files
+        archive_path = tmp_path_factory.mktemp("corrupt") / "corrupt.archive"
+        
+        builder = ArchiveBuilder(str(archive_path), checksum_hook=checksum_hook)
         builder.add_dir(str(src_dir), "/assets")
         builder.build()
         
-        archive_size = archive_path.stat().st_size
+        # 篡改最大条目的数据区中间位置 (无压缩，数据原样存储)
+        with ArchiveReader(str(archive_path)) as reader:
+            name = max(files, key=lambda n: reader.get_entry(f"/assets/{n}").packed_size)
+            target = f"/assets/{name}"
+            entry = reader.get_entry(target)
         
-        # 篡改数据区 (文件中间位置)
-        corrupt_pos = archive_size // 2
+        corrupt_pos = entry.offset + entry.packed_size // 2
         with open(archive_path, "r+b") as f:
             f.seek(corrupt_pos)
-            f.write(b"CORRUPTED!DATA!")
+            original = f.read(1)
+            f.seek(corrupt_pos)
+            f.write(bytes([original[0] ^ 0xFF]))
         
-        with ArchiveReader(str(archive_path), checksum_hook=MD5Hook()) as reader:
-            # 尝试读取所有文件，至少有一个应该校验失败
-            corruption_detected = False
-            for name in files:
-                try:
-                    reader.read(f"/assets/{name}", verify=True)
-                except CorruptedDataError:
-                    corruption_detected = True
-                    break
-                except Exception:
-                    # 其他异常也视为检测到损坏
-                    corruption_detected = True
-                    break
-            
-            assert corruption_detected, "应检测到数据损坏"
+        return archive_path, target, files[name], checksum_hook
+    
+    def test_verify_corrupted(self, corrupted_archive):
+        """校验损坏的数据应抛出异常"""
+        archive_path, target, _, checksum_hook = corrupted_archive
+        
+        with ArchiveReader(str(archive_path), checksum_hook=checksum_hook) as reader:
+            with pytest.raises(CorruptedDataError):
+                reader.read(target, verify=True)
+            with pytest.raises(CorruptedDataError):
+                reader.view(target, verify=True)
+    
+    def test_corrupted_unverified_read(self, corrupted_archive):
+        """不校验时返回被篡改的数据"""
+        archive_path, target, original, _ = corrupted_archive
+        
+        with ArchiveReader(str(archive_path)) as reader:
+            data = reader.read(target, verify=False)
+        
+        assert len(data) == len(original)
+        assert data != original
 
 
 class TestArchiveReaderBatch:
@@ -419,22 +684,90 @@ class TestArchiveReaderBatch:
         
         with ArchiveReader(
             str(archive_path),
-            compression_hooks=[ZlibHook()]
+            compression_hooks=[_ZLIB]
+        ) as reader:
+            result = reader.read_batch(_BATCH_PATHS)
+        
+        assert set(result) == set(_BATCH_PATHS)
+        for path in _BATCH_PATHS:
+            assert result[path] == files[path[len("/assets/"):]]
+    
+    def test_read_batch_skip_missing(self, archive_file):
+        """on_error='skip' 时跳过不存在的路径"""
+        archive_path, src_dir, files = archive_file
+        
+        with ArchiveReader(
+            str(archive_path),
+            compression_hooks=[_ZLIB]
+        ) as reader:
+            result = reader.read_batch(_BATCH_PATHS + ("/assets/missing.txt",), on_error='skip')
+        
+        assert set(result) == set(_BATCH_PATHS)
+    
+    def test_merge_prefetch_ranges(self):
+        """预读区间按间隙合并，空区间忽略"""
+        from grimoire.archive.reader import _merge_ranges
+        
+        ranges = [(100, 200), (0, 50), (60, 80), (5000, 5000), (300, 400)]
+        
+        assert _merge_ranges(ranges, gap=10) == [(0, 80), (100, 200), (300, 400)]
+        assert _merge_ranges(ranges, gap=100) == [(0, 400)]
+        assert _merge_ranges([]) == []
+    
+    def test_read_batch_prefetches(self, archive_file, monkeypatch):
+        """传统模式下批量读取前通过 posix_fadvise 提示预读"""
+        if not hasattr(os, 'posix_fadvise'):
+            pytest.skip("平台不支持 posix_fadvise")
+        archive_path, src_dir, files = archive_file
+        calls = []
+        monkeypatch.setattr(os, 'posix_fadvise', lambda *args: calls.append(args))
+        
+        with ArchiveReader(
+            str(archive_path),
+            compression_hooks=[_ZLIB],
+            use_mmap=False
         ) as reader:
-            paths = [f"/assets/{name}" for name in list(files.keys())[:2]]
-            result = reader.read_batch(paths)
+            result = reader.read_batch(_BATCH_PATHS)
+        
+        assert set(result) == set(_BATCH_PATHS)
+        assert calls
+        assert all(advice == os.POSIX_FADV_WILLNEED for *_, advice in calls)
+    
+    def test_batch_hashes_each_path_once(self, tmp_path, shared_sample_files):
+        """read_batch 每个路径只计算一次 Hash，extract_all 不再按路径查找"""
+        from grimoire.utils import default_path_hash
+        
+        src_dir, files = shared_sample_files
+        archive_path = tmp_path / "hashed.archive"
+        hashed = []
+        
+        def path_hash(path):
+            hashed.append(path)
+            return default_path_hash(path)
+        
+        builder = ArchiveBuilder(str(archive_path), path_hash_func=path_hash)
+        builder.add_dir(str(src_dir), "/assets")
+        builder.build()
+        
+        with ArchiveReader(str(archive_path), path_hash_func=path_hash) as reader:
+            del hashed[:]
+            result = reader.read_batch(list(_BATCH_PATHS))
+            assert len(hashed) == len(_BATCH_PATHS)
             
-            assert len(result) == 2
-            for path in paths:
-                assert path in result
+            del hashed[:]
+            extracted = reader.extract_all(str(tmp_path / "out"))
+            assert hashed == []
+        
+        assert set(result) == set(_BATCH_PATHS)
+        assert extracted.success_count == len(files)
 
 
 class TestArchiveNoCompression:
     """无压缩模式测试"""
     
-    def test_no_compression(self, tmp_path, sample_files):
+    def test_no_compression(self, tmp_path, shared_sample_files):
         """无压缩模式"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "nocomp.archive"
         
         builder = ArchiveBuilder(str(archive_path))
@@ -457,9 +790,9 @@ class TestArchiveIndexCrypto:
     @pytest.mark.parametrize("crypto_cls", [
         ZlibCompressHook, XorObfuscateHook, ZlibXorHook
     ])
-    def test_index_crypto(self, crypto_cls, tmp_path, sample_files):
+    def test_index_crypto(self, crypto_cls, tmp_path, shared_sample_files):
         """测试不同索引加密方式"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "crypto.archive"
         crypto = crypto_cls()
         
@@ -473,23 +806,64 @@ class TestArchiveIndexCrypto:
         with ArchiveReader(str(archive_path), index_crypto=crypto) as reader:
             assert reader.is_decrypted is True
             assert reader.entry_count == len(files)
+    
+    def test_index_encrypted_once(self, tmp_path, shared_sample_files):
+        """build 只对索引区加密/压缩一次"""
+        src_dir, files = shared_sample_files
+        archive_path = tmp_path / "once.archive"
+        
+        class CountingHook(ZlibCompressHook):
+            calls = 0
+            
+            def encrypt(self, data: bytes) -> bytes:
+                type(self).calls += 1
+                return super().encrypt(data)
+        
+        builder = ArchiveBuilder(str(archive_path), index_crypto=CountingHook())
+        builder.add_dir(str(src_dir), "/assets")
+        builder.build()
+        
+        assert CountingHook.calls == 1
+        with ArchiveReader(str(archive_path), index_crypto=CountingHook()) as reader:
+            assert reader.entry_count == len(files)
+
+
+# (压缩, 校验, 索引加密) 三个开关彼此独立，8 种组合均覆盖不同的构建/读取路径
+ARCHIVE_COMBOS = [
+    (compression, checksum, crypto)
+    for compression in (True, False)
+    for checksum in (True, False)
+    for crypto in (True, False)
+]
+
+
+def _combo_id(combo) -> str:
+    """组合的可读 ID，如 zlib-md5-plain"""
+    compression, checksum, crypto = combo
+    return "-".join((
+        "zlib" if compression else "raw",
+        "md5" if checksum else "nosum",
+        "crypto" if crypto else "plain",
+    ))
 
 
 class TestArchiveCombinations:
     """Archive 功能组合测试"""
     
-    @pytest.mark.parametrize("use_compression", [True, False])
-    @pytest.mark.parametrize("use_checksum", [True, False])
-    @pytest.mark.parametrize("use_crypto", [True, False])
+    @pytest.mark.slow
+    @pytest.mark.parametrize(
+        "use_compression,use_checksum,use_crypto", ARCHIVE_COMBOS,
+        ids=[_combo_id(combo) for combo in ARCHIVE_COMBOS]
+    )
     def test_all_combinations(
         self, use_compression, use_checksum, use_crypto,
-        tmp_path, sample_files
+        tmp_path, shared_sample_files
     ):
         """测试所有功能组合"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "combo.archive"
         
-        compression_hooks = [ZlibHook()] if use_compression else None
+        compression_hooks = [_ZLIB] if use_compression else None
         checksum_hook = MD5Hook() if use_checksum else None
         index_crypto = ZlibCompressHook() if use_crypto else None
         
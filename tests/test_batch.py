@@ -6,6 +6,7 @@
 测试批量添加、读取、进度回调和错误处理。
 """
 
+import os
 import zlib
 
 import pytest
@@ -18,6 +19,8 @@ from grimoire.core.batch import (
     ProgressTracker,
     scan_directory,
     estimate_total_bytes,
+    default_worker_count,
+    bounded_map,
 )
 from grimoire.hooks.base import CompressionHook
 
@@ -28,10 +31,10 @@ class ZlibHook(CompressionHook):
         return 1
     
     def compress(self, data: bytes) -> bytes:
-        return zlib.compress(data, level=6)
+        return zlib.compress(data, level=1)
     
     def decompress(self, data: bytes, raw_size: int) -> bytes:
-        return zlib.decompress(data)
+        return zlib.decompress(data, bufsize=raw_size)
 
 
 # ==================== FileItem 测试 ====================
@@ -78,6 +81,18 @@ class TestProgressInfo:
         
         assert info.progress == 0.5
     
+    def test_slots(self):
+        """使用 __slots__，实例没有 __dict__，字段与比较行为不变"""
+        args = dict(
+            current=1, total=2, current_file="a.txt",
+            bytes_processed=10, bytes_total=20, elapsed_time=1.0
+        )
+        info = ProgressInfo(**args)
+        
+        assert not hasattr(info, "__dict__")
+        assert info == ProgressInfo(**args)
+        assert info.eta == 1.0
+    
     def test_progress_zero_total(self):
         """total=0 时进度为 0"""
         info = ProgressInfo(
@@ -152,6 +167,66 @@ class TestBatchResult:
 
 # ==================== ProgressTracker 测试 ====================
 
+class TestBoundedMap:
+    """bounded_map 测试"""
+    
+    def test_preserves_order(self):
+        """结果按输入顺序产出"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            assert list(bounded_map(executor, lambda x: x * 2, range(20), 3)) == [
+                x * 2 for x in range(20)
+            ]
+    
+    def test_limits_submitted(self):
+        """提前退出时不提交、不执行剩余任务"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        submitted = []
+        
+        def items():
+            for i in range(100):
+                submitted.append(i)
+                yield i
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = bounded_map(executor, lambda x: x, items(), 4)
+            for value in results:
+                if value == 1:
+                    break
+            results.close()
+        
+        assert len(submitted) <= 5
+
+
+class TestDefaultWorkerCount:
+    """default_worker_count 测试"""
+    
+    def test_hints(self, monkeypatch):
+        """不同并行度提示对应的线程数"""
+        monkeypatch.setattr(os, 'cpu_count', lambda: 8)
+        
+        assert default_worker_count('cpu') == 8
+        assert default_worker_count('cpu_fast') == 4
+        assert default_worker_count('io') == 12
+    
+    def test_unknown_cpu_count(self, monkeypatch):
+        """cpu_count 不可用时至少 1 个线程"""
+        monkeypatch.setattr(os, 'cpu_count', lambda: None)
+        
+        assert default_worker_count('cpu') == 1
+        assert default_worker_count('cpu_fast') == 1
+    
+    def test_builtin_hook_hints(self):
+        """内置 Hook 的并行度提示"""
+        from grimoire.hooks.checksum import CRC32Hook, SHA256Hook
+        
+        assert CRC32Hook.parallelism_hint == 'cpu_fast'
+        assert MD5Hook.parallelism_hint == 'cpu'
+        assert SHA256Hook().parallelism_hint == 'cpu'
+
+
 class TestProgressTracker:
     """ProgressTracker 测试"""
     
@@ -192,9 +267,9 @@ class TestProgressTracker:
 class TestScanDirectory:
     """目录扫描测试"""
     
-    def test_scan_recursive(self, sample_files):
+    def test_scan_recursive(self, shared_sample_files):
         """递归扫描"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         
         items = list(scan_directory(str(src_dir), "/mount"))
         
@@ -203,9 +278,9 @@ class TestScanDirectory:
             # 注意: normalize_path 会去除前导斜杠
             assert "mount/" in item.vfs_path or item.vfs_path.startswith("mount")
     
-    def test_scan_non_recursive(self, sample_files):
+    def test_scan_non_recursive(self, shared_sample_files):
         """非递归扫描"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         
         items = list(scan_directory(str(src_dir), "/mount", recursive=False))
         
@@ -213,18 +288,18 @@ class TestScanDirectory:
         root_files = [f for f in files.keys() if "/" not in f]
         assert len(items) == len(root_files)
     
-    def test_scan_with_algo_id(self, sample_files):
+    def test_scan_with_algo_id(self, shared_sample_files):
         """扫描设置压缩算法"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         
         items = list(scan_directory(str(src_dir), "/mount", algo_id=5))
         
         for item in items:
             assert item.algo_id == 5
     
-    def test_scan_with_exclude(self, sample_files):
+    def test_scan_with_exclude(self, shared_sample_files):
         """排除模式测试"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         
         items = list(scan_directory(
             str(src_dir), "/mount",
@@ -234,6 +309,32 @@ class TestScanDirectory:
         # 应排除所有 .txt 文件
         for item in items:
             assert not item.local_path.endswith(".txt")
+    
+    def test_scan_paths(self, shared_sample_files):
+        """本地路径与虚拟路径一一对应"""
+        src_dir, files = shared_sample_files
+        
+        items = list(scan_directory(str(src_dir), "/mount"))
+        
+        assert sorted(item.vfs_path for item in items) == sorted(
+            "mount/" + rel for rel in files
+        )
+        for item in items:
+            rel = item.vfs_path[len("mount/"):]
+            assert item.local_path == str(src_dir / rel)
+    
+    @pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt",
+                        reason="需要符号链接支持")
+    def test_scan_skips_symlinked_dirs(self, sample_files, tmp_path_factory):
+        """不进入指向目录的符号链接"""
+        src_dir, files = sample_files
+        outside = tmp_path_factory.mktemp("outside")
+        (outside / "extra.bin").write_bytes(b"x")
+        os.symlink(str(outside), str(src_dir / "link"))
+        
+        items = list(scan_directory(str(src_dir), "/mount"))
+        
+        assert len(items) == len(files)
 
 
 # ==================== estimate_total_bytes 测试 ====================
@@ -241,9 +342,9 @@ class TestScanDirectory:
 class TestEstimateTotalBytes:
     """估算总大小测试"""
     
-    def test_estimate(self, sample_files):
+    def test_estimate(self, shared_sample_files):
         """估算文件总大小"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         
         items = list(scan_directory(str(src_dir), "/mount"))
         total = estimate_total_bytes(items)
@@ -251,9 +352,22 @@ class TestEstimateTotalBytes:
         expected = sum(len(content) for content in files.values())
         assert total == expected
     
-    def test_estimate_with_missing_files(self, sample_files):
+    def test_estimate_uses_cached_size(self, shared_sample_files, monkeypatch):
+        """扫描结果带有文件大小，估算时不再 stat"""
+        src_dir, files = shared_sample_files
+        
+        items = list(scan_directory(str(src_dir), "/mount"))
+        assert all(item.size is not None for item in items)
+        
+        def fail(path):
+            raise AssertionError(f"unexpected stat: {path}")
+        
+        monkeypatch.setattr(os.path, "getsize", fail)
+        assert estimate_total_bytes(items) == sum(len(c) for c in files.values())
+    
+    def test_estimate_with_missing_files(self, shared_sample_files):
         """包含不存在文件时应跳过"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         
         items = [
             FileItem(str(src_dir / "hero.txt"), "/hero.txt"),
@@ -264,6 +378,17 @@ class TestEstimateTotalBytes:
         
         # 只计算存在的文件
         assert total == len(files["hero.txt"])
+    
+    def test_estimate_mixed_cached_size(self, shared_sample_files):
+        """缓存大小与需 stat 的条目混合"""
+        src_dir, files = shared_sample_files
+        
+        items = [
+            FileItem(str(src_dir / "hero.txt"), "/hero.txt", size=100),
+            FileItem(str(src_dir / "hero.txt"), "/hero2.txt"),
+        ]
+        
+        assert estimate_total_bytes(items) == 100 + len(files["hero.txt"])
 
 
 # ==================== 批量操作集成测试 ====================
@@ -271,9 +396,9 @@ class TestEstimateTotalBytes:
 class TestBatchAddWithProgress:
     """带进度回调的批量添加测试"""
     
-    def test_progress_callback(self, tmp_path, sample_files):
+    def test_progress_callback(self, tmp_path, shared_sample_files):
         """进度回调测试"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "batch.archive"
         
         progress_calls = []
@@ -303,9 +428,9 @@ class TestBatchAddWithProgress:
         assert result.failed_count == 0
         assert len(progress_calls) >= 1
     
-    def test_progress_info_accuracy(self, tmp_path, sample_files):
+    def test_progress_info_accuracy(self, tmp_path, shared_sample_files):
         """进度信息准确性"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "accuracy.archive"
         
         final_info = None
@@ -331,9 +456,9 @@ class TestBatchErrorHandling:
     """批量操作错误处理测试"""
     
     @pytest.mark.parametrize("on_error", ['skip', 'abort'])
-    def test_error_handling_strategies(self, on_error, tmp_path, sample_files):
+    def test_error_handling_strategies(self, on_error, tmp_path, shared_sample_files):
         """不同错误处理策略"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "error.archive"
         
         items = [
@@ -349,9 +474,9 @@ class TestBatchErrorHandling:
             assert result.failed_count == 1
         # abort 模式应在第一个错误后停止
     
-    def test_raise_on_error(self, tmp_path, sample_files):
+    def test_raise_on_error(self, tmp_path, shared_sample_files):
         """raise 模式应抛出异常"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "raise.archive"
         
         items = [
@@ -367,9 +492,9 @@ class TestBatchErrorHandling:
 class TestExtractAll:
     """解包所有文件测试"""
     
-    def test_extract_all(self, tmp_path, sample_files):
+    def test_extract_all(self, tmp_path, shared_sample_files):
         """解包所有文件"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "extract.archive"
         output_dir = tmp_path / "output"
         
@@ -393,9 +518,145 @@ class TestExtractAll:
             assert local_path.exists()
             assert local_path.read_bytes() == expected
     
-    def test_extract_all_with_progress(self, tmp_path, sample_files):
-        """带进度回调的解包"""
+    @pytest.mark.parametrize("max_workers", [1, 4])
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    def test_extract_all_mixed_storage(self, tmp_path, sample_files, use_mmap, max_workers):
+        """压缩与未压缩条目混合时，两种读取模式解包结果一致"""
         src_dir, files = sample_files
+        # 小文件不会被压缩，补充可压缩的大文件
+        big = b"compressible content " * 100
+        (src_dir / "big.txt").write_bytes(big)
+        files = dict(files, **{"big.txt": big})
+        archive_path = tmp_path / "mixed.archive"
+        output_dir = tmp_path / "output"
+        
+        builder = ArchiveBuilder(
+            str(archive_path),
+            compression_hooks=[ZlibHook()],
+            checksum_hook=MD5Hook()
+        )
+        for name in files:
+            builder.add_file(str(src_dir / name), f"/assets/{name}", algo_id=1)
+        builder.build()
+        
+        with ArchiveReader(
+            str(archive_path),
+            compression_hooks=[ZlibHook()],
+            checksum_hook=MD5Hook(),
+            use_mmap=use_mmap
+        ) as reader:
+            result = reader.extract_all(str(output_dir), max_workers=max_workers)
+        
+        assert result.success_count == len(files)
+        assert result.total_bytes == sum(len(c) for c in files.values())
+        for name, expected in files.items():
+            assert (output_dir / "assets" / name).read_bytes() == expected
+    
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    def test_extract_all_kernel_copy(self, tmp_path, shared_sample_files, monkeypatch, use_mmap):
+        """无需校验的未压缩条目通过 copy_file_range 在内核中复制"""
+        if not hasattr(os, "copy_file_range"):
+            pytest.skip("平台不支持 copy_file_range")
+        src_dir, files = shared_sample_files
+        archive_path = tmp_path / "copy.archive"
+        output_dir = tmp_path / "output"
+        
+        builder = ArchiveBuilder(str(archive_path), checksum_hook=MD5Hook())
+        builder.add_dir(str(src_dir), "/assets")
+        builder.build()
+        
+        calls = []
+        copy_file_range = os.copy_file_range
+        
+        def recording(*args):
+            calls.append(args)
+            return copy_file_range(*args)
+        
+        monkeypatch.setattr(os, "copy_file_range", recording)
+        
+        with ArchiveReader(str(archive_path), use_mmap=use_mmap) as reader:
+            result = reader.extract_all(str(output_dir), verify=False)
+        
+        assert result.success_count == len(files)
+        assert len(calls) >= len(files)
+        for name, expected in files.items():
+            assert (output_dir / "assets" / name).read_bytes() == expected
+    
+    def test_extract_all_kernel_copy_fallback(self, tmp_path, shared_sample_files, monkeypatch):
+        """内核复制失败时回退为读取后写出"""
+        src_dir, files = shared_sample_files
+        archive_path = tmp_path / "fallback.archive"
+        output_dir = tmp_path / "output"
+        
+        builder = ArchiveBuilder(str(archive_path))
+        builder.add_dir(str(src_dir), "/assets")
+        builder.build()
+        
+        def unsupported(*args):
+            raise OSError(38, "Function not implemented")
+        
+        monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+        monkeypatch.setattr(os, "sendfile", unsupported, raising=False)
+        
+        with ArchiveReader(str(archive_path)) as reader:
+            result = reader.extract_all(str(output_dir))
+        
+        assert result.success_count == len(files)
+        for name, expected in files.items():
+            assert (output_dir / "assets" / name).read_bytes() == expected
+    
+    def test_extract_all_abort_releases_views(self, tmp_path, shared_sample_files):
+        """并行解包中止后，提前读取的视图被释放，mmap 可正常关闭"""
+        src_dir, files = shared_sample_files
+        archive_path = tmp_path / "abort.archive"
+        output_dir = tmp_path / "output"
+        
+        builder = ArchiveBuilder(str(archive_path), checksum_hook=MD5Hook())
+        builder.add_dir(str(src_dir), "/assets")
+        builder.build()
+        
+        # 目标路径为目录时写入失败
+        (output_dir / "assets" / "hero.txt").mkdir(parents=True)
+        
+        with ArchiveReader(str(archive_path), checksum_hook=MD5Hook()) as reader:
+            result = reader.extract_all(str(output_dir), on_error='abort', max_workers=4)
+        
+        assert result.failed_count == 1
+        assert result.failed_files[0][0].endswith("assets/hero.txt")
+        assert result.success_count < len(files)
+    
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    def test_extract_all_custom_hook_gets_bytes(self, tmp_path, shared_sample_files, use_mmap):
+        """第三方校验 Hook 的 compute/verify 收到的是 bytes 而非 memoryview"""
+        src_dir, files = shared_sample_files
+        archive_path = tmp_path / "custom.archive"
+        output_dir = tmp_path / "output"
+        
+        class BytesOnlyHook(MD5Hook):
+            seen = []
+            
+            def compute(self, data):
+                self.seen.append(type(data))
+                assert isinstance(data, bytes)
+                return super().compute(data)
+        
+        builder = ArchiveBuilder(str(archive_path), checksum_hook=MD5Hook())
+        builder.add_dir(str(src_dir), "/assets")
+        builder.build()
+        
+        with ArchiveReader(
+            str(archive_path), checksum_hook=BytesOnlyHook(), use_mmap=use_mmap
+        ) as reader:
+            result = reader.extract_all(str(output_dir), max_workers=2)
+        
+        assert result.success_count == len(files)
+        assert BytesOnlyHook.seen and set(BytesOnlyHook.seen) == {bytes}
+        for name, expected in files.items():
+            assert (output_dir / "assets" / name).read_bytes() == expected
+    
+    def test_extract_all_with_progress(self, tmp_path, shared_sample_files):
+        """带进度回调的解包"""
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "progress.archive"
         output_dir = tmp_path / "output"
         
@@ -421,9 +682,9 @@ class TestExtractAll:
 class TestReadBatch:
     """批量读取测试"""
     
-    def test_read_batch(self, tmp_path, sample_files):
+    def test_read_batch(self, tmp_path, shared_sample_files):
         """批量读取多个文件"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "batch.archive"
         
         builder = ArchiveBuilder(str(archive_path))
@@ -438,9 +699,9 @@ class TestReadBatch:
         assert result["/assets/hero.txt"] == files["hero.txt"]
         assert result["/assets/config.json"] == files["config.json"]
     
-    def test_read_batch_with_missing(self, tmp_path, sample_files):
+    def test_read_batch_with_missing(self, tmp_path, shared_sample_files):
         """批量读取包含不存在的路径"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "missing.archive"
         
         builder = ArchiveBuilder(str(archive_path))
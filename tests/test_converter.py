@@ -6,7 +6,9 @@
 测试 Manifest/Archive/JSON 之间的互转功能。
 """
 
+import io
 import json
+import mmap
 import zlib
 
 import pytest
@@ -17,7 +19,9 @@ from grimoire import (
     ManifestJsonConverter, ModeConverter,
     MD5Hook,
 )
-from grimoire.converter import merge_manifests, MergeResult
+from grimoire.converter import (
+    merge_manifests, MergeResult, _dump_manifest_json, _decode_checksums,
+)
 from grimoire.hooks.checksum import SHA256Hook, CRC32Hook
 from grimoire.hooks.crypto import ZlibCompressHook, XorObfuscateHook
 from grimoire.hooks.base import CompressionHook
@@ -39,7 +43,7 @@ class ZlibHook(CompressionHook):
         return zlib.compress(data)
     
     def decompress(self, data: bytes, raw_size: int) -> bytes:
-        return zlib.decompress(data)
+        return zlib.decompress(data, bufsize=raw_size)
 
 
 # ==================== Manifest ↔ JSON 转换测试 ====================
@@ -47,9 +51,9 @@ class ZlibHook(CompressionHook):
 class TestManifestToJson:
     """Manifest 转 JSON 测试"""
     
-    def test_basic_conversion(self, tmp_path, sample_files):
+    def test_basic_conversion(self, tmp_path, shared_sample_files):
         """基础转换"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "test.manifest"
         json_path = tmp_path / "test.json"
         
@@ -71,9 +75,9 @@ class TestManifestToJson:
         assert data["entry_count"] == len(files)
         assert len(data["entries"]) == len(files)
     
-    def test_json_contains_hook_names(self, tmp_path, sample_files):
+    def test_json_contains_hook_names(self, tmp_path, shared_sample_files):
         """JSON 应包含 Hook 名称"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "named.manifest"
         json_path = tmp_path / "named.json"
         
@@ -99,10 +103,10 @@ class TestManifestToJson:
         (CRC32Hook(), 1),
     ])
     def test_different_checksum_algorithms(
-        self, checksum_hook, expected_algo_id, tmp_path, sample_files
+        self, checksum_hook, expected_algo_id, tmp_path, shared_sample_files
     ):
         """测试不同校验算法的转换"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "algo.manifest"
         json_path = tmp_path / "algo.json"
         
@@ -118,6 +122,29 @@ class TestManifestToJson:
         assert data["checksum_algo"] == expected_algo_id
 
 
+class TestDumpManifestJson:
+    """流式 JSON 输出测试"""
+    
+    META = {'version': 2, 'magic': 'GRIM', 'checksum_algo_name': None, 'entry_count': 2}
+    ROWS = [
+        ('/assets/中文.txt', 12, 'ab01'),
+        ('/assets/b"c.bin', None, None),
+    ]
+    
+    @pytest.mark.parametrize("indent", [None, 2, 4])
+    @pytest.mark.parametrize("rows", [ROWS, []])
+    def test_matches_json_dump(self, indent, rows):
+        """输出应与 json.dump 完全一致"""
+        buf = io.StringIO()
+        _dump_manifest_json(buf, self.META, rows, indent=indent)
+        
+        expected = dict(self.META)
+        expected['entries'] = [
+            {'path': p, 'size': s, 'checksum': c} for p, s, c in rows
+        ]
+        assert buf.getvalue() == json.dumps(expected, ensure_ascii=False, indent=indent)
+
+
 class TestJsonToManifest:
     """JSON 转 Manifest 测试"""
     
@@ -173,6 +200,32 @@ class TestJsonToManifest:
         )
         
         assert result.success_count == len(files)
+    
+    @pytest.mark.parametrize("trust_size", [False, True])
+    def test_trust_size(self, tmp_path, sample_files, trust_size):
+        """trust_size=True 时使用 JSON 中的 size，否则以本地文件为准"""
+        src_dir, files = sample_files
+        json_path = tmp_path / "sized.json"
+        manifest_path = tmp_path / "sized.manifest"
+        
+        entries = [{"path": f"assets/{name}", "size": 12345} for name in files.keys()]
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": 2, "checksum_algo": 2, "entries": entries}, f)
+        
+        result = ManifestJsonConverter.json_to_manifest(
+            str(json_path),
+            str(manifest_path),
+            local_base_path=str(src_dir),
+            path_mappings={"assets": str(src_dir)},
+            trust_size=trust_size
+        )
+        
+        assert result.failed_count == 0
+        with ManifestReader(str(manifest_path), checksum_hook=MD5Hook()) as reader:
+            for name, content in files.items():
+                entry = reader.get_entry(f"assets/{name}")
+                assert entry.raw_size == (12345 if trust_size else len(content))
+                assert entry.checksum == MD5Hook().compute(content)
 
 
 class TestManifestJsonRoundtrip:
@@ -252,6 +305,25 @@ class TestJsonToManifestTrusted:
             assert "data/file_a.bin" in all_paths
             assert "data/file_b.txt" in all_paths
 
+    def test_utf8_bom_and_non_ascii_paths(self, tmp_path):
+        """带 BOM 的 UTF-8 JSON 与中文路径均可读取"""
+        json_path = tmp_path / "bom.json"
+        manifest_path = tmp_path / "bom.manifest"
+
+        payload = json.dumps({
+            "version": 2,
+            "magic": "GRIM",
+            "checksum_algo": 0,
+            "index_flags": 0,
+            "entries": [{"path": "资源/英雄.wad", "size": 1, "checksum": ""}],
+        }, ensure_ascii=False)
+        json_path.write_bytes(b"\xef\xbb\xbf" + payload.encode("utf-8"))
+
+        ManifestJsonConverter.json_to_manifest_trusted(str(json_path), str(manifest_path))
+
+        with ManifestReader(str(manifest_path)) as reader:
+            assert reader.list_all() == ["资源/英雄.wad"]
+
     def test_checksum_written_verbatim(self, tmp_path):
         """checksum 应原样写入，不重新计算"""
         json_path = tmp_path / "verbatim.json"
@@ -268,6 +340,17 @@ class TestJsonToManifestTrusted:
             assert entry.checksum.hex() == fake_checksum
             assert entry.raw_size == 999
 
+    @pytest.mark.parametrize("hexes", [
+        ["aabb", "", "ccdd", None],     # 等长，批量解析
+        ["aabb", "ccddeeff", ""],       # 不等长，逐条解析
+        ["AA BB", "ccdd"],              # 含空白，回退逐条解析
+    ])
+    def test_decode_checksums_matches_fromhex(self, hexes):
+        """批量解析结果与逐条 bytes.fromhex 一致"""
+        entries = [{"path": f"f{i}", "checksum": h} for i, h in enumerate(hexes)]
+        expected = [bytes.fromhex(h) if h else b'' for h in hexes]
+        assert _decode_checksums(entries) == expected
+
     def test_empty_checksum_is_allowed(self, tmp_path):
         """checksum 为空字符串或 None 时，写入空字节，不应抛出异常"""
         json_path = tmp_path / "no_checksum.json"
@@ -384,9 +467,9 @@ class TestJsonToManifestTrusted:
 class TestArchiveToManifest:
     """Archive 转 Manifest 测试"""
     
-    def test_basic_conversion(self, tmp_path, sample_files):
+    def test_basic_conversion(self, tmp_path, shared_sample_files):
         """基础转换"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "source.archive"
         manifest_path = tmp_path / "output.manifest"
         
@@ -415,6 +498,48 @@ class TestArchiveToManifest:
             for name, content in files.items():
                 entry = reader.get_entry(f"/assets/{name}")
                 assert entry.raw_size == len(content)
+    
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    @pytest.mark.parametrize("max_workers", [1, 4])
+    def test_parallel_matches_checksums(
+        self, tmp_path, shared_sample_files, monkeypatch, max_workers, use_mmap
+    ):
+        """并行转换结果与直接计算一致，条目顺序保持不变 (含 mmap 失败回退)"""
+        src_dir, files = shared_sample_files
+        archive_path = tmp_path / "source.archive"
+        manifest_path = tmp_path / "output.manifest"
+        
+        builder = ArchiveBuilder(
+            str(archive_path),
+            compression_hooks=[ZlibHook()],
+            checksum_hook=MD5Hook()
+        )
+        builder.add_dir(str(src_dir), "/assets", algo_id=1)
+        builder.build()
+        
+        with ArchiveReader(str(archive_path), compression_hooks=[ZlibHook()]) as reader:
+            archive_order = reader.list_all()
+        
+        if not use_mmap:
+            # mmap 失败时读取器回退为共享文件指针的传统模式
+            def no_mmap(*args, **kwargs):
+                raise OSError("mmap disabled")
+            monkeypatch.setattr(mmap, "mmap", no_mmap)
+        
+        result = ModeConverter.archive_to_manifest(
+            str(archive_path),
+            str(manifest_path),
+            compression_hooks=[ZlibHook()],
+            checksum_hook=MD5Hook(),
+            max_workers=max_workers
+        )
+        
+        assert result.failed_count == 0
+        with ManifestReader(str(manifest_path), checksum_hook=MD5Hook()) as reader:
+            assert [path for path, _ in reader.iter_entries()] == archive_order
+            for name, content in files.items():
+                entry = reader.get_entry(f"/assets/{name}")
+                assert entry.checksum == MD5Hook().compute(content)
 
 
 class TestManifestToArchive:
@@ -462,9 +587,9 @@ class TestManifestToArchive:
 class TestFullConversionChain:
     """完整转换链测试"""
     
-    def test_archive_to_manifest_to_json(self, tmp_path, sample_files):
+    def test_archive_to_manifest_to_json(self, tmp_path, shared_sample_files):
         """Archive → Manifest → JSON"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         
         archive_path = tmp_path / "step1.archive"
         manifest_path = tmp_path / "step2.manifest"
@@ -618,9 +743,9 @@ class TestFullConversionChain:
 class TestMergeManifests:
     """清单合并测试"""
     
-    def test_merge_two_json_manifests(self, tmp_path, sample_files):
+    def test_merge_two_json_manifests(self, tmp_path, shared_sample_files):
         """合并两个 JSON 清单"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         
         # 创建两个 JSON 清单
         json1_path = tmp_path / "manifest1.json"
@@ -668,9 +793,9 @@ class TestMergeManifests:
         assert data["entry_count"] == len(files)
         assert len(data["entries"]) == len(files)
     
-    def test_merge_json_and_binary(self, tmp_path, sample_files):
+    def test_merge_json_and_binary(self, tmp_path, shared_sample_files):
         """合并 JSON 和二进制清单"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         
         files_list = list(files.keys())
         half = len(files_list) // 2
@@ -856,6 +981,8 @@ class TestMergeManifests:
             data = json.load(f)
         
         assert data["magic"] == "TEST"
+        # 缺失的 size/checksum 输出为 null
+        assert data["entries"] == [{"path": "test.txt", "size": None, "checksum": None}]
     
     def test_merge_empty_sources(self, tmp_path):
         """空源列表应返回空结果"""
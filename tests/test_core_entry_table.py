@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+EntryTable 模块测试
+
+测试列式条目表的构建与查找。
+"""
+
+import pytest
+
+from grimoire.core.entry_table import EntryTable
+from grimoire.core.schema import ManifestEntry, ArchiveEntry
+
+
+def _make_archive_entries(count, checksum_size):
+    return [
+        ArchiveEntry(
+            path_hash=0xFFFFFFFFFFFFFF00 + i, dir_id=i, name_id=i * 10, ext_id=i % 3,
+            offset=i * 4096, packed_size=i * 100, raw_size=i * 200,
+            algo_id=i % 2, flags=0, checksum=bytes([i]) * checksum_size
+        )
+        for i in range(count)
+    ]
+
+
+class TestEntryTable:
+    """EntryTable 基础功能测试"""
+    
+    @pytest.mark.parametrize("checksum_size", [0, 4, 16])
+    def test_roundtrip(self, checksum_size):
+        """按 path_hash 取回的条目与原条目一致"""
+        entries = _make_archive_entries(10, checksum_size)
+        table = EntryTable(
+            ArchiveEntry, b''.join(e.pack() for e in entries), len(entries), checksum_size
+        )
+        
+        assert len(table) == len(entries)
+        assert list(table.values()) == entries
+        assert table.keys() == [e.path_hash for e in entries]
+        for entry in entries:
+            assert entry.path_hash in table
+            assert table[entry.path_hash] == entry
+    
+    def test_missing_hash(self):
+        """不存在的 path_hash"""
+        entries = [ManifestEntry(path_hash=1, raw_size=5)]
+        table = EntryTable(ManifestEntry, entries[0].pack(), 1)
+        
+        assert 2 not in table
+        assert table.get(2) is None
+        with pytest.raises(KeyError):
+            table[2]
+    
+    def test_empty(self):
+        """空表"""
+        table = EntryTable(ManifestEntry, b'', 0, 16)
+        
+        assert len(table) == 0
+        assert list(table.values()) == []
+    
+    def test_column(self):
+        """列访问返回紧凑数组"""
+        entries = _make_archive_entries(5, 0)
+        table = EntryTable(ArchiveEntry, b''.join(e.pack() for e in entries), 5)
+        
+        assert list(table.column('raw_size')) == [e.raw_size for e in entries]
+        assert table.column('path_hash').itemsize == 8
+    
+    def test_unsorted_lookup(self):
+        """存储顺序无序时二分查找仍正确，遍历保持存储顺序"""
+        hashes = [2**64 - 1, 7, 2**63, 0, 42]
+        entries = [ManifestEntry(path_hash=h, raw_size=i) for i, h in enumerate(hashes)]
+        table = EntryTable(ManifestEntry, b''.join(e.pack() for e in entries), 5)
+        
+        assert table.keys() == hashes
+        for entry in entries:
+            assert table[entry.path_hash] == entry
+        assert 8 not in table
+        assert 2**64 - 2 not in table
+    
+    def test_duplicate_hash_keeps_last(self):
+        """重复 path_hash 保留最后一行"""
+        entries = [
+            ManifestEntry(path_hash=3, raw_size=1),
+            ManifestEntry(path_hash=5, raw_size=2),
+            ManifestEntry(path_hash=3, raw_size=3),
+        ]
+        table = EntryTable(ManifestEntry, b''.join(e.pack() for e in entries), 3)
+        
+        assert len(table) == 2
+        assert table[3].raw_size == 3
+        assert sorted(table.keys()) == [3, 5]
+    
+    def test_column_values(self):
+        """column_values 与 values() 顺序一致"""
+        entries = [
+            ManifestEntry(path_hash=3, dir_id=1),
+            ManifestEntry(path_hash=5, dir_id=2),
+            ManifestEntry(path_hash=3, dir_id=3),
+        ]
+        table = EntryTable(ManifestEntry, b''.join(e.pack() for e in entries), 3)
+        
+        assert table.column_values('dir_id') == [e.dir_id for e in table.values()]
+        
+        unique = EntryTable(ManifestEntry, b''.join(e.pack() for e in entries[:2]), 2)
+        assert unique.column_values('dir_id') == [1, 2]
@@ -121,6 +121,14 @@ class TestIndexHeader:
         assert unpacked.ext_count == original.ext_count
         assert unpacked.string_table_size == original.string_table_size
         assert unpacked.checksum_size == original.checksum_size
+    
+    def test_reserved_bytes(self):
+        """保留字节写入 0，读取时忽略"""
+        packed = IndexHeader(checksum_size=4).pack()
+        assert packed[-3:] == b'\x00\x00\x00'
+        
+        unpacked = IndexHeader.unpack(packed[:-3] + b'\xff\xff\xff')
+        assert unpacked == IndexHeader(checksum_size=4)
 
 
 # ==================== DataHeader 测试 ====================
@@ -132,6 +140,12 @@ class TestDataHeader:
         """大小常量验证"""
         assert DataHeader.SIZE == 16
     
+    def test_magic_int(self):
+        """整数魔法数校验"""
+        assert DataHeader.MAGIC_INT == 0x41544144
+        assert DataHeader.has_valid_magic(DataHeader().pack())
+        assert not DataHeader.has_valid_magic(DataHeader(magic=b'DAT\x00').pack())
+    
     def test_default_values(self):
         """默认值验证"""
         header = DataHeader()
@@ -219,6 +233,22 @@ class TestManifestEntry:
         assert unpacked.checksum == checksum
 
 
+class TestManifestEntryBatch:
+    """ManifestEntry 批量打包测试"""
+    
+    @pytest.mark.parametrize("checksum_size", [0, 16])
+    def test_pack_many(self, checksum_size):
+        """批量打包与逐条打包结果一致"""
+        entries = [
+            ManifestEntry(path_hash=i, dir_id=i, raw_size=i * 7,
+                          checksum=bytes([i]) * checksum_size)
+            for i in range(5)
+        ]
+        
+        assert ManifestEntry.pack_many(entries, checksum_size) == b''.join(e.pack() for e in entries)
+        assert ManifestEntry.pack_many([], checksum_size) == b''
+
+
 # ==================== ArchiveEntry 测试 ====================
 
 class TestArchiveEntry:
@@ -264,6 +294,45 @@ class TestArchiveEntry:
         assert unpacked.offset == original.offset  # 修正字段名
         assert unpacked.algo_id == original.algo_id
         assert unpacked.checksum == original.checksum
+    
+    def test_unpack_with_offset(self):
+        """从整表 memoryview 按偏移解包，checksum 为独立 bytes"""
+        entries = [
+            ArchiveEntry(path_hash=i, offset=i * 100, raw_size=i, checksum=bytes([i]) * 4)
+            for i in range(1, 4)
+        ]
+        table = memoryview(b''.join(e.pack() for e in entries))
+        size = ArchiveEntry.entry_size(4)
+        
+        for i, expected in enumerate(entries):
+            unpacked = ArchiveEntry.unpack(table, 4, offset=i * size)
+            assert unpacked == expected
+            assert type(unpacked.checksum) is bytes
+    
+    @pytest.mark.parametrize("checksum_size", [0, 4, 32])
+    def test_pack_many(self, checksum_size):
+        """批量打包与逐条打包结果一致"""
+        entries = [
+            ArchiveEntry(path_hash=i, dir_id=i, offset=i * 100, packed_size=i,
+                         raw_size=i * 2, algo_id=1, flags=i % 2,
+                         checksum=bytes([i]) * checksum_size)
+            for i in range(5)
+        ]
+        table = ArchiveEntry.pack_many(entries, checksum_size)
+        
+        assert table == b''.join(e.pack() for e in entries)
+    
+    def test_pack_many_into(self):
+        """写入预分配缓冲区的指定偏移"""
+        entries = [ArchiveEntry(path_hash=i, raw_size=i, checksum=b'\x01' * 4) for i in range(3)]
+        size = ArchiveEntry.entry_size(4)
+        out = bytearray(8 + size * 3)
+        
+        end = ArchiveEntry.pack_many_into(entries, out, 8, 4)
+        
+        assert end == len(out)
+        assert out[:8] == bytes(8)
+        assert bytes(out[8:]) == ArchiveEntry.pack_many(entries, 4)
 
 
 # ==================== 边界条件测试 ====================
@@ -271,6 +340,11 @@ class TestArchiveEntry:
 class TestSchemaEdgeCases:
     """边界条件测试"""
     
+    def test_entry_repr(self):
+        """条目 repr 仅包含 path_hash"""
+        assert repr(ManifestEntry(path_hash=0xAB, raw_size=3)) == "ManifestEntry(0x00000000000000ab)"
+        assert repr(ArchiveEntry(path_hash=1)) == "ArchiveEntry(0x0000000000000001)"
+    
     def test_max_path_hash(self):
         """最大路径 Hash 值"""
         entry = ManifestEntry(path_hash=0xFFFFFFFFFFFFFFFF)
@@ -294,3 +368,15 @@ class TestSchemaEdgeCases:
         unpacked = FileHeader.unpack(packed)
         
         assert unpacked.entry_count == 0xFFFFFFFF
+    
+    @pytest.mark.parametrize("cls", [FileHeader, IndexHeader, DataHeader])
+    def test_header_struct_size(self, cls):
+        """预编译的 Struct 与声明的 SIZE 一致"""
+        assert cls.STRUCT.size == cls.SIZE
+        assert cls.STRUCT.format == cls.FORMAT
+    
+    @pytest.mark.parametrize("cls", [ManifestEntry, ArchiveEntry])
+    def test_entry_struct_size(self, cls):
+        """预编译的 Struct 与声明的 BASE_SIZE 一致"""
+        assert cls.BASE_STRUCT.size == cls.BASE_SIZE
+        assert cls.BASE_STRUCT.format == cls.BASE_FORMAT
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+字符串字典模块测试
+
+测试 StringTable / PathDictionary 的序列化与路径重建。
+"""
+
+import io
+
+import pytest
+
+from grimoire.core.binary_io import BinaryWriter
+from grimoire.core.string_table import StringTable, PathDictionary
+
+
+def _pack(path_dict):
+    buf = io.BytesIO()
+    path_dict.pack(BinaryWriter(buf))
+    return buf.getvalue()
+
+
+def _make_dict():
+    path_dict = PathDictionary()
+    path_dict.add_path("/", "root", ".txt")
+    path_dict.add_path("assets/中文", "图片", ".png")
+    path_dict.add_path("", "noext", "")
+    return path_dict
+
+
+class TestPathDictionaryFromBytes:
+    """单次遍历反序列化测试"""
+    
+    def test_roundtrip(self):
+        """from_bytes 与原字典内容一致"""
+        path_dict = _make_dict()
+        restored = PathDictionary.from_bytes(_pack(path_dict), 3, 3, 3)
+        
+        assert list(restored.dirs) == list(path_dict.dirs)
+        assert list(restored.names) == list(path_dict.names)
+        assert list(restored.exts) == list(path_dict.exts)
+    
+    def test_lazy_index(self):
+        """解析得到的表仍支持 in / add"""
+        restored = PathDictionary.from_bytes(_pack(_make_dict()), 3, 3, 3)
+        
+        assert "root" in restored.names
+        assert restored.names.add("root") == 0
+        assert restored.names.add("new") == 3
+        assert restored.names.get(3) == "new"
+    
+    def test_truncated(self):
+        """数据不足时抛出 EOFError"""
+        data = _pack(_make_dict())
+        
+        with pytest.raises(EOFError):
+            PathDictionary.from_bytes(data[:-1], 3, 3, 3)
+        with pytest.raises(EOFError):
+            PathDictionary.from_bytes(data, 3, 3, 4)
+    
+    def test_ascii_roundtrip(self):
+        """纯 ASCII 数据 (整块解码路径) 往返一致"""
+        path_dict = PathDictionary()
+        path_dict.add_path("game/data", "hero", ".wad")
+        path_dict.add_path("", ".hidden", "")
+        data = _pack(path_dict)
+        restored = PathDictionary.from_bytes(data, 2, 2, 2)
+        
+        assert data.isascii()
+        assert list(restored.dirs) == ["game/data", ""]
+        assert list(restored.names) == ["hero", ".hidden"]
+        assert list(restored.exts) == [".wad", ""]
+        with pytest.raises(EOFError):
+            PathDictionary.from_bytes(data[:-1], 2, 2, 2)
+    
+    def test_string_table_from_bytes(self):
+        """StringTable.from_bytes"""
+        table = StringTable()
+        for s in ["a", "bb", ""]:
+            table.add(s)
+        buf = io.BytesIO()
+        table.pack(BinaryWriter(buf))
+        
+        assert list(StringTable.from_bytes(buf.getvalue(), 3)) == ["a", "bb", ""]
+
+
+class TestToBytes:
+    """序列化测试"""
+    
+    def test_matches_write_string(self):
+        """to_bytes 与逐个 write_string 的输出一致"""
+        path_dict = _make_dict()
+        buf = io.BytesIO()
+        writer = BinaryWriter(buf)
+        for table in (path_dict.dirs, path_dict.names, path_dict.exts):
+            for s in table:
+                writer.write_string(s)
+        
+        assert path_dict.to_bytes() == buf.getvalue()
+        assert _pack(path_dict) == buf.getvalue()
+    
+    def test_pack_returns_size(self):
+        """pack 返回写入字节数"""
+        table = StringTable.from_strings(["路径", "x"])
+        buf = io.BytesIO()
+        
+        assert table.pack(BinaryWriter(buf)) == len(table.to_bytes()) == 2 + 6 + 2 + 1
+
+
+class TestBuildPaths:
+    """批量路径重建测试"""
+    
+    def test_matches_get_path(self):
+        """build_paths 与 get_path 结果一致"""
+        path_dict = _make_dict()
+        ids = [(0, 0, 0), (1, 1, 1), (2, 2, 2), (1, 0, 2)]
+        
+        paths = path_dict.build_paths(*zip(*ids))
+        
+        assert paths == [path_dict.get_path(*i) for i in ids]
+        assert paths[0] == "/root.txt"
+        assert paths[1] == "assets/中文/图片.png"
+    
+    def test_empty(self):
+        """空输入"""
+        assert _make_dict().build_paths([], [], []) == []
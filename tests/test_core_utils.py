@@ -13,7 +13,9 @@ import pytest
 from grimoire.utils import (
     normalize_path,
     split_path,
+    split_path_many,
     default_path_hash,
+    default_path_hash_many,
     compute_file_hash,
 )
 
@@ -59,6 +61,25 @@ class TestNormalizePath:
         """仅根路径"""
         result = normalize_path("/")
         assert result == ""
+    
+    @pytest.mark.parametrize("raw, expected", [
+        ("a////b", "a/b"),
+        ("a\\\\/b\\c", "a/b/c"),
+        ("//" * 1000 + "x", "x"),
+        ("a/" + "/" * 5000 + "b/", "a/b"),
+    ])
+    def test_collapse_slash_runs(self, raw, expected):
+        """任意长度的连续斜杠 (含混合反斜杠) 合并为一个"""
+        assert normalize_path(raw) == expected
+        assert normalize_path(raw, absolute=True) == "/" + expected
+    
+    def test_cached_per_mode(self):
+        """缓存按 absolute 区分，重复调用结果一致"""
+        path = "Cache\\Dir//file.bin"
+        
+        for _ in range(2):
+            assert normalize_path(path) == "Cache/Dir/file.bin"
+            assert normalize_path(path, absolute=True) == "/Cache/Dir/file.bin"
 
 
 # ==================== split_path 测试 ====================
@@ -93,6 +114,33 @@ class TestSplitPath:
         result = split_path("")
         # 空路径时目录返回空字符串, 文件名和扩展名为空
         assert result == ("", "", "")
+    
+    @pytest.mark.parametrize("basename", [
+        "file.", "..a", "...", ".a.b", "a..b", "noext", ".x.",
+    ])
+    def test_ext_matches_splitext(self, basename):
+        """扩展名拆分与 posixpath.splitext 一致"""
+        import posixpath
+        
+        _, name, ext = split_path("dir/" + basename)
+        assert (name, ext) == posixpath.splitext(basename)
+    
+    def test_split_many_matches_split(self):
+        """批量拆分与逐个 split_path 一致"""
+        paths = [normalize_path(p) for p in [
+            "Game/MOD/hero.wad", "config.json", ".hidden", "a/b/.x.y", "data/README", "",
+        ]]
+        
+        assert split_path_many(paths) == [split_path(p) for p in paths]
+        assert split_path_many([]) == []
+    
+    def test_split_many_shares_dirs(self):
+        """批量拆分结果中相同目录/扩展名共享同一对象"""
+        paths = [normalize_path(f"Game/Data/file{i}.wad") for i in range(3)]
+        parts = split_path_many(paths)
+        
+        assert parts[0][0] is parts[1][0] is parts[2][0]
+        assert parts[0][2] is parts[2][2]
 
 
 # ==================== default_path_hash 测试 ====================
@@ -148,6 +196,13 @@ class TestDefaultPathHash:
         
         assert isinstance(result, int)
         assert 0 <= result < 2**64
+    
+    def test_many_matches_single(self):
+        """批量计算与逐个计算一致"""
+        paths = ["test/path.txt", "游戏/资源/英雄.wad", "a", ""]
+        
+        assert default_path_hash_many(paths) == [default_path_hash(p) for p in paths]
+        assert default_path_hash_many([]) == []
 
 
 # ==================== compute_file_hash 测试 ====================
@@ -209,6 +264,39 @@ class TestComputeFileHash:
         
         assert result == expected
     
+    def test_chunked_and_mmap_paths(self, tmp_path, monkeypatch):
+        """分块读取与 mmap 路径结果一致"""
+        import grimoire.utils as utils
+        
+        file_path = tmp_path / "data.bin"
+        content = bytes(range(256)) * 1000
+        file_path.write_bytes(content)
+        expected = hashlib.sha256(content).digest()
+        
+        # 分块读取
+        assert compute_file_hash(str(file_path), "sha256", chunk_size=4096) == expected
+        
+        # mmap
+        monkeypatch.setattr(utils, 'MMAP_THRESHOLD', 1024)
+        assert compute_file_hash(str(file_path), "sha256", chunk_size=4096) == expected
+    
+    def test_mmap_failure_falls_back(self, tmp_path, monkeypatch):
+        """mmap 不可用时回退为分块读取"""
+        import grimoire.utils as utils
+        
+        def broken_mmap(*args, **kwargs):
+            raise OSError("mmap not supported")
+        
+        file_path = tmp_path / "data.bin"
+        content = b"abc" * 10000
+        file_path.write_bytes(content)
+        
+        monkeypatch.setattr(utils, 'MMAP_THRESHOLD', 1024)
+        monkeypatch.setattr(utils.mmap, 'mmap', broken_mmap)
+        
+        result = compute_file_hash(str(file_path), "md5", chunk_size=4096)
+        assert result == hashlib.md5(content).digest()
+    
     def test_unicode_filename(self, tmp_path):
         """Unicode 文件名"""
         file_path = tmp_path / "测试文件.txt"
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+异常模块测试
+"""
+
+import pickle
+
+import pytest
+
+from grimoire.exceptions import (
+    GrimoireError,
+    HashCollisionError,
+    CorruptedDataError,
+    UnknownAlgorithmError,
+    VersionMismatchError,
+    ManifestVersionMismatchError,
+    ManifestAlgorithmMismatchError,
+    PathConflictError,
+)
+
+
+class TestExceptionMessages:
+    """异常消息测试"""
+    
+    def test_hash_collision(self):
+        """Hash 冲突消息"""
+        exc = HashCollisionError("a.txt", "b.txt", 0x1234)
+        
+        assert exc.path1 == "a.txt"
+        assert exc.hash_value == 0x1234
+        assert str(exc) == (
+            "路径 Hash 冲突: 'a.txt' 与 'b.txt' "
+            "产生相同的 Hash 值 0x0000000000001234"
+        )
+    
+    def test_corrupted_data(self):
+        """校验失败消息"""
+        exc = CorruptedDataError("x.bin", b'\xab\xcd', b'\x00\x01')
+        
+        assert str(exc) == "文件 'x.bin' 校验失败: 期望 abcd, 实际 0001"
+    
+    def test_other_messages(self):
+        """其余异常消息"""
+        assert str(UnknownAlgorithmError(9, "compression")) == "未知的 compression ID: 9"
+        assert str(VersionMismatchError(3, [1, 2])) == "不支持的文件版本 3, 支持的版本: [1, 2]"
+        assert str(ManifestVersionMismatchError([1, 2])) == "清单版本不匹配，无法合并: [1, 2]"
+        assert str(ManifestAlgorithmMismatchError([1, 3])) == "校验算法不匹配，无法合并: [1, 3]"
+        assert "'p.txt'" in str(PathConflictError("p.txt", [0, 1]))
+    
+    def test_raise_and_catch(self):
+        """可作为 GrimoireError 捕获"""
+        with pytest.raises(GrimoireError, match="校验失败"):
+            raise CorruptedDataError("x.bin", b'\x01', b'\x02')
+    
+    @pytest.mark.parametrize("exc", [
+        HashCollisionError("a", "b", 1),
+        CorruptedDataError("x", b'\x01', b'\x02'),
+        UnknownAlgorithmError(5),
+        PathConflictError("p", [0, 2]),
+    ])
+    def test_pickle_roundtrip(self, exc):
+        """pickle 往返后字段与消息保持一致"""
+        restored = pickle.loads(pickle.dumps(exc))
+        
+        assert type(restored) is type(exc)
+        assert str(restored) == str(exc)
+    
+    @pytest.mark.parametrize("exc", [
+        HashCollisionError("a", "b", 1),
+        CorruptedDataError("x", b'\x01', b'\x02'),
+        UnknownAlgorithmError(5, "compression"),
+        VersionMismatchError(3, [1, 2]),
+        ManifestVersionMismatchError([1, 2]),
+        ManifestAlgorithmMismatchError([1, 3]),
+        PathConflictError("p", [0, 2]),
+    ])
+    def test_args_is_message(self, exc):
+        """args 保持为 (message,)"""
+        assert exc.args == (str(exc),)
+        
+        restored = pickle.loads(pickle.dumps(exc))
+        assert restored.args == exc.args
@@ -7,7 +7,8 @@
 """
 
 import os
-import tempfile
+import subprocess
+import sys
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
@@ -17,7 +18,9 @@ from grimoire.hooks.external import (
     ExternalToolLocator,
     ExternalToolManager,
     ToolInfo,
+    data_as_file,
     get_tool_manager,
+    iter_process_lines,
 )
 
 
@@ -129,6 +132,112 @@ class TestExternalToolLocator:
         assert user_path.parent.parent == Path.home()
 
 
+class TestToolInfoCache:
+    """测试工具信息缓存"""
+    
+    @pytest.fixture
+    def fake_tool(self, tmp_path):
+        """假的可执行文件，并将用户数据目录指向临时目录"""
+        fake_exe = tmp_path / "fake_tool"
+        fake_exe.write_text("fake")
+        os.chmod(fake_exe, 0o755)
+        
+        ExternalToolLocator.clear_cache()
+        ExternalToolLocator._info_cache_loaded = False
+        with patch.object(
+            ExternalToolLocator, 'get_user_data_path',
+            return_value=tmp_path / '.grimoire' / 'bin'
+        ):
+            yield fake_exe
+        ExternalToolLocator.clear_cache()
+        ExternalToolLocator._info_cache_loaded = False
+    
+    def test_version_probed_once(self, fake_tool):
+        """同一可执行文件只探测一次版本"""
+        with patch.object(
+            ExternalToolLocator, '_get_tool_version', return_value='v1.0.0'
+        ) as probe:
+            info1 = ExternalToolLocator.get_tool_info('fake', str(fake_tool))
+            info2 = ExternalToolLocator.get_tool_info('fake', str(fake_tool))
+        
+        assert probe.call_count == 1
+        assert info1.version == info2.version == 'v1.0.0'
+    
+    def test_persisted_across_processes(self, fake_tool):
+        """缓存写入磁盘，清空内存后仍可命中"""
+        with patch.object(
+            ExternalToolLocator, '_get_tool_version', return_value='v2.0.0'
+        ):
+            ExternalToolLocator.get_tool_info('fake', str(fake_tool))
+        
+        assert ExternalToolLocator.get_tool_cache_path().exists()
+        
+        # 模拟新进程
+        ExternalToolLocator.clear_cache()
+        ExternalToolLocator._info_cache_loaded = False
+        with patch.object(ExternalToolLocator, '_get_tool_version') as probe:
+            info = ExternalToolLocator.get_tool_info('fake', str(fake_tool))
+        
+        probe.assert_not_called()
+        assert info.version == 'v2.0.0'
+    
+    def test_invalidated_when_executable_changes(self, fake_tool):
+        """可执行文件变化 (大小/mtime) 时重新探测"""
+        with patch.object(
+            ExternalToolLocator, '_get_tool_version', return_value='v1.0.0'
+        ):
+            ExternalToolLocator.get_tool_info('fake', str(fake_tool))
+        
+        fake_tool.write_text("a newer, larger fake binary")
+        
+        with patch.object(
+            ExternalToolLocator, '_get_tool_version', return_value='v1.1.0'
+        ) as probe:
+            info = ExternalToolLocator.get_tool_info('fake', str(fake_tool))
+        
+        assert probe.call_count == 1
+        assert info.version == 'v1.1.0'
+
+    
+    def test_manager_defers_version_probe(self, fake_tool):
+        """initialize 不探测版本，get_tool_version 按需探测一次"""
+        def find(name, explicit_path=None, use_cache=True):
+            return str(fake_tool) if name == 'fhash' else None
+        
+        with patch.object(ExternalToolLocator, 'find_executable', side_effect=find), \
+                patch.object(
+                    ExternalToolLocator, '_get_tool_version', return_value='v0.2.0'
+                ) as probe:
+            manager = ExternalToolManager()
+            assert manager.list_available_tools() == ['fhash']
+            assert probe.call_count == 0
+            
+            assert manager.get_tool_version('fhash') == 'v0.2.0'
+            assert manager.get_tool_version('fhash') == 'v0.2.0'
+            assert manager.get_tool_version('rclone') is None
+        
+        assert probe.call_count == 1
+    
+    def test_failed_probe_marks_unavailable(self, fake_tool):
+        """版本探测失败的工具视为不可用"""
+        with patch.object(
+            ExternalToolLocator, 'find_executable', return_value=str(fake_tool)
+        ), patch.object(ExternalToolLocator, '_get_tool_version', return_value=None):
+            manager = ExternalToolManager()
+            assert manager.is_available('fhash')
+            assert manager.get_tool_version('fhash') is None
+            assert not manager.is_available('fhash')
+    
+    @pytest.mark.parametrize("output, expected", [
+        ("fhash v0.1.0", "v0.1.0"),
+        ("rclone v1.72.1\n- os/version: linux", "v1.72.1"),
+        ("custom-tool 3", "custom-tool 3"),
+    ])
+    def test_parse_version(self, output, expected):
+        """版本号解析"""
+        assert ExternalToolLocator._parse_version(output) == expected
+
+
 class TestExternalToolManager:
     """测试 ExternalToolManager"""
     
@@ -170,6 +279,73 @@ class TestGetToolManager:
         assert manager1 is manager2
 
 
+class TestIterProcessLines:
+    """测试 iter_process_lines"""
+    
+    def test_yields_lines(self):
+        """应逐行返回 stdout"""
+        cmd = [sys.executable, '-c', 'print("a"); print("b")']
+        
+        lines = [line.rstrip() for line in iter_process_lines(cmd)]
+        
+        assert lines == [b'a', b'b']
+    
+    def test_check_nonzero_exit(self):
+        """check=True 时非零退出码应抛出 CalledProcessError"""
+        cmd = [sys.executable, '-c', 'print("a"); raise SystemExit(3)']
+        
+        assert len(list(iter_process_lines(cmd))) == 1
+        with pytest.raises(subprocess.CalledProcessError):
+            list(iter_process_lines(cmd, check=True))
+    
+    def test_timeout(self):
+        """超时应终止进程并抛出 TimeoutExpired"""
+        cmd = [sys.executable, '-c', 'import time; time.sleep(30)']
+        
+        with pytest.raises(subprocess.TimeoutExpired):
+            list(iter_process_lines(cmd, timeout=0.5))
+    
+    def test_early_close(self):
+        """提前关闭迭代器应结束子进程"""
+        cmd = [sys.executable, '-c',
+               'import time\nprint("a", flush=True)\ntime.sleep(30)']
+        
+        lines = iter_process_lines(cmd)
+        assert next(lines).rstrip() == b'a'
+        lines.close()
+
+
+class TestDataAsFile:
+    """测试 data_as_file"""
+    
+    def test_child_reads_data(self):
+        """子进程应能通过返回的路径读取数据"""
+        data = b"\x00payload\xff" * 1024
+        
+        with data_as_file(data) as (path, pass_fds):
+            result = subprocess.run(
+                [sys.executable, '-c',
+                 'import sys; sys.stdout.buffer.write(open(sys.argv[1], "rb").read())',
+                 path],
+                capture_output=True,
+                check=True,
+                pass_fds=pass_fds
+            )
+        
+        assert result.stdout == data
+    
+    def test_cleanup(self):
+        """退出后临时文件或 fd 应被释放"""
+        with data_as_file(b"x") as (path, pass_fds):
+            pass
+        
+        if pass_fds:
+            with pytest.raises(OSError):
+                os.fstat(pass_fds[0])
+        else:
+            assert not os.path.exists(path)
+
+
 @pytest.mark.fhash
 class TestFhashIntegration:
     """fhash 集成测试 (需要安装 fhash)"""
@@ -9,13 +9,49 @@ FhashHook 单元测试
 
 import hashlib
 import os
-import tempfile
+import sys
+from unittest.mock import patch
 
 import pytest
 
 from grimoire.hooks.fhash import FhashHook, FhashNotFoundError
 
 
+# 模拟 fhash 命令行 (-a 算法 -m -j [-f 列表文件 | 路径])，输出 JSON Lines
+_FAKE_FHASH_SOURCE = """
+import hashlib, json, sys
+args = sys.argv[1:]
+if args == ['-v']:
+    print('fhash v0.0.0-test')
+    sys.exit(0)
+algo = args[args.index('-a') + 1]
+if '-f' in args:
+    with open(args[args.index('-f') + 1]) as f:
+        paths = [line.rstrip('\\n') for line in f if line.strip()]
+else:
+    paths = [args[-1]]
+for path in paths:
+    try:
+        with open(path, 'rb') as f:
+            digest = hashlib.new(algo, f.read()).hexdigest()
+    except OSError as e:
+        print(json.dumps({'path': path, 'error': str(e)}))
+        continue
+    print(json.dumps({'path': path, algo: digest}), flush=True)
+"""
+
+
+@pytest.fixture
+def fake_fhash(tmp_path):
+    """可执行的模拟 fhash 脚本 (仅 POSIX)"""
+    if os.name == 'nt':
+        pytest.skip("模拟脚本依赖 shebang")
+    script = tmp_path / "fake_fhash"
+    script.write_text(f"#!{sys.executable}\n{_FAKE_FHASH_SOURCE}")
+    os.chmod(script, 0o755)
+    return str(script)
+
+
 @pytest.mark.fhash
 class TestFhashHookProperties:
     """测试 FhashHook 属性"""
@@ -234,6 +270,91 @@ class TestFhashEdgeCases:
         assert result == expected
 
 
+class TestFhashStreamingBatch:
+    """测试 compute_files_batch_streaming (使用模拟 fhash)"""
+    
+    def test_streaming_batches(self, tmp_path, fake_fhash):
+        """分多批计算，缺失的文件被跳过"""
+        paths = []
+        for i in range(5):
+            file_path = tmp_path / f"f{i}.bin"
+            file_path.write_bytes(bytes([i]) * (i + 1))
+            paths.append(str(file_path))
+        missing = str(tmp_path / "missing.bin")
+        
+        hook = FhashHook("md5", fhash_path=fake_fhash, check_on_init=False)
+        results = dict(hook.compute_files_batch_streaming(paths + [missing], batch_size=2))
+        
+        assert set(results) == set(paths)
+        for i, path in enumerate(paths):
+            assert results[path] == hashlib.md5(bytes([i]) * (i + 1)).digest()
+    
+    def test_early_close(self, tmp_path, fake_fhash):
+        """提前停止迭代时不报错"""
+        paths = []
+        for i in range(3):
+            file_path = tmp_path / f"f{i}.bin"
+            file_path.write_bytes(b"x")
+            paths.append(str(file_path))
+        
+        hook = FhashHook("md5", fhash_path=fake_fhash, check_on_init=False)
+        stream = hook.compute_files_batch_streaming(paths)
+        assert next(stream)[1] == hashlib.md5(b"x").digest()
+        stream.close()
+    
+    def test_compute_files_batch_and_dir(self, tmp_path, fake_fhash):
+        """compute_files_batch / compute_dir 逐行解析输出"""
+        file_path = tmp_path / "a.txt"
+        file_path.write_bytes(b"Content A")
+        
+        hook = FhashHook("sha1", fhash_path=fake_fhash, check_on_init=False)
+        
+        assert hook.compute_files_batch([str(file_path)]) == {
+            str(file_path): hashlib.sha1(b"Content A").digest()
+        }
+        assert hook.compute_dir(str(file_path)) == {
+            str(file_path): hashlib.sha1(b"Content A").digest()
+        }
+    
+    def test_timeout(self, tmp_path):
+        """超时抛出 TimeoutExpired"""
+        import subprocess
+        
+        if os.name == 'nt':
+            pytest.skip("模拟脚本依赖 shebang")
+        script = tmp_path / "slow_fhash"
+        script.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(30)\n")
+        os.chmod(script, 0o755)
+        
+        hook = FhashHook("md5", fhash_path=str(script), check_on_init=False)
+        with pytest.raises(subprocess.TimeoutExpired):
+            hook.compute_files_batch([str(script)], timeout=0.5)
+    
+    def test_builder_uses_batch(self, tmp_path, fake_fhash):
+        """ManifestBuilder.add_files_batch 通过批量接口计算校验值"""
+        from grimoire import ManifestBuilder, ManifestReader
+        from grimoire.core.batch import FileItem
+        
+        items = []
+        for i in range(3):
+            file_path = tmp_path / f"f{i}.txt"
+            file_path.write_bytes(f"content {i}".encode())
+            items.append(FileItem(str(file_path), f"/data/f{i}.txt"))
+        
+        hook = FhashHook("md5", fhash_path=fake_fhash, check_on_init=False)
+        manifest_path = tmp_path / "out.manifest"
+        builder = ManifestBuilder(str(manifest_path), checksum_hook=hook)
+        with patch.object(FhashHook, 'compute_file', side_effect=AssertionError):
+            result = builder.add_files_batch(items)
+        builder.build()
+        
+        assert result.success_count == 3
+        with ManifestReader(str(manifest_path)) as reader:
+            for i in range(3):
+                entry = reader.get_entry(f"/data/f{i}.txt")
+                assert entry.checksum == hashlib.md5(f"content {i}".encode()).digest()
+
+
 class TestFhashNotInstalled:
     """测试 fhash 未安装的情况"""
     
@@ -247,3 +368,124 @@ class TestFhashNotInstalled:
         # 即使路径无效也不抛出异常
         hook = FhashHook("md5", fhash_path="/invalid/path", check_on_init=False)
         assert hook.algorithm == "md5"
+
+
+class TestFhashComputeViaTool:
+    """测试 compute 通过 fhash 计算内存数据"""
+    
+    def test_compute_through_tool(self, fake_fhash):
+        """非 hashlib 路径应把数据交给 fhash 并得到正确结果"""
+        data = b"in-memory payload" * 1000
+        hook = FhashHook("md5", fhash_path=fake_fhash, check_on_init=False)
+        hook.HASHLIB_ALGORITHMS = set()
+        
+        assert hook.compute(data) == hashlib.md5(data).digest()
+    
+    def test_compute_file_parses_bytes_output(self, fake_fhash, tmp_path):
+        """compute_file 解析 JSON 输出，错误行抛出 ValueError"""
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"abc")
+        hook = FhashHook("sha1", fhash_path=fake_fhash, check_on_init=False)
+        
+        assert hook.compute_file(str(path)) == hashlib.sha1(b"abc").digest()
+        with pytest.raises(ValueError, match="fhash 错误"):
+            hook.compute_file(str(tmp_path / "missing.bin"))
+
+
+class TestFhashAlgorithmName:
+    """测试算法名规范化"""
+    
+    def test_algorithm_interned(self):
+        """算法名转小写后驻留，与注册表键为同一对象"""
+        from grimoire.hooks.registry import ALGORITHM_REGISTRY
+        
+        hook = FhashHook("SHA256", fhash_path="/invalid/path", check_on_init=False)
+        key = next(k for k in ALGORITHM_REGISTRY if k == "sha256")
+        
+        assert hook.algorithm is key
+
+
+class TestFhashProbeCache:
+    """测试可用性探测缓存"""
+    
+    def test_probe_once_per_path(self, fake_fhash):
+        """同一路径只启动一次 fhash -v"""
+        from grimoire.hooks.fhash import _probe_fhash
+        
+        _probe_fhash.cache_clear()
+        FhashHook("md5", fhash_path=fake_fhash)
+        FhashHook("sha256", fhash_path=fake_fhash)
+        
+        info = _probe_fhash.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+    
+    def test_failure_not_cached(self):
+        """探测失败每次都抛出异常"""
+        for _ in range(2):
+            with pytest.raises(FhashNotFoundError):
+                FhashHook("md5", fhash_path="/invalid/path/fhash")
+
+
+class TestFhashDecodeHash:
+    """测试哈希字符串解码"""
+    
+    def test_hex_decoder(self):
+        """十六进制算法"""
+        hook = FhashHook("md5", fhash_path="/invalid/path", check_on_init=False)
+        
+        assert hook._decode_hash("00ff10") == b"\x00\xff\x10"
+    
+    def test_base64_decoder(self):
+        """quickxor 使用 Base64"""
+        import base64
+        
+        hook = FhashHook("quickxor", fhash_path="/invalid/path", check_on_init=False)
+        raw = bytes(range(20))
+        
+        assert hook._decode_hash(base64.b64encode(raw).decode()) == raw
+
+
+class TestFhashComputeFastPath:
+    """测试 compute 的 hashlib 快速路径 (无需 fhash)"""
+    
+    @pytest.mark.parametrize("algorithm", ["md5", "sha1", "sha256", "sha512"])
+    def test_hashlib_algorithms_skip_subprocess(self, algorithm):
+        """hashlib 支持的算法不启动 fhash"""
+        data = b"fast path data" * 100
+        hook = FhashHook(algorithm, fhash_path="/invalid/path", check_on_init=False)
+        
+        with patch("subprocess.run") as run:
+            result = hook.compute(data)
+        
+        run.assert_not_called()
+        assert result == hashlib.new(algorithm, data).digest()
+        assert len(result) == hook.digest_size
+
+
+class TestFhashJsonRecords:
+    """测试 JSON Lines 记录解析"""
+    
+    def test_parse_valid_chunk(self):
+        """整组合法记录一次解析"""
+        hook = FhashHook("md5", fhash_path="/invalid/path", check_on_init=False)
+        lines = [
+            b'{"path": "a", "md5": "00ff"}',
+            b'{"path": "b", "error": "denied"}',
+            b'{"path": "c", "md5": "10"}',
+        ]
+        
+        assert list(hook._parse_json_records(lines)) == [("a", b"\x00\xff"), ("c", b"\x10")]
+    
+    def test_broken_line_falls_back(self):
+        """存在损坏行时逐行解析，只跳过损坏和无效记录"""
+        hook = FhashHook("md5", fhash_path="/invalid/path", check_on_init=False)
+        lines = [
+            b'{"path": "a", "md5": "00ff"}',
+            b'{"path": "b", "md5": ',
+            b'[1, 2]',
+            b'{"path": "c", "md5": "zz"}',
+            b'{"path": "d", "md5": "aa"}',
+        ]
+        
+        assert list(hook._parse_json_records(lines)) == [("a", b"\x00\xff"), ("d", b"\xaa")]
@@ -217,3 +217,37 @@ class TestChecksumDeterminism:
         result2 = hook.compute(b"Data B")
         
         assert result1 != result2
+
+
+class TestChecksumStream:
+    """测试增量校验 (new_stream) 接口"""
+    
+    @pytest.mark.parametrize("hook_cls", [
+        NoneChecksumHook, CRC32Hook, MD5Hook, SHA1Hook, SHA256Hook
+    ])
+    def test_stream_matches_compute(self, hook_cls):
+        """分块增量计算结果与一次性计算一致"""
+        hook = hook_cls()
+        data = bytes(range(256)) * 100
+        
+        stream = hook.new_stream()
+        for i in range(0, len(data), 1000):
+            stream.update(data[i:i + 1000])
+        
+        assert stream.digest() == hook.compute(data)
+    
+    @pytest.mark.parametrize("hook_cls", [CRC32Hook, MD5Hook, SHA1Hook, SHA256Hook])
+    def test_verify_digest(self, hook_cls):
+        """verify_digest 比较流式结果与期望值"""
+        hook = hook_cls()
+        expected = hook.compute(b"payload")
+        
+        stream = hook.new_stream()
+        stream.update(b"payload")
+        assert hook.verify_digest(stream.digest(), expected)
+        assert not hook.verify_digest(stream.digest(), bytes(len(expected)))
+        assert not hook.verify_digest(stream.digest(), expected[:-1])
+    
+    def test_none_verify_digest(self):
+        """NoneChecksumHook 始终通过"""
+        assert NoneChecksumHook().verify_digest(b'', b'\x01')
@@ -123,6 +123,15 @@ class TestXorObfuscateHook:
         
         # 错误密钥无法解密
         assert hook1.decrypt(encrypted2) != data
+    
+    @pytest.mark.parametrize("size", [1, 10, 11, 12, 1000])
+    def test_matches_bytewise_xor(self, size):
+        """输出与逐字节循环密钥异或一致 (保证格式兼容)"""
+        key = b'GrimoireVFS'
+        data = bytes((i * 7 + 3) % 256 for i in range(size))
+        expected = bytes(b ^ key[i % len(key)] for i, b in enumerate(data))
+        
+        assert XorObfuscateHook(key).encrypt(data) == expected
 
 
 class TestZlibXorHook:
@@ -6,6 +6,8 @@
 测试用户自定义 Hook 的功能和集成。
 """
 
+import os
+
 import pytest
 import zlib
 
@@ -50,6 +52,53 @@ class TestCustomChecksumHook:
         result2 = custom_checksum_hook.compute(data)
         
         assert result1 == result2
+    
+    @pytest.mark.parametrize("size", [0, 1, 7, 8, 9, 64, 1000])
+    def test_custom_hook_matches_bytewise_fold(self, custom_checksum_hook, size):
+        """整数折叠与逐字节 XOR 折叠结果一致"""
+        data = os.urandom(size)
+        expected = 0
+        for i, b in enumerate(data):
+            expected ^= b << (i % 8 * 8)
+        
+        assert custom_checksum_hook.compute(data) == expected.to_bytes(8, 'little')
+
+
+class TestCustomStreamChecksumHook:
+    """测试仅实现 new_stream 的自定义 ChecksumHook"""
+    
+    class SumStream:
+        def __init__(self):
+            self.total = 0
+        
+        def update(self, data):
+            self.total = (self.total + sum(data)) & 0xFFFFFFFF
+        
+        def digest(self):
+            return self.total.to_bytes(4, 'little')
+    
+    class SumHook(ChecksumHook):
+        @property
+        def algo_id(self):
+            return 98
+        
+        @property
+        def digest_size(self):
+            return 4
+        
+        def new_stream(self):
+            return TestCustomStreamChecksumHook.SumStream()
+    
+    def test_compute_uses_stream(self):
+        """默认 compute 通过 new_stream 计算"""
+        hook = self.SumHook()
+        assert hook.compute(b'\x01\x02\x03') == (6).to_bytes(4, 'little')
+        assert hook.verify(b'\x01\x02\x03', (6).to_bytes(4, 'little')) is True
+    
+    def test_compute_only_hook_has_no_stream(self, custom_checksum_hook):
+        """只实现 compute 的 Hook 调用 new_stream 抛出 NotImplementedError"""
+        with pytest.raises(NotImplementedError):
+            custom_checksum_hook.new_stream()
 
 
 class TestCustomIndexCryptoHook:
@@ -92,7 +141,7 @@ class TestCustomCompressionHook:
                 return zlib.compress(data)
             
             def decompress(self, data: bytes, raw_size: int) -> bytes:
-                return zlib.decompress(data)
+                return zlib.decompress(data, bufsize=raw_size)
         
         return LZ77Hook()
     
@@ -148,16 +197,24 @@ class TestCustomPathHashHook:
         result2 = custom_path_hash_hook.hash("/path/b")
         
         assert result1 != result2
+    
+    def test_custom_path_hash_many(self, custom_path_hash_hook):
+        """默认 hash_many 与逐个 hash 一致"""
+        paths = ["a.txt", "dir/b.bin", ""]
+        
+        assert custom_path_hash_hook.hash_many(paths) == [
+            custom_path_hash_hook.hash(p) for p in paths
+        ]
 
 
 class TestCustomHookInManifest:
     """测试自定义 Hook 在 Manifest 中的集成"""
     
-    def test_manifest_with_custom_checksum(self, tmp_path, sample_files, custom_checksum_hook):
+    def test_manifest_with_custom_checksum(self, tmp_path, shared_sample_files, custom_checksum_hook):
         """Manifest 应支持自定义 ChecksumHook"""
         from grimoire import ManifestBuilder, ManifestReader
         
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "custom.manifest"
         
         # 使用自定义 Hook 构建
@@ -176,11 +233,11 @@ class TestCustomHookInManifest:
                 vfs_path = f"/assets/{name}"
                 assert reader.exists(vfs_path)
     
-    def test_manifest_with_custom_crypto(self, tmp_path, sample_files, custom_crypto_hook):
+    def test_manifest_with_custom_crypto(self, tmp_path, shared_sample_files, custom_crypto_hook):
         """Manifest 应支持自定义 IndexCryptoHook"""
         from grimoire import ManifestBuilder, ManifestReader
         
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "custom_crypto.manifest"
         
         # 使用自定义 Hook 构建
@@ -212,15 +269,15 @@ class TestCustomHookInArchive:
                 return zlib.compress(data, level=9)
             
             def decompress(self, data: bytes, raw_size: int) -> bytes:
-                return zlib.decompress(data)
+                return zlib.decompress(data, bufsize=raw_size)
         
         return TestZlib()
     
-    def test_archive_with_custom_compression(self, tmp_path, sample_files, custom_compression_hook):
+    def test_archive_with_custom_compression(self, tmp_path, shared_sample_files, custom_compression_hook):
         """Archive 应支持自定义 CompressionHook"""
         from grimoire import ArchiveBuilder, ArchiveReader
         
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "custom.archive"
         
         # 使用自定义 Hook 构建
@@ -241,12 +298,12 @@ class TestCustomHookInArchive:
                 assert data == expected_content
     
     def test_archive_with_custom_checksum_and_compression(
-        self, tmp_path, sample_files, custom_checksum_hook, custom_compression_hook
+        self, tmp_path, shared_sample_files, custom_checksum_hook, custom_compression_hook
     ):
         """Archive 应支持同时使用自定义 Checksum 和 Compression Hook"""
         from grimoire import ArchiveBuilder, ArchiveReader
         
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         archive_path = tmp_path / "full_custom.archive"
         
         builder = ArchiveBuilder(
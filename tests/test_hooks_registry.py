@@ -71,6 +71,13 @@ class TestChecksumRegistry:
         assert CHECKSUM_REGISTRY[2] == MD5Hook
         assert CHECKSUM_REGISTRY[3] == SHA1Hook
         assert CHECKSUM_REGISTRY[4] == SHA256Hook
+    
+    def test_class_level_attributes(self):
+        """内置 Hook 的 algo_id / digest_size 可直接从类读取"""
+        for algo_id, hook_cls in CHECKSUM_REGISTRY.items():
+            assert hook_cls.algo_id == algo_id
+            assert hook_cls.digest_size == ALGORITHM_REGISTRY[ID_TO_ALGORITHM[algo_id]][1]
+            assert hook_cls().algo_id == algo_id
 
 
 class TestGetChecksumHookById:
@@ -102,6 +109,15 @@ class TestGetChecksumHookById:
         hook = get_checksum_hook_by_id(-1)
         
         assert hook is None
+    
+    def test_id_tables_match_registries(self):
+        """按下标索引的查找表应与字典注册表一致"""
+        from grimoire.hooks.registry import _ALGORITHM_BY_ID, _CHECKSUM_HOOK_BY_ID
+        
+        assert len(_ALGORITHM_BY_ID) == len(_CHECKSUM_HOOK_BY_ID)
+        for algo_id, algorithm in enumerate(_ALGORITHM_BY_ID):
+            assert algorithm == ID_TO_ALGORITHM.get(algo_id)
+            assert _CHECKSUM_HOOK_BY_ID[algo_id] is CHECKSUM_REGISTRY.get(algo_id)
 
 
 class TestGetBestChecksumHook:
@@ -160,6 +176,59 @@ class TestGetExternalChecksumHookRclone:
         assert hook.algo_id == 4
 
 
+class TestExternalHookCache:
+    """测试外置工具探测结果缓存"""
+    
+    def test_new_instance_per_call(self):
+        """每次返回新实例"""
+        hook1 = get_external_checksum_hook('SHA256')
+        hook2 = get_external_checksum_hook('sha256')
+        
+        if hook1 is not None:
+            assert hook1 is not hook2
+            assert hook1.algo_id == 4
+    
+    def test_unsupported_algorithm(self):
+        """不支持的算法返回 None"""
+        assert get_external_checksum_hook('not-an-algorithm') is None
+    
+    def test_failure_not_cached(self, monkeypatch):
+        """外置工具探测失败不被缓存，之后可用时能被发现"""
+        from grimoire.hooks.fhash import FhashHook, FhashNotFoundError
+        from grimoire.hooks.rclone import RcloneHashHook
+        
+        def missing(self, *args, **kwargs):
+            raise FhashNotFoundError("not installed")
+        
+        monkeypatch.setattr(FhashHook, "__init__", missing)
+        monkeypatch.setattr(RcloneHashHook, "__init__", missing)
+        assert get_external_checksum_hook('sha256') is None
+        
+        monkeypatch.setattr(FhashHook, "__init__", lambda self, *args, **kwargs: None)
+        assert isinstance(get_external_checksum_hook('sha256'), FhashHook)
+    
+    def test_best_hook_new_instances(self):
+        """get_best_checksum_hook 每次返回新实例"""
+        hook1 = get_best_checksum_hook('MD5')
+        hook2 = get_best_checksum_hook('md5')
+        
+        assert hook1 is not hook2
+        assert hook1.algo_id == hook2.algo_id == 2
+    
+    def test_best_hook_failure_not_cached(self, monkeypatch):
+        """fhash 探测失败不被缓存，之后可用时能被发现"""
+        from grimoire.hooks.fhash import FhashHook, FhashNotFoundError
+        
+        def missing(self, *args, **kwargs):
+            raise FhashNotFoundError("not installed")
+        
+        monkeypatch.setattr(FhashHook, "__init__", missing)
+        assert not isinstance(get_best_checksum_hook('md5'), FhashHook)
+        
+        monkeypatch.setattr(FhashHook, "__init__", lambda self, *args, **kwargs: None)
+        assert isinstance(get_best_checksum_hook('md5'), FhashHook)
+
+
 class TestGetIndexCryptoByFlags:
     """测试 get_index_crypto_by_flags 函数"""
     
@@ -29,10 +29,10 @@ class ZlibHook(CompressionHook):
         return 1
     
     def compress(self, data: bytes) -> bytes:
-        return zlib.compress(data, level=6)
+        return zlib.compress(data, level=1)
     
     def decompress(self, data: bytes, raw_size: int) -> bytes:
-        return zlib.decompress(data)
+        return zlib.decompress(data, bufsize=raw_size)
 
 
 # ==================== 真实目录打包测试 ====================
@@ -41,9 +41,9 @@ class TestManifestBuilderBasic:
         assert manifest_path.exists()
         assert manifest_path.stat().st_size > 0
     
-    def test_add_single_file(self, tmp_path, sample_files):
+    def test_add_single_file(self, tmp_path, shared_sample_files):
         """添加单个文件"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "single.manifest"
         
         builder = ManifestBuilder(str(manifest_path))
@@ -52,9 +52,9 @@ class TestManifestBuilderBasic:
         
         assert builder.entry_count == 1
     
-    def test_add_directory(self, tmp_path, sample_files):
+    def test_add_directory(self, tmp_path, shared_sample_files):
         """添加整个目录"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "dir.manifest"
         
         builder = ManifestBuilder(str(manifest_path))
@@ -64,9 +64,9 @@ class TestManifestBuilderBasic:
         assert count == len(files)
         assert builder.entry_count == len(files)
     
-    def test_add_directory_non_recursive(self, tmp_path, sample_files):
+    def test_add_directory_non_recursive(self, tmp_path, shared_sample_files):
         """非递归添加目录"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "nonrecursive.manifest"
         
         builder = ManifestBuilder(str(manifest_path))
@@ -77,9 +77,9 @@ class TestManifestBuilderBasic:
         root_files = [f for f in files.keys() if "/" not in f]
         assert count == len(root_files)
     
-    def test_path_stats(self, tmp_path, sample_files):
+    def test_path_stats(self, tmp_path, shared_sample_files):
         """路径字典统计"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "stats.manifest"
         
         builder = ManifestBuilder(str(manifest_path))
@@ -89,6 +89,28 @@ class TestManifestBuilderBasic:
         assert "dirs" in stats
         assert "names" in stats
         assert "exts" in stats
+    
+    def test_add_file_rejects_missing_and_dirs(self, tmp_path, shared_sample_files):
+        """不存在的路径和目录应抛出 FileNotFoundError"""
+        src_dir, files = shared_sample_files
+        builder = ManifestBuilder(str(tmp_path / "bad.manifest"))
+        
+        with pytest.raises(FileNotFoundError):
+            builder.add_file(str(src_dir / "missing.txt"))
+        with pytest.raises(FileNotFoundError):
+            builder.add_file(str(src_dir / "subdir"))
+    
+    def test_add_file_size_from_single_stat(self, tmp_path, shared_sample_files):
+        """文件大小来自存在性检查时的 stat，不再单独获取"""
+        from unittest.mock import patch
+        
+        src_dir, files = shared_sample_files
+        builder = ManifestBuilder(str(tmp_path / "size.manifest"))
+        
+        with patch("os.path.getsize", side_effect=AssertionError("重复 stat")):
+            builder.add_file(str(src_dir / "hero.txt"), "/hero.txt")
+        
+        assert builder._entries[0].raw_size == len(files["hero.txt"])
 
 
 class TestManifestBuilderChecksum:
@@ -101,10 +123,10 @@ class TestManifestBuilderChecksum:
         (MD5Hook(), 16),
         (SHA1Hook(), 20),
         (SHA256Hook(), 32),
-    ])
-    def test_different_checksum_hooks(self, hook, expected_size, tmp_path, sample_files):
+    ], ids=["no-hook", "none", "crc32", "md5", "sha1", "sha256"])
+    def test_different_checksum_hooks(self, hook, expected_size, tmp_path, shared_sample_files):
         """测试不同校验算法"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "checksum.manifest"
         
         builder = ManifestBuilder(str(manifest_path), checksum_hook=hook)
@@ -115,6 +137,69 @@ class TestManifestBuilderChecksum:
         with ManifestReader(str(manifest_path), checksum_hook=hook) as reader:
             entry = reader.get_entry("/assets/hero.txt")
             assert len(entry.checksum) == expected_size
+    
+    @pytest.mark.parametrize("hook", [MD5Hook(), SHA1Hook(), SHA256Hook()])
+    def test_stream_hash_matches_compute(self, hook, tmp_path):
+        """流式校验结果与整块计算一致 (跨多个分块)"""
+        data = os.urandom(3 * 1024 * 1024 + 123)
+        local = tmp_path / "big.bin"
+        local.write_bytes(data)
+        
+        for stream_hash in (True, False):
+            manifest_path = tmp_path / f"stream_{stream_hash}.manifest"
+            builder = ManifestBuilder(str(manifest_path), checksum_hook=hook)
+            builder.add_file(str(local), "/big.bin", stream_hash=stream_hash)
+            builder.build()
+            
+            with ManifestReader(str(manifest_path), checksum_hook=hook) as reader:
+                assert reader.get_entry("/big.bin").checksum == hook.compute(data)
+    
+    def test_stream_hash_reuses_buffer(self, tmp_path):
+        """流式校验各分块为同一缓冲区上的 memoryview，不逐块分配 bytes"""
+        import hashlib
+        
+        chunks = []
+        
+        class RecordingStream:
+            def __init__(self):
+                self._md5 = hashlib.md5()
+            
+            def update(self, chunk):
+                chunks.append((type(chunk), chunk.obj if isinstance(chunk, memoryview) else None))
+                self._md5.update(chunk)
+            
+            def digest(self):
+                return self._md5.digest()
+        
+        class RecordingMD5(MD5Hook):
+            def new_stream(self):
+                return RecordingStream()
+        
+        data = os.urandom(2 * 1024 * 1024 + 7)
+        local = tmp_path / "big.bin"
+        local.write_bytes(data)
+        
+        builder = ManifestBuilder(str(tmp_path / "reuse.manifest"), checksum_hook=RecordingMD5())
+        builder.add_file(str(local), "/big.bin")
+        
+        assert builder._entries[0].checksum == hashlib.md5(data).digest()
+        assert len(chunks) == 3
+        assert all(kind is memoryview for kind, _ in chunks)
+        assert all(obj is chunks[0][1] for _, obj in chunks)
+    
+    def test_small_file_single_compute(self, tmp_path):
+        """不超过一个分块的文件直接调用 compute，不创建增量对象"""
+        class NoStreamMD5(MD5Hook):
+            def new_stream(self):
+                raise AssertionError("小文件不应走流式校验")
+        
+        local = tmp_path / "small.bin"
+        local.write_bytes(b"small payload")
+        
+        builder = ManifestBuilder(str(tmp_path / "small.manifest"), checksum_hook=NoStreamMD5())
+        builder.add_file(str(local), "/small.bin")
+        
+        assert builder._entries[0].checksum == MD5Hook().compute(b"small payload")
 
 
 class TestManifestBuilderIndexCrypto:
@@ -125,9 +210,9 @@ class TestManifestBuilderIndexCrypto:
         XorObfuscateHook,
         ZlibXorHook,
     ])
-    def test_different_index_crypto(self, crypto_cls, tmp_path, sample_files):
+    def test_different_index_crypto(self, crypto_cls, tmp_path, shared_sample_files):
         """测试不同索引加密方式"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "crypto.manifest"
         crypto = crypto_cls()
         
@@ -144,11 +229,11 @@ class TestManifestBuilderIndexCrypto:
 class TestManifestBuilderBatch:
     """ManifestBuilder 批量操作测试"""
     
-    def test_add_files_batch(self, tmp_path, sample_files):
+    def test_add_files_batch(self, tmp_path, shared_sample_files):
         """批量添加文件"""
         from grimoire.core.batch import FileItem
         
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "batch.manifest"
         
         items = [
@@ -163,9 +248,9 @@ class TestManifestBuilderBatch:
         assert result.success_count == len(files)
         assert result.failed_count == 0
     
-    def test_add_dir_batch_with_progress(self, tmp_path, sample_files):
+    def test_add_dir_batch_with_progress(self, tmp_path, shared_sample_files):
         """带进度回调的批量添加"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "progress.manifest"
         
         progress_calls = []
@@ -225,14 +310,34 @@ class TestManifestReaderBasic:
             assert len(paths) == len(files)
             # 注意: normalize_path 会去除前导斜杠
             assert any("assets/hero.txt" in p for p in paths)
+    
+    def test_from_buffer(self, manifest_file):
+        """从内存缓冲区与 mmap 读取，结果与文件读取一致"""
+        import mmap
+        
+        manifest_path, src_dir, files = manifest_file
+        
+        with ManifestReader(str(manifest_path)) as reader:
+            expected = reader.get_all_entries()
+        
+        raw = manifest_path.read_bytes()
+        with ManifestReader.from_buffer(raw) as reader:
+            assert reader.get_all_entries() == expected
+        
+        with open(manifest_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with ManifestReader.from_buffer(mm) as reader:
+                assert reader.get_all_entries() == expected
+            # close() 不关闭调用方的缓冲区
+            assert not mm.closed
 
 
 class TestManifestReaderVerify:
     """ManifestReader 文件校验测试"""
     
-    def test_verify_file_success(self, tmp_path, sample_files):
+    def test_verify_file_success(self, tmp_path, shared_sample_files):
         """校验正确的文件"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "verify.manifest"
         
         # 创建带校验的 Manifest
@@ -287,9 +392,9 @@ class TestManifestReaderEncrypted:
         
         return SimpleXor()
     
-    def test_encrypted_index_without_key(self, tmp_path, sample_files, simple_xor_hook):
+    def test_encrypted_index_without_key(self, tmp_path, shared_sample_files, simple_xor_hook):
         """不提供解密器时无法遍历"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "encrypted.manifest"
         
         builder = ManifestBuilder(str(manifest_path), index_crypto=simple_xor_hook)
@@ -308,9 +413,9 @@ class TestManifestReaderEncrypted:
             with pytest.raises(IndexNotDecryptedError):
                 reader.list_all()
     
-    def test_encrypted_index_with_key(self, tmp_path, sample_files, simple_xor_hook):
+    def test_encrypted_index_with_key(self, tmp_path, shared_sample_files, simple_xor_hook):
         """提供解密器时可以遍历"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "encrypted2.manifest"
         
         builder = ManifestBuilder(str(manifest_path), index_crypto=simple_xor_hook)
@@ -328,9 +433,9 @@ class TestManifestReaderEncrypted:
 class TestManifestChinesePath:
     """中文路径测试"""
     
-    def test_chinese_filename(self, tmp_path, sample_files):
+    def test_chinese_filename(self, tmp_path, shared_sample_files):
         """中文文件名"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "chinese.manifest"
         
         builder = ManifestBuilder(str(manifest_path), checksum_hook=MD5Hook())
@@ -382,9 +487,9 @@ class TestManifestCombinations:
     @pytest.mark.parametrize("index_crypto", [
         None, ZlibCompressHook(), XorObfuscateHook(), ZlibXorHook()
     ])
-    def test_all_combinations(self, checksum_hook, index_crypto, tmp_path, sample_files):
+    def test_all_combinations(self, checksum_hook, index_crypto, tmp_path, shared_sample_files):
         """测试所有 Checksum + Crypto 组合"""
-        src_dir, files = sample_files
+        src_dir, files = shared_sample_files
         manifest_path = tmp_path / "combo.manifest"
         
         # 构建
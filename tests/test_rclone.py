@@ -9,7 +9,6 @@ RcloneHashHook 单元测试
 
 import hashlib
 import os
-import tempfile
 
 import pytest
 
@@ -249,3 +248,36 @@ class TestRcloneNotInstalled:
         # 即使路径无效也不抛出异常
         hook = RcloneHashHook("md5", rclone_path="/invalid/path", check_on_init=False)
         assert hook.algorithm == "md5"
+
+
+class TestRcloneBatchDirGroups:
+    """测试 compute_files_batch 的目录分组 (不调用 rclone)"""
+    
+    def test_groups_computed_concurrently(self):
+        """多个目录分组应全部计算并正确匹配"""
+        import threading
+        
+        hook = RcloneHashHook("md5", rclone_path="/invalid/path", check_on_init=False)
+        dirs = [os.path.abspath(f"dir{i}") for i in range(4)]
+        paths = [os.path.join(d, "a.bin") for d in dirs]
+        threads = set()
+        
+        def fake_compute_dir(dir_path, recursive=False, timeout=None):
+            threads.add(threading.get_ident())
+            return {"a.bin": dir_path.encode()}
+        
+        hook.compute_dir = fake_compute_dir
+        results = hook.compute_files_batch(paths)
+        
+        assert results == {p: os.path.dirname(p).encode() for p in paths}
+        assert threading.get_ident() not in threads
+    
+    def test_missing_falls_back_to_compute_file(self):
+        """目录结果缺失的文件应回退到单文件计算"""
+        hook = RcloneHashHook("md5", rclone_path="/invalid/path", check_on_init=False)
+        path = os.path.abspath("only.bin")
+        
+        hook.compute_dir = lambda dir_path, recursive=False, timeout=None: {}
+        hook.compute_file = lambda file_path: b"fallback"
+        
+        assert hook.compute_files_batch([path]) == {path: b"fallback"}